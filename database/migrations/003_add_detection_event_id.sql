@@ -0,0 +1,20 @@
+-- Migration: Add client-generated event_id to detection_events
+-- Workers write events to a local outbox first and replay them after DB
+-- outages; event_id makes those replays idempotent.
+-- Run this in Supabase SQL Editor to update existing database
+
+-- 1. Add event_id column
+ALTER TABLE detection_events
+ADD COLUMN IF NOT EXISTS event_id UUID;
+
+-- 2. Unique index (used by ON CONFLICT (event_id) DO NOTHING)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_event_id
+ON detection_events(event_id);
+
+-- 3. Add comment
+COMMENT ON COLUMN detection_events.event_id IS '워커가 생성한 이벤트 ID (outbox 재전송 시 중복 방지)';
+
+-- Verify
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'detection_events' AND column_name = 'event_id';
@@ -0,0 +1,39 @@
+-- Migration: Add worker_nodes and channel_leases for multi-node sharding
+-- Detection nodes split (store, channel) pairs between them through leases
+-- with heartbeats; channels of a node that stops renewing are picked up by
+-- the others once its leases expire (see src/database/leases.py).
+-- Run this in Supabase SQL Editor to update existing database
+
+-- 1. Worker nodes (one row per running orchestrator)
+CREATE TABLE IF NOT EXISTS worker_nodes (
+    node_id VARCHAR(100) PRIMARY KEY,           -- 'cctv-node-1'
+    hostname VARCHAR(255),
+    pid INT,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    metadata JSONB DEFAULT '{}'::jsonb
+);
+
+-- 2. Channel leases (at most one holder per channel)
+CREATE TABLE IF NOT EXISTS channel_leases (
+    store_id VARCHAR(50) NOT NULL REFERENCES stores(store_id) ON DELETE CASCADE,
+    channel_id INT NOT NULL,
+    node_id VARCHAR(100) NOT NULL,
+    acquired_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    renewed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    lease_expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (store_id, channel_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_channel_leases_node ON channel_leases(node_id);
+CREATE INDEX IF NOT EXISTS idx_worker_nodes_heartbeat ON worker_nodes(heartbeat_at DESC);
+
+-- 3. Add comments
+COMMENT ON TABLE worker_nodes IS '감지 노드 목록 (heartbeat_at이 갱신되지 않으면 죽은 노드)';
+COMMENT ON TABLE channel_leases IS '채널 담당 노드 임대 (lease_expires_at 이후 다른 노드가 인수)';
+
+-- Verify
+SELECT l.store_id, l.channel_id, l.node_id, l.lease_expires_at, n.heartbeat_at
+FROM channel_leases l
+LEFT JOIN worker_nodes n ON l.node_id = n.node_id
+ORDER BY l.node_id, l.store_id, l.channel_id;
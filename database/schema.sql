@@ -116,6 +116,7 @@ CREATE INDEX idx_status_vacant ON seat_status(store_id, vacant_duration_seconds
 -- ============================================================================
 CREATE TABLE detection_events (
     id SERIAL PRIMARY KEY,
+    event_id UUID UNIQUE,                        -- 워커가 생성한 멱등 키 (outbox 재전송 중복 방지)
     store_id VARCHAR(50) NOT NULL REFERENCES stores(store_id) ON DELETE CASCADE,
     seat_id VARCHAR(20) NOT NULL,
     channel_id INT,
@@ -206,6 +207,31 @@ CREATE TABLE system_logs (
 CREATE INDEX idx_logs_store_time ON system_logs(store_id, created_at DESC);
 CREATE INDEX idx_logs_level ON system_logs(log_level, created_at DESC);
 
+-- ============================================================================
+-- 7. Worker Nodes / Channel Leases (멀티 노드 채널 분배)
+-- ============================================================================
+CREATE TABLE worker_nodes (
+    node_id VARCHAR(100) PRIMARY KEY,            -- 'cctv-node-1'
+    hostname VARCHAR(255),
+    pid INT,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),  -- 갱신이 멈추면 죽은 노드
+    metadata JSONB DEFAULT '{}'::jsonb
+);
+
+CREATE TABLE channel_leases (
+    store_id VARCHAR(50) NOT NULL REFERENCES stores(store_id) ON DELETE CASCADE,
+    channel_id INT NOT NULL,
+    node_id VARCHAR(100) NOT NULL,               -- 현재 담당 노드
+    acquired_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    renewed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    lease_expires_at TIMESTAMPTZ NOT NULL,       -- 이후 다른 노드가 인수 가능
+    PRIMARY KEY (store_id, channel_id)
+);
+
+CREATE INDEX idx_channel_leases_node ON channel_leases(node_id);
+CREATE INDEX idx_worker_nodes_heartbeat ON worker_nodes(heartbeat_at DESC);
+
 -- ============================================================================
 -- Triggers (자동 업데이트)
 -- ============================================================================
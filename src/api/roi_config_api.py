@@ -311,7 +311,10 @@ async def detect_persons_on_channel(channel_id: int):
         # Load YOLO detector
         detector = PersonDetector(
             model_path=settings.YOLO_MODEL,
-            confidence=settings.CONFIDENCE_THRESHOLD
+            confidence=settings.CONFIDENCE_THRESHOLD,
+            backend=settings.DETECTOR_BACKEND,
+            nms_iou=settings.DETECTOR_NMS_IOU,
+            num_threads=settings.DETECTOR_THREADS
         )
 
         # Detect persons
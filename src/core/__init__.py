@@ -1,4 +1,17 @@
 from .detector import PersonDetector
 from .roi_matcher import ROIMatcher
+from .inference_server import InferenceServer, InferenceClient, BatchingDetector
+from .motion_gate import MotionGate
+from .seat_background import SeatBackgroundModel
+from .tracker import PersonTracker
 
-__all__ = ['PersonDetector', 'ROIMatcher']
+__all__ = [
+    'PersonDetector',
+    'ROIMatcher',
+    'InferenceServer',
+    'InferenceClient',
+    'BatchingDetector',
+    'MotionGate',
+    'SeatBackgroundModel',
+    'PersonTracker',
+]
@@ -0,0 +1,456 @@
+"""Inference backends behind PersonDetector.
+
+Every backend takes a list of BGR frames and returns, per frame, an (N, 6)
+float32 array of boxes (x1, y1, x2, y2, confidence, class_id) in that
+frame's pixel coordinates, restricted to the requested COCO classes.
+Coordinates are truncated to whole pixels, matching the int tuples
+PersonDetector.detect_persons has always returned.
+
+- ``ultralytics``: PyTorch model through ultralytics.YOLO (.pt files)
+- ``onnx``: ONNX Runtime on CPU with our own letterbox and NMS (.onnx)
+- ``openvino``: OpenVINO runtime on CPU, same pre/post-processing (.xml/.onnx)
+
+Only the selected backend's runtime is imported, so ONNX/OpenVINO workers
+never pay for importing torch.
+"""
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Detection = Tuple[int, int, int, int, float]
+
+
+def empty_detections(columns: int = 5) -> np.ndarray:
+    """Empty float32 detection array with the given number of columns."""
+    return np.zeros((0, columns), dtype=np.float32)
+
+
+def detections_to_list(detections: np.ndarray) -> List[Detection]:
+    """Convert an (N, 5) detection array to (x1, y1, x2, y2, conf) tuples."""
+    return [
+        (int(x1), int(y1), int(x2), int(y2), conf)
+        for x1, y1, x2, y2, conf in detections.tolist()
+    ]
+
+
+BACKENDS = ('auto', 'ultralytics', 'onnx', 'openvino')
+
+PERSON_CLASS_ID = 0  # COCO
+
+# COCO ids of the classes we care about (persons and belongings left on seats)
+COCO_CLASSES = {
+    'person': 0,
+    'backpack': 24,
+    'umbrella': 25,
+    'handbag': 26,
+    'suitcase': 28,
+    'bottle': 39,
+    'cup': 41,
+    'laptop': 63,
+    'mouse': 64,
+    'keyboard': 66,
+    'cell phone': 67,
+    'book': 73,
+}
+COCO_CLASS_NAMES = {class_id: name for name, class_id in COCO_CLASSES.items()}
+
+# Class id offset that keeps NMS from suppressing boxes across classes
+_NMS_CLASS_OFFSET = 7680
+
+
+def resolve_class_ids(classes) -> List[int]:
+    """Turn class names or ids (e.g. ['laptop', 'book', 24]) into COCO ids.
+
+    Raises:
+        ValueError: On an unknown class name
+    """
+    class_ids = []
+    for value in classes:
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+            if value.isdigit():
+                value = int(value)
+            elif value in COCO_CLASSES:
+                value = COCO_CLASSES[value]
+            else:
+                raise ValueError(f"Unknown COCO class: {value} (known: {sorted(COCO_CLASSES)})")
+        class_ids.append(int(value))
+    return class_ids
+
+
+class DetectorBackend(ABC):
+    """Common interface of all detector backends."""
+
+    name = 'base'
+
+    def __init__(
+        self,
+        model_path: str,
+        confidence: float,
+        classes: Sequence[int] = (PERSON_CLASS_ID,)
+    ):
+        self.model_path = model_path
+        self.confidence = confidence
+        self.classes = list(classes)
+
+    @abstractmethod
+    def predict(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        """Detect objects in a batch of BGR images (one (N, 6) array each)."""
+
+    def info(self) -> dict:
+        """Backend details for get_model_info()."""
+        return {"backend": self.name}
+
+
+class UltralyticsBackend(DetectorBackend):
+    """PyTorch model through ultralytics.YOLO."""
+
+    name = 'ultralytics'
+
+    def __init__(
+        self,
+        model_path: str,
+        confidence: float,
+        classes: Sequence[int] = (PERSON_CLASS_ID,)
+    ):
+        super().__init__(model_path, confidence, classes)
+        try:
+            from ultralytics import YOLO
+        except ImportError:
+            raise ImportError(
+                "ultralytics not installed. Run: pip install ultralytics"
+            )
+        self.model = YOLO(model_path)
+
+    def predict(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        # Class filtering happens inside ultralytics' NMS
+        results = self.model(
+            list(images), conf=self.confidence, classes=self.classes, verbose=False
+        )
+        return [self._parse_result(result) for result in results]
+
+    @staticmethod
+    def _parse_result(result) -> np.ndarray:
+        """Copy all boxes of a YOLO result to the host in one transfer."""
+        # boxes.data rows: x1, y1, x2, y2, conf, cls
+        data = result.boxes.data.cpu().numpy()
+        if len(data) == 0:
+            return empty_detections(6)
+        detections = data[:, :6].astype(np.float32)
+        detections[:, :4] = np.trunc(detections[:, :4])
+        return detections
+
+    def info(self) -> dict:
+        return {"backend": self.name, "device": str(self.model.device)}
+
+
+def letterbox(
+    image: np.ndarray, size: Tuple[int, int], color: int = 114
+) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Resize keeping aspect ratio and pad to size (same as ultralytics).
+
+    Args:
+        image: BGR image
+        size: Target (height, width)
+        color: Padding gray level
+
+    Returns:
+        (padded image, scale, (pad_x, pad_y))
+    """
+    import cv2
+
+    height, width = image.shape[:2]
+    target_h, target_w = size
+    scale = min(target_h / height, target_w / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    dw, dh = (target_w - new_w) / 2, (target_h - new_h) / 2
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    padded = cv2.copyMakeBorder(
+        image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(color, color, color)
+    )
+    return padded, scale, (left, top)
+
+
+def preprocess_image(
+    image: np.ndarray, size: Tuple[int, int]
+) -> Tuple[np.ndarray, Tuple[float, Tuple[int, int], Tuple[int, int]]]:
+    """Turn a BGR frame into a (3, H, W) float32 model input.
+
+    Letterbox, BGR->RGB, HWC->CHW and scale to 0-1.
+
+    Returns:
+        (tensor, (scale, pad, original (height, width)))
+    """
+    padded, scale, pad = letterbox(image, size)
+    tensor = np.ascontiguousarray(padded[:, :, ::-1].transpose(2, 0, 1), dtype=np.float32) / 255.0
+    return tensor, (scale, pad, image.shape[:2])
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression.
+
+    Args:
+        boxes: (N, 4) xyxy
+        scores: (N,)
+        iou_threshold: Overlap above which the lower-scored box is dropped
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-7)
+        order = rest[iou <= iou_threshold]
+
+    return np.asarray(keep, dtype=np.int64)
+
+
+class ExportedYoloBackend(DetectorBackend):
+    """Shared pre/post-processing for exported YOLOv8/YOLO11 detection heads.
+
+    The exported graph outputs (batch, 4 + num_classes, anchors) with boxes
+    as (cx, cy, w, h) in letterboxed input pixels and per-class scores.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        confidence: float,
+        classes: Sequence[int] = (PERSON_CLASS_ID,),
+        iou_threshold: float = 0.7,
+        input_size: int = 640,
+        max_detections: int = 300
+    ):
+        super().__init__(model_path, confidence, classes)
+        self.iou_threshold = iou_threshold
+        self.input_size = (input_size, input_size)
+        self.max_detections = max_detections
+        self.max_batch: Optional[int] = None  # None = dynamic batch
+
+    def _preprocess(
+        self, images: List[np.ndarray]
+    ) -> Tuple[np.ndarray, List[Tuple[float, Tuple[int, int], Tuple[int, int]]]]:
+        """Preprocess each image and stack into one batch."""
+        tensors, metas = zip(*(preprocess_image(image, self.input_size) for image in images))
+        return np.stack(tensors), list(metas)
+
+    def _postprocess(
+        self, output: np.ndarray, meta: Tuple[float, Tuple[int, int], Tuple[int, int]]
+    ) -> np.ndarray:
+        """Decode one image's raw output into boxes of the requested classes."""
+        predictions = output.T  # (anchors, 4 + num_classes)
+        class_scores = predictions[:, 4:]
+
+        # Same rule as ultralytics: the box belongs to its best class
+        best_class = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(best_class)), best_class]
+        mask = np.isin(best_class, self.classes) & (scores >= self.confidence)
+        if not mask.any():
+            return empty_detections(6)
+
+        cxcywh = predictions[mask, :4]
+        scores = scores[mask]
+        class_ids = best_class[mask]
+        boxes = np.empty_like(cxcywh)
+        boxes[:, :2] = cxcywh[:, :2] - cxcywh[:, 2:] / 2
+        boxes[:, 2:] = cxcywh[:, :2] + cxcywh[:, 2:] / 2
+
+        # Per-class NMS: shift each class into its own coordinate range
+        shifted = boxes + (class_ids * _NMS_CLASS_OFFSET)[:, None]
+        keep = nms(shifted, scores, self.iou_threshold)[:self.max_detections]
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+
+        # Undo letterbox and clip to the original image
+        scale, (pad_x, pad_y), (height, width) = meta
+        boxes[:, [0, 2]] = np.clip((boxes[:, [0, 2]] - pad_x) / scale, 0, width)
+        boxes[:, [1, 3]] = np.clip((boxes[:, [1, 3]] - pad_y) / scale, 0, height)
+
+        detections = np.empty((len(boxes), 6), dtype=np.float32)
+        detections[:, :4] = np.trunc(boxes)
+        detections[:, 4] = scores
+        detections[:, 5] = class_ids
+        return detections
+
+    @abstractmethod
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        """Forward pass on a preprocessed batch; returns (B, 4 + C, anchors)."""
+
+    def predict(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        if not images:
+            return []
+
+        batch, metas = self._preprocess(images)
+        step = self.max_batch or len(images)
+        outputs = [self._run(batch[i:i + step]) for i in range(0, len(images), step)]
+        output = np.concatenate(outputs, axis=0)
+
+        return [self._postprocess(output[i], meta) for i, meta in enumerate(metas)]
+
+
+def _static_dim(value) -> Optional[int]:
+    """Return a model input dimension if it is a fixed integer."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+class OnnxBackend(ExportedYoloBackend):
+    """ONNX Runtime on CPU."""
+
+    name = 'onnx'
+
+    def __init__(
+        self,
+        model_path: str,
+        confidence: float,
+        classes: Sequence[int] = (PERSON_CLASS_ID,),
+        iou_threshold: float = 0.7,
+        num_threads: int = 0
+    ):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError(
+                "onnxruntime not installed. Run: pip install onnxruntime"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(
+            str(model_path), sess_options=options, providers=['CPUExecutionProvider']
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        batch_dim, _, height, width = model_input.shape
+        input_size = _static_dim(height) or _static_dim(width) or 640
+        super().__init__(model_path, confidence, classes, iou_threshold, input_size)
+        self.max_batch = _static_dim(batch_dim)
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+    def info(self) -> dict:
+        return {
+            "backend": self.name,
+            "device": "cpu",
+            "providers": self.session.get_providers(),
+            "input_size": self.input_size[0],
+        }
+
+
+class OpenVinoBackend(ExportedYoloBackend):
+    """OpenVINO runtime on CPU (IR .xml or .onnx)."""
+
+    name = 'openvino'
+
+    def __init__(
+        self,
+        model_path: str,
+        confidence: float,
+        classes: Sequence[int] = (PERSON_CLASS_ID,),
+        iou_threshold: float = 0.7,
+        num_threads: int = 0
+    ):
+        try:
+            import openvino as ov
+        except ImportError:
+            raise ImportError(
+                "openvino not installed. Run: pip install openvino"
+            )
+
+        path = Path(model_path)
+        # ultralytics exports IR into a directory (yolo11n_openvino_model/)
+        if path.is_dir():
+            path = next(path.glob('*.xml'))
+
+        core = ov.Core()
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if num_threads > 0:
+            config["INFERENCE_NUM_THREADS"] = num_threads
+
+        model = core.read_model(str(path))
+        model_input = model.inputs[0].get_partial_shape()
+        batch_dim = model_input[0].get_length() if model_input[0].is_static else None
+        size_dim = model_input[2].get_length() if model_input[2].is_static else None
+
+        self.compiled = core.compile_model(model, "CPU", config)
+        self.output = self.compiled.outputs[0]
+
+        super().__init__(str(path), confidence, classes, iou_threshold, size_dim or 640)
+        self.max_batch = batch_dim
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.compiled(batch)[self.output]
+
+    def info(self) -> dict:
+        return {"backend": self.name, "device": "cpu", "input_size": self.input_size[0]}
+
+
+def resolve_backend_name(model_path: str, backend: str = 'auto') -> str:
+    """Pick a backend from the model file extension when backend is 'auto'."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend: {backend} (expected one of {BACKENDS})")
+    if backend != 'auto':
+        return backend
+
+    path = Path(model_path)
+    if path.suffix == '.onnx':
+        return 'onnx'
+    if path.suffix == '.xml' or path.name.endswith('_openvino_model'):
+        return 'openvino'
+    return 'ultralytics'
+
+
+def create_backend(
+    model_path: str,
+    confidence: float,
+    backend: str = 'auto',
+    classes: Sequence[int] = (PERSON_CLASS_ID,),
+    iou_threshold: float = 0.7,
+    num_threads: int = 0
+) -> DetectorBackend:
+    """Create the detector backend for a model file.
+
+    Args:
+        model_path: .pt, .onnx, OpenVINO .xml (or its export directory)
+        confidence: Confidence threshold for detection (0-1)
+        backend: One of BACKENDS
+        classes: COCO class ids to detect
+        iou_threshold: NMS overlap threshold (onnx/openvino)
+        num_threads: CPU threads for onnx/openvino (0 = runtime default)
+
+    Returns:
+        DetectorBackend instance
+    """
+    name = resolve_backend_name(model_path, backend)
+    if name == 'ultralytics':
+        return UltralyticsBackend(model_path, confidence, classes)
+    if name == 'onnx':
+        return OnnxBackend(model_path, confidence, classes, iou_threshold, num_threads)
+    return OpenVinoBackend(model_path, confidence, classes, iou_threshold, num_threads)
@@ -1,75 +1,221 @@
 """YOLO-based person detection."""
 import numpy as np
-from typing import List, Tuple, Optional
-from pathlib import Path
+from typing import List, Sequence, Tuple, Optional
 
-try:
-    from ultralytics import YOLO
-except ImportError:
-    YOLO = None
+from src.core.backends import (
+    PERSON_CLASS_ID,
+    DetectorBackend,
+    create_backend,
+    detections_to_list,
+    resolve_class_ids,
+)
+
+
+def crop_image(
+    image: np.ndarray, crop: Optional[Tuple[int, int, int, int]]
+) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Cut a crop region out of an image.
+
+    Args:
+        image: Full frame
+        crop: (x1, y1, x2, y2) or None for the whole frame
+
+    Returns:
+        (region, (x_offset, y_offset))
+    """
+    if crop is None:
+        return image, (0, 0)
+
+    height, width = image.shape[:2]
+    x1, y1, x2, y2 = crop
+    x1, y1 = max(int(x1), 0), max(int(y1), 0)
+    x2, y2 = min(int(x2), width), min(int(y2), height)
+    if x2 <= x1 or y2 <= y1:
+        return image, (0, 0)
+    return image[y1:y2, x1:x2], (x1, y1)
+
+
+def offset_detections(detections: np.ndarray, offset: Tuple[int, int]) -> np.ndarray:
+    """Map crop-relative boxes back to full-frame coordinates (in place)."""
+    dx, dy = offset
+    if dx or dy:
+        detections[:, [0, 2]] += dx
+        detections[:, [1, 3]] += dy
+    return detections
+
+
+def split_detections(detections: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Split an (N, 6) backend array into persons and objects.
+
+    Returns:
+        (persons as (P, 5) x1, y1, x2, y2, conf;
+         objects as (M, 6) x1, y1, x2, y2, conf, class_id)
+    """
+    is_person = detections[:, 5] == PERSON_CLASS_ID
+    return detections[is_person, :5], detections[~is_person]
 
 
 class PersonDetector:
     """Person detector using YOLOv8."""
 
-    def __init__(self, model_path: str = "yolov8n.pt", confidence: float = 0.5):
+    def __init__(
+        self,
+        model_path: str = "yolov8n.pt",
+        confidence: float = 0.5,
+        backend: str = "auto",
+        nms_iou: float = 0.7,
+        num_threads: int = 0,
+        object_classes: Optional[Sequence] = None
+    ):
         """Initialize person detector.
 
         Args:
-            model_path: Path to YOLO model file
+            model_path: Path to YOLO model file (.pt, .onnx or OpenVINO .xml)
             confidence: Confidence threshold for detection (0-1)
+            backend: 'auto' (by file extension), 'ultralytics', 'onnx' or 'openvino'
+            nms_iou: NMS overlap threshold for the onnx/openvino backends
+            num_threads: CPU threads for onnx/openvino (0 = runtime default)
+            object_classes: Belonging classes (COCO names or ids) detected in
+                the same forward pass, see detect_persons_and_objects()
         """
-        if YOLO is None:
-            raise ImportError(
-                "ultralytics not installed. Run: pip install ultralytics"
-            )
-
         self.model_path = model_path
         self.confidence = confidence
-        self.model: Optional[YOLO] = None
+        self.backend_name = backend
+        self.nms_iou = nms_iou
+        self.num_threads = num_threads
+        self.object_classes = [
+            c for c in resolve_class_ids(object_classes or []) if c != PERSON_CLASS_ID
+        ]
+        self.model: Optional[DetectorBackend] = None
         self._load_model()
 
     def _load_model(self):
         """Load YOLO model."""
         try:
-            print(f"Loading YOLO model: {self.model_path}")
-            self.model = YOLO(self.model_path)
-            print("✅ Model loaded successfully")
+            print(f"Loading YOLO model: {self.model_path} (backend: {self.backend_name})")
+            self.model = create_backend(
+                self.model_path,
+                self.confidence,
+                backend=self.backend_name,
+                classes=[PERSON_CLASS_ID] + self.object_classes,
+                iou_threshold=self.nms_iou,
+                num_threads=self.num_threads
+            )
+            print(f"✅ Model loaded successfully ({self.model.name})")
         except Exception as e:
             print(f"❌ Failed to load model: {e}")
             raise
 
     def detect_persons(
-        self, image: np.ndarray, visualize: bool = False
+        self,
+        image: np.ndarray,
+        visualize: bool = False,
+        crop: Optional[Tuple[int, int, int, int]] = None
     ) -> List[Tuple[int, int, int, int, float]]:
         """Detect persons in an image.
 
         Args:
             image: Input image (BGR format)
             visualize: If True, return annotated image
+            crop: Optional (x1, y1, x2, y2) region to run inference on;
+                boxes are returned in full-frame coordinates
 
         Returns:
             List of detections as (x1, y1, x2, y2, confidence)
         """
+        return detections_to_list(self.detect_persons_array(image, crop=crop))
+
+    def detect_persons_array(
+        self,
+        image: np.ndarray,
+        crop: Optional[Tuple[int, int, int, int]] = None
+    ) -> np.ndarray:
+        """Detect persons and return a compact (N, 5) float32 array.
+
+        Same boxes as detect_persons(), rows (x1, y1, x2, y2, confidence);
+        ROIMatcher.check_occupancy accepts this array directly.
+
+        Args:
+            image: Input image (BGR format)
+            crop: Optional (x1, y1, x2, y2) region to run inference on
+
+        Returns:
+            (N, 5) float32 array in full-frame coordinates
+        """
+        return self.detect_persons_and_objects(image, crop=crop)[0]
+
+    def detect_persons_and_objects(
+        self,
+        image: np.ndarray,
+        crop: Optional[Tuple[int, int, int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Detect persons and belongings (object_classes) in one forward pass.
+
+        Args:
+            image: Input image (BGR format)
+            crop: Optional (x1, y1, x2, y2) region to run inference on
+
+        Returns:
+            (persons (N, 5), objects (M, 6) with class_id in the last column)
+        """
+        return split_detections(self.detect_batch([image], [crop])[0])
+
+    def detect_persons_batch(
+        self,
+        images: List[np.ndarray],
+        crops: Optional[List[Optional[Tuple[int, int, int, int]]]] = None
+    ) -> List[List[Tuple[int, int, int, int, float]]]:
+        """Detect persons in several images with a single forward pass.
+
+        Args:
+            images: Input images (BGR format), may differ in size
+            crops: Optional crop region per image (see detect_persons)
+
+        Returns:
+            One detection list per input image, in the same order
+        """
+        return [detections_to_list(d) for d in self.detect_persons_batch_array(images, crops)]
+
+    def detect_persons_batch_array(
+        self,
+        images: List[np.ndarray],
+        crops: Optional[List[Optional[Tuple[int, int, int, int]]]] = None
+    ) -> List[np.ndarray]:
+        """Batch variant of detect_persons_array().
+
+        Args:
+            images: Input images (BGR format), may differ in size
+            crops: Optional crop region per image (see detect_persons)
+
+        Returns:
+            One (N, 5) float32 array per input image, in the same order
+        """
+        return [split_detections(d)[0] for d in self.detect_batch(images, crops)]
+
+    def detect_batch(
+        self,
+        images: List[np.ndarray],
+        crops: Optional[List[Optional[Tuple[int, int, int, int]]]] = None
+    ) -> List[np.ndarray]:
+        """Run one forward pass and return raw (N, 6) arrays per image.
+
+        Rows are (x1, y1, x2, y2, confidence, class_id) for persons and
+        object_classes, in full-frame coordinates.
+        """
         if self.model is None:
             raise RuntimeError("Model not loaded")
 
-        # Run inference
-        results = self.model(image, conf=self.confidence, verbose=False)
-
-        detections = []
-        for result in results:
-            boxes = result.boxes
+        if not images:
+            return []
 
-            # Filter for person class (class_id = 0 in COCO dataset)
-            for box in boxes:
-                class_id = int(box.cls[0])
-                if class_id == 0:  # Person class
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    conf = float(box.conf[0])
-                    detections.append((int(x1), int(y1), int(x2), int(y2), conf))
+        crops = crops or [None] * len(images)
+        regions, offsets = zip(*(crop_image(image, crop) for image, crop in zip(images, crops)))
 
-        return detections
+        results = self.model.predict(list(regions))
+        return [
+            offset_detections(detections, offset)
+            for detections, offset in zip(results, offsets)
+        ]
 
     def annotate_image(
         self, image: np.ndarray, detections: List[Tuple[int, int, int, int, float]]
@@ -119,5 +265,6 @@ class PersonDetector:
         return {
             "model_path": self.model_path,
             "confidence": self.confidence,
-            "device": str(self.model.device),
+            "object_classes": self.object_classes,
+            **self.model.info(),
         }
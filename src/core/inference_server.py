@@ -0,0 +1,472 @@
+"""Shared batched inference server for channel workers.
+
+A single process owns the YOLO model and serves detection requests from all
+channel workers through multiprocessing queues. Frames that arrive within a
+short deadline are stacked into one forward pass, so memory stays flat as the
+number of channels grows.
+
+BatchingDetector does the same for channel workers running as threads in
+one process (DVR mode), without the extra process and queue pickling.
+"""
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from multiprocessing import Process, Queue, Event
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.backends import detections_to_list
+from src.core.detector import crop_image, offset_detections, split_detections
+
+
+def collect_batch(source, max_batch_size: int, batch_timeout: float, poll_timeout: float = 0.5) -> list:
+    """Wait for the first request, then gather more until the deadline.
+
+    Args:
+        source: queue.Queue or multiprocessing Queue of requests
+        max_batch_size: Maximum requests per batch
+        batch_timeout: Seconds to wait for more requests after the first
+        poll_timeout: Seconds to wait for the first request
+
+    Returns:
+        List of requests (empty if none arrived within poll_timeout)
+    """
+    try:
+        first = source.get(timeout=poll_timeout)
+    except queue.Empty:
+        return []
+
+    batch = [first]
+    deadline = time.time() + batch_timeout
+    while len(batch) < max_batch_size:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(source.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+class _BatchedDetectorInterface(ABC):
+    """PersonDetector-compatible wrappers around detect_persons_and_objects()."""
+
+    def detect_persons(
+        self,
+        image: np.ndarray,
+        visualize: bool = False,
+        crop: Optional[Tuple[int, int, int, int]] = None
+    ) -> List[Tuple[int, int, int, int, float]]:
+        """Detect persons in a frame through the shared batched model.
+
+        Args:
+            image: Input image (BGR format)
+            visualize: Unused, kept for PersonDetector compatibility
+            crop: Optional (x1, y1, x2, y2) region; only this region is
+                inferred, boxes come back in full-frame coordinates
+
+        Returns:
+            List of detections as (x1, y1, x2, y2, confidence)
+
+        Raises:
+            TimeoutError: If no result arrives in time
+            RuntimeError: If inference failed
+        """
+        return detections_to_list(self.detect_persons_array(image, crop=crop))
+
+    def detect_persons_array(
+        self,
+        image: np.ndarray,
+        crop: Optional[Tuple[int, int, int, int]] = None
+    ) -> np.ndarray:
+        """Like detect_persons(), but returns an (N, 5) float32 array."""
+        return self.detect_persons_and_objects(image, crop=crop)[0]
+
+    @abstractmethod
+    def detect_persons_and_objects(
+        self,
+        image: np.ndarray,
+        crop: Optional[Tuple[int, int, int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Persons (N, 5) and belongings (M, 6) in full-frame coordinates."""
+
+
+class InferenceClient(_BatchedDetectorInterface):
+    """Detector proxy used inside a channel worker process.
+
+    Exposes the same ``detect_persons`` / ``detect_persons_array`` /
+    ``detect_persons_and_objects`` interface as ``PersonDetector`` so
+    ``ChannelWorker`` can use either one transparently.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        request_queue: Queue,
+        response_queue: Queue,
+        request_timeout: float = 30.0
+    ):
+        """Initialize inference client.
+
+        Args:
+            client_id: Unique client key (e.g., 'oryudong_channel_11')
+            request_queue: Shared queue consumed by the inference server
+            response_queue: Queue on which this client receives results
+            request_timeout: Seconds to wait for a detection result
+        """
+        self.client_id = client_id
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self.request_timeout = request_timeout
+        self._seq = 0
+        self._pid: Optional[int] = None
+
+    def detect_persons_and_objects(
+        self,
+        image: np.ndarray,
+        crop: Optional[Tuple[int, int, int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Persons (N, 5) and belongings (M, 6) from the server's single pass.
+
+        Raises:
+            TimeoutError: If the server does not answer in time
+            RuntimeError: If inference failed on the server
+        """
+        # Sequence numbers are per process, so a restarted worker never
+        # mistakes a late answer meant for its predecessor for its own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._seq = self._pid << 32
+        self._seq += 1
+        seq = self._seq
+        deadline = time.time() + self.request_timeout
+        region, offset = crop_image(image, crop)
+
+        try:
+            self.request_queue.put((self.client_id, seq, region), timeout=self.request_timeout)
+        except queue.Full:
+            raise TimeoutError("Inference request queue is full")
+
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"No inference result within {self.request_timeout}s"
+                )
+            try:
+                resp_seq, detections, error = self.response_queue.get(timeout=remaining)
+            except queue.Empty:
+                continue
+
+            # Drop late answers to requests that already timed out
+            if resp_seq != seq:
+                continue
+            if error:
+                raise RuntimeError(f"Inference server error: {error}")
+            return split_detections(offset_detections(detections, offset))
+
+    def get_model_info(self) -> dict:
+        """Get model information."""
+        return {"client_id": self.client_id, "shared": True}
+
+
+class InferenceServer:
+    """Process that owns one detector and batches requests from many clients."""
+
+    def __init__(
+        self,
+        model_path: str,
+        confidence: float,
+        backend: str = "auto",
+        nms_iou: float = 0.7,
+        num_threads: int = 0,
+        object_classes: Optional[List] = None,
+        max_batch_size: int = 8,
+        batch_timeout_ms: int = 50,
+        request_timeout: float = 30.0,
+        max_pending: int = 64
+    ):
+        """Initialize inference server.
+
+        Args:
+            model_path: Path to YOLO model file
+            confidence: Confidence threshold for detection (0-1)
+            backend: Detector backend (see PersonDetector)
+            nms_iou: NMS overlap threshold for the onnx/openvino backends
+            num_threads: CPU threads for onnx/openvino (0 = runtime default)
+            object_classes: Belonging classes detected alongside persons
+            max_batch_size: Maximum frames per forward pass
+            batch_timeout_ms: How long to wait for more frames after the first
+            request_timeout: Seconds a client waits for its result
+            max_pending: Maximum queued requests before clients block
+        """
+        self.model_path = model_path
+        self.confidence = confidence
+        self.backend = backend
+        self.nms_iou = nms_iou
+        self.num_threads = num_threads
+        self.object_classes = object_classes
+        self.max_batch_size = max_batch_size
+        self.batch_timeout = batch_timeout_ms / 1000.0
+        self.request_timeout = request_timeout
+        self.max_pending = max_pending
+
+        self.request_queue: Queue = Queue(maxsize=max_pending)
+        self.response_queues: Dict[str, Queue] = {}
+        self.stop_event = Event()
+        self.process: Optional[Process] = None
+
+    def register_client(self, client_id: str) -> InferenceClient:
+        """Create a client for one channel worker.
+
+        Must be called before ``start()`` so the response queue is shared
+        with the server process.
+
+        Args:
+            client_id: Unique client key
+
+        Returns:
+            InferenceClient to hand to the channel worker
+        """
+        if self.process is not None:
+            raise RuntimeError("Clients must be registered before the server starts")
+
+        response_queue = Queue()
+        self.response_queues[client_id] = response_queue
+        return InferenceClient(
+            client_id,
+            self.request_queue,
+            response_queue,
+            request_timeout=self.request_timeout
+        )
+
+    def start(self):
+        """Start the inference server process."""
+        self.process = Process(target=self.run, name="InferenceServer")
+        self.process.start()
+
+    def restart(self) -> Dict[str, InferenceClient]:
+        """Start a fresh server process on new queues.
+
+        A killed server may leave a queue's internal lock held, so the old
+        queues are abandoned rather than reused. Clients holding them are
+        stale; the returned replacements must be handed to new workers.
+
+        Returns:
+            Dictionary mapping client_id to its new InferenceClient
+        """
+        if self.process is not None and self.process.is_alive():
+            self.stop()
+        client_ids = list(self.response_queues)
+        self.request_queue = Queue(maxsize=self.max_pending)
+        self.response_queues = {}
+        self.stop_event = Event()
+        self.process = None
+        clients = {client_id: self.register_client(client_id) for client_id in client_ids}
+        self.start()
+        return clients
+
+    def stop(self, timeout: float = 10):
+        """Stop the inference server process."""
+        self.stop_event.set()
+        if self.process is not None:
+            self.process.join(timeout=timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=5)
+
+    def run(self):
+        """Server loop (runs inside the server process)."""
+        from src.core.detector import PersonDetector
+        from src.utils.logger import StructuredLogger, PerformanceMonitor
+
+        logger = StructuredLogger(component="inference_server")
+        perf_monitor = PerformanceMonitor(logger, report_interval=60)
+
+        detector = PersonDetector(
+            model_path=self.model_path,
+            confidence=self.confidence,
+            backend=self.backend,
+            nms_iou=self.nms_iou,
+            num_threads=self.num_threads,
+            object_classes=self.object_classes
+        )
+        logger.info(
+            "Inference server ready",
+            model_path=self.model_path,
+            backend=detector.model.name,
+            clients=len(self.response_queues),
+            max_batch_size=self.max_batch_size,
+            batch_timeout_ms=int(self.batch_timeout * 1000)
+        )
+
+        try:
+            while not self.stop_event.is_set():
+                batch = collect_batch(self.request_queue, self.max_batch_size, self.batch_timeout)
+                if not batch:
+                    continue
+
+                start_time = time.time()
+                try:
+                    results = detector.detect_batch([frame for _, _, frame in batch])
+                    errors = [None] * len(batch)
+                except Exception as e:
+                    logger.error("Batch inference failed", batch_size=len(batch), error=str(e))
+                    perf_monitor.record_error()
+                    results = [None for _ in batch]
+                    errors = [str(e)] * len(batch)
+
+                batch_time_ms = (time.time() - start_time) * 1000
+                for _ in batch:
+                    perf_monitor.record_frame(batch_time_ms / len(batch))
+
+                for (client_id, seq, _), detections, error in zip(batch, results, errors):
+                    response_queue = self.response_queues.get(client_id)
+                    if response_queue is None:
+                        logger.warning("Unknown inference client", client_id=client_id)
+                        continue
+                    response_queue.put((seq, detections, error))
+        finally:
+            perf_monitor.report()
+            logger.info("Inference server stopped")
+
+
+class _PendingRequest:
+    """One frame waiting in BatchingDetector."""
+
+    __slots__ = ('region', 'done', 'detections', 'error')
+
+    def __init__(self, region: np.ndarray):
+        self.region = region
+        self.done = threading.Event()
+        self.detections: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+class BatchingDetector(_BatchedDetectorInterface):
+    """In-process detector shared by channel worker threads.
+
+    Threads call ``detect_persons_and_objects`` concurrently; a dispatcher
+    thread stacks the frames that arrive within batch_timeout_ms into one
+    forward pass, like InferenceServer does across processes. Only the
+    dispatcher touches the model, so backends need not be thread-safe.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        confidence: float,
+        backend: str = "auto",
+        nms_iou: float = 0.7,
+        num_threads: int = 0,
+        object_classes: Optional[List] = None,
+        max_batch_size: int = 8,
+        batch_timeout_ms: int = 50,
+        request_timeout: float = 30.0
+    ):
+        """Initialize batching detector (arguments as for InferenceServer)."""
+        from src.core.detector import PersonDetector
+
+        self.detector = PersonDetector(
+            model_path=model_path,
+            confidence=confidence,
+            backend=backend,
+            nms_iou=nms_iou,
+            num_threads=num_threads,
+            object_classes=object_classes
+        )
+        self.max_batch_size = max_batch_size
+        self.batch_timeout = batch_timeout_ms / 1000.0
+        self.request_timeout = request_timeout
+
+        self._requests: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.metrics = {'batches': 0, 'frames': 0, 'errors': 0, 'last_batch_ms': 0.0}
+
+    def start(self):
+        """Start the dispatcher thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="BatchingDetector", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Stop the dispatcher; waiting callers get an error."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            request.error = "Detector stopped"
+            request.done.set()
+
+    def is_alive(self) -> bool:
+        """Whether the dispatcher thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """Dispatcher loop (runs in the background thread)."""
+        while not self._stop_event.is_set():
+            batch = collect_batch(self._requests, self.max_batch_size, self.batch_timeout)
+            if not batch:
+                continue
+
+            start_time = time.time()
+            try:
+                results = self.detector.detect_batch([request.region for request in batch])
+                for request, detections in zip(batch, results):
+                    request.detections = detections
+            except Exception as e:
+                self.metrics['errors'] += 1
+                for request in batch:
+                    request.error = str(e)
+            self.metrics['batches'] += 1
+            self.metrics['frames'] += len(batch)
+            self.metrics['last_batch_ms'] = (time.time() - start_time) * 1000
+
+            for request in batch:
+                request.done.set()
+
+    def detect_persons_and_objects(
+        self,
+        image: np.ndarray,
+        crop: Optional[Tuple[int, int, int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Persons (N, 5) and belongings (M, 6) from the shared batched pass.
+
+        Raises:
+            TimeoutError: If the batch does not finish in time
+            RuntimeError: If inference failed
+        """
+        region, offset = crop_image(image, crop)
+        request = _PendingRequest(region)
+        self._requests.put(request)
+
+        if not request.done.wait(self.request_timeout):
+            raise TimeoutError(f"No inference result within {self.request_timeout}s")
+        if request.error:
+            raise RuntimeError(f"Batched inference error: {request.error}")
+        return split_detections(offset_detections(request.detections, offset))
+
+    def get_model_info(self) -> dict:
+        """Get model information."""
+        return {**self.detector.get_model_info(), "shared": True, "batched": True}
+
+    def get_stats(self) -> dict:
+        """Batching metrics for the performance report."""
+        frames, batches = self.metrics['frames'], self.metrics['batches']
+        return {
+            'batches': batches,
+            'avg_batch_size': round(frames / batches, 2) if batches else 0.0,
+            'errors': self.metrics['errors'],
+            'last_batch_ms': round(self.metrics['last_batch_ms'], 2),
+            'pending': self._requests.qsize(),
+        }
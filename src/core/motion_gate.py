@@ -0,0 +1,110 @@
+"""Cheap frame-difference gate in front of person detection."""
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Decide whether a frame needs YOLO inference.
+
+    Frames are downscaled to grayscale and compared with the frame of the
+    last inference, restricted to the seat ROIs. If no seat shows a
+    meaningful fraction of changed pixels, the previous occupancy result can
+    be reused. A full inference is still forced every force_interval seconds.
+    """
+
+    def __init__(
+        self,
+        seats: List[Dict],
+        resolution: Tuple[int, int],
+        scale: float = 0.25,
+        pixel_threshold: int = 25,
+        change_ratio: float = 0.02,
+        force_interval: float = 30.0
+    ):
+        """Initialize motion gate.
+
+        Args:
+            seats: Seat configs from ROIMatcher.seats
+            resolution: ROI coordinate space (width, height)
+            scale: Downscale factor for differencing
+            pixel_threshold: Gray-level difference that counts as changed
+            change_ratio: Fraction of changed pixels in a seat that triggers inference
+            force_interval: Seconds after which inference always runs
+        """
+        self.scale = scale
+        self.pixel_threshold = pixel_threshold
+        self.change_ratio = change_ratio
+        self.force_interval = force_interval
+
+        width, height = resolution
+        self.size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+
+        # Per-seat (slice, mask) at the downscaled size
+        self.seat_masks: List[Tuple[str, Tuple[slice, slice], np.ndarray, int]] = []
+        for seat in seats:
+            mask = np.zeros((self.size[1], self.size[0]), dtype=np.uint8)
+            if seat.get('type', 'rectangle') == 'polygon':
+                points = np.round(np.asarray(seat['roi'], dtype=np.float64) * scale).astype(np.int32)
+                cv2.fillPoly(mask, [points], 1)
+            else:
+                x1, y1, x2, y2 = (int(round(v * scale)) for v in seat['roi'][:4])
+                mask[max(y1, 0):max(y2, 0), max(x1, 0):max(x2, 0)] = 1
+
+            ys, xs = np.nonzero(mask)
+            if len(xs) == 0:
+                continue
+            window = (slice(ys.min(), ys.max() + 1), slice(xs.min(), xs.max() + 1))
+            seat_mask = mask[window].astype(bool)
+            self.seat_masks.append((seat['id'], window, seat_mask, int(seat_mask.sum())))
+
+        self._reference: Optional[np.ndarray] = None
+        self._current: Optional[np.ndarray] = None
+        self._last_inference = 0.0
+        self.last_change_ratio = 0.0
+        self.last_changed_seat: Optional[str] = None
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale to grayscale and blur away sensor noise."""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (3, 3), 0)
+
+    def should_run(self, frame: np.ndarray, now: Optional[float] = None) -> bool:
+        """Check whether any seat ROI changed since the last inference.
+
+        Args:
+            frame: Current frame (BGR)
+            now: Current time (defaults to time.time())
+
+        Returns:
+            True if inference should run on this frame
+        """
+        now = time.time() if now is None else now
+        self._current = self._prepare(frame)
+
+        if self._reference is None:
+            return True
+        if now - self._last_inference >= self.force_interval:
+            return True
+
+        changed = cv2.absdiff(self._current, self._reference) > self.pixel_threshold
+
+        self.last_change_ratio = 0.0
+        self.last_changed_seat = None
+        for seat_id, window, seat_mask, area in self.seat_masks:
+            ratio = np.count_nonzero(changed[window] & seat_mask) / area
+            if ratio > self.last_change_ratio:
+                self.last_change_ratio = ratio
+                self.last_changed_seat = seat_id
+            if ratio >= self.change_ratio:
+                return True
+        return False
+
+    def mark_inferred(self, now: Optional[float] = None):
+        """Use the frame passed to the last should_run() as the new reference."""
+        self._reference = self._current
+        self._last_inference = time.time() if now is None else now
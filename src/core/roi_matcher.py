@@ -1,12 +1,30 @@
 """ROI (Region of Interest) matching for seat occupancy detection."""
 import json
+import hashlib
+import math
+import os
 import numpy as np
-from typing import List, Tuple, Dict, Union
+from typing import List, Tuple, Dict, Union, Optional
 from pathlib import Path
 
+from .boxes import iou_matrix
+
 
 class ROIMatcher:
-    """Match person detections with seat ROIs."""
+    """Match person detections with seat ROIs.
+
+    Polygon edges and rectangle boxes are packed into NumPy arrays when the
+    config is loaded, so check_occupancy() tests every detection against
+    every seat in one batched operation.
+
+    Optionally, build_label_map() rasterizes all polygons into an int16
+    label image so a foot point resolves to its seat with one array index.
+    """
+
+    # Label map values (>= 0 is the polygon seat row)
+    LABEL_NONE = -1
+    LABEL_EXACT = -2  # Boundary or overlap cell: fall back to polygon test
+    LABEL_MAP_VERSION = 1
 
     def __init__(self, roi_config: Union[Path, Dict, None] = None):
         """Initialize ROI matcher.
@@ -18,6 +36,9 @@ class ROIMatcher:
         self.seats = []
         self.camera_id = None
         self.resolution = None
+        self._match_index: Optional[Dict[str, np.ndarray]] = None
+        self._label_map: Optional[np.ndarray] = None
+        self._label_map_downsample = 1
 
         if roi_config is not None:
             if isinstance(roi_config, dict):
@@ -37,6 +58,7 @@ class ROIMatcher:
         self.camera_id = config.get('camera_id')
         self.resolution = config.get('resolution')
         self.seats = config.get('seats', [])
+        self._build_match_index()
 
         print(f"✅ Loaded ROI config: {len(self.seats)} seats")
 
@@ -152,84 +174,428 @@ class ROIMatcher:
 
         return inside
 
+    def _build_match_index(self):
+        """Precompute polygon edge arrays and rectangle boxes for matching.
+
+        Polygons with fewer vertices than the largest one are padded with
+        invalid edges that never toggle the ray-casting parity.
+        """
+        poly_idx = [i for i, seat in enumerate(self.seats)
+                    if seat.get('type', 'rectangle') == 'polygon']
+        rect_idx = [i for i, seat in enumerate(self.seats)
+                    if seat.get('type', 'rectangle') != 'polygon']
+
+        max_vertices = max((len(self.seats[i]['roi']) for i in poly_idx), default=0)
+        p1 = np.zeros((len(poly_idx), max_vertices, 2), dtype=np.float64)
+        p2 = np.zeros((len(poly_idx), max_vertices, 2), dtype=np.float64)
+        valid = np.zeros((len(poly_idx), max_vertices), dtype=bool)
+
+        for row, seat_idx in enumerate(poly_idx):
+            points = np.asarray(self.seats[seat_idx]['roi'], dtype=np.float64).reshape(-1, 2)
+            n = len(points)
+            # Edges (0,1), (1,2), ..., (n-1,0) as in point_in_polygon()
+            p1[row, :n] = points
+            p2[row, :n] = np.roll(points, -1, axis=0)
+            valid[row, :n] = True
+
+        # Seat geometry changed; any raster is out of date
+        self._label_map = None
+
+        self._match_index = {
+            'poly_idx': np.asarray(poly_idx, dtype=np.intp),
+            'rect_idx': np.asarray(rect_idx, dtype=np.intp),
+            'x1': p1[..., 0], 'y1': p1[..., 1],
+            'dx': p2[..., 0] - p1[..., 0],
+            'dy': p2[..., 1] - p1[..., 1],
+            'ymin': np.minimum(p1[..., 1], p2[..., 1]),
+            'ymax': np.maximum(p1[..., 1], p2[..., 1]),
+            'xmax': np.maximum(p1[..., 0], p2[..., 0]),
+            'vertical': p1[..., 0] == p2[..., 0],
+            'valid': valid,
+            'rects': np.asarray(
+                [self.seats[i]['roi'][:4] for i in rect_idx], dtype=np.float64
+            ).reshape(-1, 4),
+        }
+
+    def points_in_polygons(self, points: np.ndarray, rows=None) -> np.ndarray:
+        """Test many points against all polygon seats at once.
+
+        Same ray-casting rule as point_in_polygon(), evaluated for every
+        (polygon, edge, point) triple with NumPy broadcasting.
+
+        Args:
+            points: Array of shape (P, 2) with (x, y) coordinates
+            rows: Optional polygon rows to test (default: all polygon seats)
+
+        Returns:
+            Boolean array of shape (num_polygon_seats, P)
+        """
+        if self._match_index is None:
+            self._build_match_index()
+        idx = self._match_index
+        rows = slice(None) if rows is None else rows
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        x = points[:, 0][None, None, :]
+        y = points[:, 1][None, None, :]
+
+        x1 = idx['x1'][rows][..., None]
+        y1 = idx['y1'][rows][..., None]
+        dx = idx['dx'][rows][..., None]
+        dy = idx['dy'][rows][..., None]
+
+        straddles = (
+            idx['valid'][rows][..., None]
+            & (y > idx['ymin'][rows][..., None])
+            & (y <= idx['ymax'][rows][..., None])
+            & (x <= idx['xmax'][rows][..., None])
+        )
+        # Horizontal edges never straddle, so their inf/nan is masked out
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_inters = (y - y1) * dx / dy + x1
+        crossings = straddles & (idx['vertical'][rows][..., None] | (x <= x_inters))
+
+        return np.logical_xor.reduce(crossings, axis=1)
+
+    def config_hash(self) -> str:
+        """Stable hash of the seat geometry (ids, types, ROIs, resolution)."""
+        payload = {
+            'resolution': self.resolution,
+            'seats': [
+                [str(seat['id']), seat.get('type', 'rectangle'), seat['roi']]
+                for seat in self.seats
+            ]
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+    def build_label_map(
+        self,
+        downsample: int = 1,
+        cache_dir: Union[Path, str, None] = None
+    ) -> np.ndarray:
+        """Rasterize polygon seats into an int16 label image.
+
+        Each cell holds the polygon seat row whose polygon contains it,
+        LABEL_NONE if no seat does, or LABEL_EXACT for cells crossed by a
+        polygon edge or covered by more than one seat. Foot points in
+        LABEL_EXACT cells are resolved with the exact polygon test, so
+        check_occupancy() results do not change. Overlap handling is
+        therefore deterministic and independent of seat order.
+
+        Args:
+            downsample: Cell size in pixels (1 = full resolution)
+            cache_dir: Directory for .npy cache keyed by config hash
+
+        Returns:
+            Label image of shape (ceil(height/downsample), ceil(width/downsample))
+        """
+        if self._match_index is None:
+            self._build_match_index()
+        idx = self._match_index
+        downsample = max(1, int(downsample))
+
+        if self.resolution:
+            width, height = int(self.resolution[0]), int(self.resolution[1])
+        else:
+            # No resolution configured: cover all polygon vertices
+            xs = [p[0] for i in idx['poly_idx'] for p in self.seats[i]['roi']] or [0]
+            ys = [p[1] for i in idx['poly_idx'] for p in self.seats[i]['roi']] or [0]
+            width, height = int(max(xs)) + 1, int(max(ys)) + 1
+
+        cache_path = None
+        if cache_dir is not None:
+            key = f"{self.config_hash()}:{downsample}:{self.LABEL_MAP_VERSION}"
+            key_hash = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+            cache_path = Path(cache_dir) / f"label_map_{key_hash}.npy"
+            if cache_path.exists():
+                try:
+                    label_map = np.load(cache_path)
+                    self._label_map = label_map
+                    self._label_map_downsample = downsample
+                    return label_map
+                except Exception as e:
+                    print(f"⚠️  Ignoring unreadable label map cache {cache_path}: {e}")
+
+        label_map = self._rasterize_polygons(width, height, downsample)
+
+        if cache_path is not None:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp.npy")
+                np.save(tmp_path, label_map)
+                os.replace(tmp_path, cache_path)
+            except Exception as e:
+                print(f"⚠️  Failed to cache label map: {e}")
+
+        self._label_map = label_map
+        self._label_map_downsample = downsample
+        return label_map
+
+    def _rasterize_polygons(self, width: int, height: int, downsample: int) -> np.ndarray:
+        """Build the label image by testing cell centers against each polygon."""
+        idx = self._match_index
+        num_polygons = len(idx['poly_idx'])
+        if num_polygons >= np.iinfo(np.int16).max:
+            raise ValueError(f"Too many polygon seats for int16 label map: {num_polygons}")
+
+        rows_n = math.ceil(height / downsample)
+        cols_n = math.ceil(width / downsample)
+        label_map = np.full((rows_n, cols_n), self.LABEL_NONE, dtype=np.int16)
+        coverage = np.zeros((rows_n, cols_n), dtype=np.uint8)
+        boundary = np.zeros((rows_n, cols_n), dtype=bool)
+
+        for row in range(num_polygons):
+            polygon = np.asarray(
+                self.seats[idx['poly_idx'][row]]['roi'], dtype=np.float64
+            ).reshape(-1, 2)
+
+            # Interior: test cell centers inside the polygon's bounding box
+            c0 = max(int(polygon[:, 0].min() // downsample), 0)
+            c1 = min(int(polygon[:, 0].max() // downsample) + 1, cols_n)
+            r0 = max(int(polygon[:, 1].min() // downsample), 0)
+            r1 = min(int(polygon[:, 1].max() // downsample) + 1, rows_n)
+            if c0 < c1 and r0 < r1:
+                cc, rr = np.meshgrid(np.arange(c0, c1), np.arange(r0, r1))
+                centers = np.stack(
+                    [(cc.ravel() + 0.5) * downsample, (rr.ravel() + 0.5) * downsample], axis=1
+                )
+                inside = self.points_in_polygons(centers, rows=[row])[0].reshape(cc.shape)
+
+                window = label_map[r0:r1, c0:c1]
+                window[inside & (coverage[r0:r1, c0:c1] == 0)] = row
+                coverage[r0:r1, c0:c1] += inside
+
+            # Boundary: every cell an edge passes through, plus its neighbours.
+            # Samples every half cell keep each edge point within a quarter
+            # cell of a sample, so the 3x3 dilation covers all crossed cells.
+            for start, end in zip(polygon, np.roll(polygon, -1, axis=0)):
+                length = float(np.hypot(*(end - start)))
+                steps = max(int(math.ceil(length / (0.5 * downsample))), 1) + 1
+                t = np.linspace(0.0, 1.0, steps)[:, None]
+                samples = start + t * (end - start)
+                sample_cols = np.floor(samples[:, 0] / downsample).astype(np.int64)
+                sample_rows = np.floor(samples[:, 1] / downsample).astype(np.int64)
+                for dr in (-1, 0, 1):
+                    for dc in (-1, 0, 1):
+                        r = sample_rows + dr
+                        c = sample_cols + dc
+                        ok = (r >= 0) & (r < rows_n) & (c >= 0) & (c < cols_n)
+                        boundary[r[ok], c[ok]] = True
+
+        label_map[coverage > 1] = self.LABEL_EXACT
+        label_map[boundary] = self.LABEL_EXACT
+        return label_map
+
+    def _lookup_label_map(self, points: np.ndarray) -> np.ndarray:
+        """Resolve points to polygon seats via the label map.
+
+        Returns:
+            Boolean array of shape (num_polygon_seats, P), same as
+            points_in_polygons()
+        """
+        label_map = self._label_map
+        num_polygons = len(self._match_index['poly_idx'])
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+        cols = np.floor(points[:, 0] / self._label_map_downsample).astype(np.int64)
+        rows = np.floor(points[:, 1] / self._label_map_downsample).astype(np.int64)
+        in_bounds = (
+            (rows >= 0) & (rows < label_map.shape[0])
+            & (cols >= 0) & (cols < label_map.shape[1])
+        )
+
+        labels = np.full(len(points), self.LABEL_EXACT, dtype=np.int16)
+        labels[in_bounds] = label_map[rows[in_bounds], cols[in_bounds]]
+
+        inside = np.zeros((num_polygons, len(points)), dtype=bool)
+        direct = np.flatnonzero(labels >= 0)
+        inside[labels[direct], direct] = True
+
+        exact = np.flatnonzero(labels == self.LABEL_EXACT)
+        if len(exact):
+            inside[:, exact] = self.points_in_polygons(points[exact])
+        return inside
+
+    def box_ious(self, boxes: np.ndarray) -> np.ndarray:
+        """Compute IoU of every rectangle seat against every box.
+
+        Args:
+            boxes: Array of shape (P, 4) with (x1, y1, x2, y2)
+
+        Returns:
+            Float array of shape (num_rectangle_seats, P)
+        """
+        if self._match_index is None:
+            self._build_match_index()
+        return iou_matrix(self._match_index['rects'], boxes)
+
+    def seats_containing(self, points: np.ndarray) -> np.ndarray:
+        """Test points against every seat ROI (polygons and rectangles).
+
+        Args:
+            points: Array of shape (P, 2) with (x, y) coordinates
+
+        Returns:
+            Boolean array of shape (num_seats, P), rows in self.seats order
+        """
+        if self._match_index is None:
+            self._build_match_index()
+        idx = self._match_index
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        inside = np.zeros((len(self.seats), len(points)), dtype=bool)
+        if not len(points):
+            return inside
+
+        if len(idx['poly_idx']):
+            if self._label_map is not None:
+                inside[idx['poly_idx']] = self._lookup_label_map(points)
+            else:
+                inside[idx['poly_idx']] = self.points_in_polygons(points)
+
+        if len(idx['rect_idx']):
+            rects = idx['rects']
+            x, y = points[:, 0][None, :], points[:, 1][None, :]
+            inside[idx['rect_idx']] = (
+                (x >= rects[:, 0:1]) & (x <= rects[:, 2:3])
+                & (y >= rects[:, 1:2]) & (y <= rects[:, 3:4])
+            )
+        return inside
+
     def check_occupancy(
         self,
-        person_detections: List[Tuple[int, int, int, int, float]],
-        iou_threshold: float = 0.3
+        person_detections: Union[List[Tuple[int, int, int, int, float]], np.ndarray],
+        iou_threshold: float = 0.3,
+        object_detections: Optional[np.ndarray] = None
     ) -> Dict[str, str]:
         """Check seat occupancy based on person detections.
 
+        Polygon seats are occupied when a person's bottom center (where
+        their feet are) lies inside the polygon; rectangle seats when the
+        IoU with a person box exceeds the threshold. The first matching
+        detection (in input order) is reported as matched_detection.
+
+        Belongings are attributed to the seat whose ROI contains the
+        object's box center.
+
         Args:
-            person_detections: List of (x1, y1, x2, y2, confidence) from YOLO
+            person_detections: List of (x1, y1, x2, y2, confidence) from YOLO,
+                or the (N, 5) array from PersonDetector.detect_persons_array
             iou_threshold: Minimum IoU to consider seat occupied
+            object_detections: Optional (M, 6) belongings array from
+                PersonDetector.detect_persons_and_objects
 
         Returns:
-            Dictionary mapping seat_id to status ("occupied" or "empty")
+            Dictionary mapping seat_id to status ("occupied" or "empty"),
+            plus object_detected / matched_object per seat
         """
-        results = {}
-
-        for seat in self.seats:
-            seat_id = seat['id']
-            seat_type = seat.get('type', 'rectangle')
-
-            occupied = False
-            max_iou = 0.0
-
-            if seat_type == 'polygon':
-                # Polygon-based detection: check if person's bottom center is in polygon
-                polygon = seat['roi']
-
-                for person_box in person_detections:
-                    x1, y1, x2, y2 = person_box[:4]
-                    # Person's bottom center point (where their feet are)
-                    person_bottom_center = ((x1 + x2) / 2, y2)
-
-                    if self.point_in_polygon(person_bottom_center, polygon):
-                        occupied = True
-                        max_iou = 1.0  # Full match
-                        break
+        if self._match_index is None:
+            self._build_match_index()
+        idx = self._match_index
+
+        num_seats = len(self.seats)
+        occupied = np.zeros(num_seats, dtype=bool)
+        max_iou = np.zeros(num_seats, dtype=np.float64)
+        matched = np.full(num_seats, -1, dtype=np.intp)
+
+        num_persons = len(person_detections)
+        if num_persons:
+            if isinstance(person_detections, np.ndarray):
+                boxes = person_detections[:, :4].astype(np.float64)
             else:
-                # Rectangle-based detection: use IoU
-                seat_box = tuple(seat['roi'])  # (x1, y1, x2, y2)
-
-                for person_box in person_detections:
-                    person_bbox = person_box[:4]
-                    iou = self.calculate_iou(person_bbox, seat_box)
-
-                    if iou > max_iou:
-                        max_iou = iou
-
-                    if iou > iou_threshold:
-                        occupied = True
-                        break
-
-            # Store matched detection for event logging
-            matched_detection = None
-            if occupied and person_detections:
-                # Find the detection that matched this seat
-                for person_box in person_detections:
-                    if seat_type == 'polygon':
-                        x1, y1, x2, y2 = person_box[:4]
-                        person_bottom_center = ((x1 + x2) / 2, y2)
-                        if self.point_in_polygon(person_bottom_center, seat['roi']):
-                            matched_detection = person_box
-                            break
-                    else:
-                        person_bbox = person_box[:4]
-                        iou = self.calculate_iou(person_bbox, tuple(seat['roi']))
-                        if iou > iou_threshold:
-                            matched_detection = person_box
-                            break
+                boxes = np.asarray(
+                    [tuple(det[:4]) for det in person_detections], dtype=np.float64
+                ).reshape(-1, 4)
+
+            if len(idx['poly_idx']):
+                bottom_centers = np.stack(
+                    [(boxes[:, 0] + boxes[:, 2]) / 2, boxes[:, 3]], axis=1
+                )
+                if self._label_map is not None:
+                    inside = self._lookup_label_map(bottom_centers)
+                else:
+                    inside = self.points_in_polygons(bottom_centers)
+                hit = inside.any(axis=1)
+                seat_rows = idx['poly_idx']
+                occupied[seat_rows] = hit
+                max_iou[seat_rows] = np.where(hit, 1.0, 0.0)
+                matched[seat_rows] = np.where(hit, inside.argmax(axis=1), -1)
+
+            if len(idx['rect_idx']):
+                ious = self.box_ious(boxes)
+                over = ious > iou_threshold
+                hit = over.any(axis=1)
+                first = np.where(hit, over.argmax(axis=1), num_persons - 1)
+                # max_iou only covers detections up to the first match
+                considered = np.arange(num_persons)[None, :] <= first[:, None]
+                seat_rows = idx['rect_idx']
+                occupied[seat_rows] = hit
+                max_iou[seat_rows] = np.where(considered, ious, 0.0).max(axis=1)
+                matched[seat_rows] = np.where(hit, first, -1)
+
+        matched_object = np.full(num_seats, -1, dtype=np.intp)
+        if object_detections is not None and len(object_detections):
+            objects = np.asarray(object_detections, dtype=np.float64)
+            centers = np.stack(
+                [(objects[:, 0] + objects[:, 2]) / 2, (objects[:, 1] + objects[:, 3]) / 2], axis=1
+            )
+            inside = self.seats_containing(centers)
+            matched_object = np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
 
+        results = {}
+        for i, seat in enumerate(self.seats):
+            seat_id = seat['id']
             results[seat_id] = {
-                'status': 'occupied' if occupied else 'empty',
-                'max_iou': max_iou,
+                'status': 'occupied' if occupied[i] else 'empty',
+                'max_iou': float(max_iou[i]),
                 'label': seat.get('label', f'Seat {seat_id}'),
-                'matched_detection': matched_detection
+                'matched_detection': person_detections[matched[i]] if matched[i] >= 0 else None,
+                'object_detected': bool(matched_object[i] >= 0),
+                'matched_object': object_detections[matched_object[i]] if matched_object[i] >= 0 else None
             }
 
         return results
 
+    def get_crop_region(
+        self,
+        margin: int = 50,
+        top_margin: int = 400
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """Bounding box of all seat ROIs, padded for people standing in them.
+
+        Seats are matched on a person's bottom center, so the body extends
+        upwards from the ROI; top_margin leaves room for it.
+
+        Args:
+            margin: Padding in pixels on the left, right and bottom
+            top_margin: Padding in pixels above the ROIs
+
+        Returns:
+            (x1, y1, x2, y2) clipped to the resolution, or None if no seats
+        """
+        points = []
+        for seat in self.seats:
+            if seat.get('type', 'rectangle') == 'polygon':
+                points.extend(seat['roi'])
+            else:
+                x1, y1, x2, y2 = seat['roi'][:4]
+                points.extend([[x1, y1], [x2, y2]])
+        if not points:
+            return None
+
+        points = np.asarray(points, dtype=np.float64)
+        x1 = int(np.floor(points[:, 0].min())) - margin
+        y1 = int(np.floor(points[:, 1].min())) - top_margin
+        x2 = int(np.ceil(points[:, 0].max())) + margin
+        y2 = int(np.ceil(points[:, 1].max())) + margin
+
+        x1, y1 = max(x1, 0), max(y1, 0)
+        if self.resolution:
+            x2 = min(x2, int(self.resolution[0]))
+            y2 = min(y2, int(self.resolution[1]))
+        return (x1, y1, x2, y2)
+
     def visualize_rois(self, image: np.ndarray,
                        occupancy_status: Dict[str, Dict] = None) -> np.ndarray:
         """Draw ROI boxes/polygons on image.
@@ -298,6 +664,7 @@ class ROIMatcher:
             'label': label or f'{seat_id}번 좌석'
         }
         self.seats.append(seat)
+        self._build_match_index()
 
     def remove_seat(self, seat_id: str) -> bool:
         """Remove a seat by ID.
@@ -311,5 +678,6 @@ class ROIMatcher:
         for i, seat in enumerate(self.seats):
             if seat['id'] == seat_id:
                 self.seats.pop(i)
+                self._build_match_index()
                 return True
         return False
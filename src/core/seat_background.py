@@ -0,0 +1,301 @@
+"""Per-seat empty-background model for cheap abandoned-item detection.
+
+Each seat keeps a small grayscale crop of its ROI captured while the seat
+was confidently empty. Comparing the current crop against it gives a
+"something is left on the seat" score without running an object detector.
+Crops are downscaled so no seat stores more than max_pixels bytes.
+
+A seat's first background is only captured once its crop stayed unchanged
+for a while (capture_when_stable), and a change that persists on an empty
+seat for long enough (a moved chair) is absorbed into the background.
+"""
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+
+class SeatBackgroundModel:
+    """Background crops and difference scores for every seat of a channel."""
+
+    def __init__(
+        self,
+        seats: List[Dict],
+        max_pixels: int = 4096,
+        pixel_threshold: int = 30,
+        change_ratio: float = 0.15,
+        learning_rate: float = 0.05
+    ):
+        """Initialize background model.
+
+        Args:
+            seats: Seat configs from ROIMatcher.seats
+            max_pixels: Upper bound on stored pixels per seat
+            pixel_threshold: Gray-level difference that counts as changed
+            change_ratio: Fraction of changed seat pixels that means "item left"
+            learning_rate: Blend factor for slow refreshes while open
+        """
+        self.max_pixels = max_pixels
+        self.pixel_threshold = pixel_threshold
+        self.change_ratio = change_ratio
+        self.learning_rate = learning_rate
+
+        # seat_id -> (bbox in frame pixels, crop size (w, h), mask, mask area)
+        self.geometry: Dict[str, Tuple[Tuple[int, int, int, int], Tuple[int, int], np.ndarray, int]] = {}
+        for seat in seats:
+            geometry = self._seat_geometry(seat)
+            if geometry is not None:
+                self.geometry[seat['id']] = geometry
+
+        self.backgrounds: Dict[str, np.ndarray] = {}
+        self.updated_at: Dict[str, float] = {}
+
+        # Seats without a background: first crop of the current stable run
+        self.candidates: Dict[str, Tuple[np.ndarray, float]] = {}
+        # Seats whose background differs: since when, while the seat is empty
+        self.changed_since: Dict[str, float] = {}
+
+    def _seat_geometry(self, seat: Dict):
+        """Bounding box, bounded crop size and ROI mask of one seat."""
+        if seat.get('type', 'rectangle') == 'polygon':
+            points = np.asarray(seat['roi'], dtype=np.float64).reshape(-1, 2)
+        else:
+            x1, y1, x2, y2 = seat['roi'][:4]
+            points = np.asarray([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float64)
+
+        x1, y1 = np.floor(points.min(axis=0)).astype(int)
+        x2, y2 = np.ceil(points.max(axis=0)).astype(int)
+        x1, y1 = max(x1, 0), max(y1, 0)
+        width, height = x2 - x1, y2 - y1
+        if width <= 0 or height <= 0:
+            return None
+
+        scale = min(1.0, (self.max_pixels / float(width * height)) ** 0.5)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+
+        mask = np.zeros((size[1], size[0]), dtype=np.uint8)
+        scaled = np.round((points - [x1, y1]) * [size[0] / width, size[1] / height]).astype(np.int32)
+        cv2.fillPoly(mask, [scaled], 1)
+        mask = mask.astype(bool)
+        area = int(mask.sum())
+        if area == 0:
+            return None
+        return (x1, y1, x2, y2), size, mask, area
+
+    def _crop(self, frame: np.ndarray, seat_id: str) -> Optional[np.ndarray]:
+        """Downscaled, blurred grayscale crop of a seat's bounding box."""
+        (x1, y1, x2, y2), size, _, _ = self.geometry[seat_id]
+        region = frame[y1:y2, x1:x2]
+        if region.size == 0:
+            return None
+        small = cv2.resize(region, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (3, 3), 0)
+
+    def _difference(self, crop: np.ndarray, reference: np.ndarray, seat_id: str) -> float:
+        """Changed-pixel ratio of a crop against a reference, brightness-corrected."""
+        _, _, mask, area = self.geometry[seat_id]
+        diff = crop.astype(np.int16) - reference.astype(np.int16)
+        diff -= int(round(diff[mask].mean()))
+        changed = (np.abs(diff) > self.pixel_threshold) & mask
+        return float(np.count_nonzero(changed) / area)
+
+    def has_background(self, seat_id: str) -> bool:
+        """Whether a background crop exists for the seat."""
+        return seat_id in self.backgrounds
+
+    def update(
+        self,
+        frame: np.ndarray,
+        seat_ids: Iterable[str],
+        rate: Optional[float] = None,
+        now: Optional[float] = None
+    ):
+        """Blend the current crops of empty seats into their backgrounds.
+
+        Args:
+            frame: Current frame (BGR)
+            seat_ids: Seats known to be empty in this frame
+            rate: Blend factor (1.0 replaces; default learning_rate). Seats
+                without a background are always initialized outright.
+            now: Current time (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        rate = self.learning_rate if rate is None else rate
+
+        for seat_id in seat_ids:
+            if seat_id not in self.geometry:
+                continue
+            crop = self._crop(frame, seat_id)
+            if crop is None:
+                continue
+            background = self.backgrounds.get(seat_id)
+            if background is None or rate >= 1.0:
+                self.backgrounds[seat_id] = crop
+            else:
+                self.backgrounds[seat_id] = cv2.addWeighted(background, 1.0 - rate, crop, rate, 0)
+            self.updated_at[seat_id] = now
+
+    def score(self, frame: np.ndarray, seat_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Fraction of each seat's ROI that differs from its background.
+
+        The mean brightness difference is removed first, so a global
+        lighting change does not look like an object.
+
+        Args:
+            frame: Current frame (BGR)
+            seat_ids: Seats to score (default: all with a background)
+
+        Returns:
+            Dictionary mapping seat_id to changed-pixel ratio (0-1)
+        """
+        seat_ids = self.backgrounds.keys() if seat_ids is None else seat_ids
+        scores = {}
+        for seat_id in seat_ids:
+            background = self.backgrounds.get(seat_id)
+            if background is None:
+                continue
+            crop = self._crop(frame, seat_id)
+            if crop is None:
+                continue
+            scores[seat_id] = self._difference(crop, background, seat_id)
+        return scores
+
+    def capture_when_stable(
+        self,
+        frame: np.ndarray,
+        seat_ids: Iterable[str],
+        stable_seconds: float,
+        now: Optional[float] = None
+    ) -> List[str]:
+        """Capture missing backgrounds from seats whose crop stopped changing.
+
+        Args:
+            frame: Current frame (BGR)
+            seat_ids: Seats confidently empty in this frame; seats without
+                a background that are not listed restart their wait
+            stable_seconds: How long the crop must match before capture
+            now: Current time (defaults to time.time())
+
+        Returns:
+            Seats captured on this call
+        """
+        now = time.time() if now is None else now
+        seat_ids = set(seat_ids)
+        captured = []
+        for seat_id in self.geometry:
+            if seat_id in self.backgrounds:
+                self.candidates.pop(seat_id, None)
+                continue
+            if seat_id not in seat_ids:
+                self.candidates.pop(seat_id, None)
+                continue
+            crop = self._crop(frame, seat_id)
+            if crop is None:
+                continue
+            candidate = self.candidates.get(seat_id)
+            if candidate is None or self.object_present(self._difference(crop, candidate[0], seat_id)):
+                # Something moved: start a new stable run from this crop
+                self.candidates[seat_id] = (crop, now)
+                continue
+            if now - candidate[1] >= stable_seconds:
+                self.backgrounds[seat_id] = crop
+                self.updated_at[seat_id] = now
+                del self.candidates[seat_id]
+                captured.append(seat_id)
+        return captured
+
+    def absorb(
+        self,
+        frame: np.ndarray,
+        scores: Dict[str, float],
+        absorb_seconds: float,
+        now: Optional[float] = None
+    ) -> List[str]:
+        """Learn changes that persisted on empty seats for absorb_seconds.
+
+        Args:
+            frame: Current frame (BGR)
+            scores: score() of the seats that are empty in this frame (no
+                person, no detected belonging); other seats restart
+            absorb_seconds: How long a change must persist (0 = never absorb)
+            now: Current time (defaults to time.time())
+
+        Returns:
+            Seats whose background was replaced
+        """
+        now = time.time() if now is None else now
+        for seat_id in list(self.changed_since):
+            if seat_id not in scores or not self.object_present(scores[seat_id]):
+                del self.changed_since[seat_id]
+        if absorb_seconds <= 0:
+            return []
+
+        absorbed = []
+        for seat_id, score in scores.items():
+            if not self.object_present(score):
+                continue
+            since = self.changed_since.setdefault(seat_id, now)
+            if now - since >= absorb_seconds:
+                self.update(frame, [seat_id], rate=1.0, now=now)
+                del self.changed_since[seat_id]
+                absorbed.append(seat_id)
+        return absorbed
+
+    def object_present(self, score: float) -> bool:
+        """Whether a difference score means something is on the seat."""
+        return score >= self.change_ratio
+
+    def memory_bytes(self) -> int:
+        """Bytes held by background crops."""
+        return sum(bg.nbytes for bg in self.backgrounds.values())
+
+    def get_stats(self) -> Dict[str, int]:
+        """Coverage and memory of the background store."""
+        return {
+            'seats': len(self.geometry),
+            'with_background': len(self.backgrounds),
+            'memory_bytes': self.memory_bytes(),
+        }
+
+    def save(self, path: Union[Path, str]):
+        """Persist backgrounds to an .npz file (atomic replace)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(
+                f,
+                **{f"bg_{seat_id}": bg for seat_id, bg in self.backgrounds.items()},
+                **{f"ts_{seat_id}": np.float64(ts) for seat_id, ts in self.updated_at.items()}
+            )
+        tmp.replace(path)
+
+    def load(self, path: Union[Path, str]) -> int:
+        """Load backgrounds saved by save(); crops of other sizes are skipped.
+
+        Returns:
+            Number of seats restored
+        """
+        path = Path(path)
+        if not path.exists():
+            return 0
+
+        restored = 0
+        with np.load(path) as data:
+            for key in data.files:
+                if not key.startswith('bg_'):
+                    continue
+                seat_id = key[3:]
+                geometry = self.geometry.get(seat_id)
+                background = data[key]
+                if geometry is None or background.shape != geometry[2].shape:
+                    continue
+                self.backgrounds[seat_id] = background
+                if f"ts_{seat_id}" in data.files:
+                    self.updated_at[seat_id] = float(data[f"ts_{seat_id}"])
+                restored += 1
+        return restored
@@ -0,0 +1,241 @@
+"""Lightweight person tracker (ByteTrack-style, NumPy only).
+
+Sits between detection and ROI matching. Tracks survive a few missed
+detections, so one frame where YOLO misses a seated person no longer flips
+the seat to empty, and the worker can run full detection only every Nth
+frame and use the tracks' predicted boxes in between.
+
+Each track has a constant-velocity Kalman filter over (cx, cy, w, h); the
+filters of all tracks are stepped together as stacked arrays.
+"""
+
+import numpy as np
+
+from .boxes import iou_matrix
+
+
+def greedy_match(ious: np.ndarray, threshold: float):
+    """Pair rows and columns by descending IoU.
+
+    Returns:
+        (matched (K, 2) array of (row, col), unmatched rows, unmatched cols)
+    """
+    rows, cols = ious.shape
+    if rows == 0 or cols == 0:
+        return np.zeros((0, 2), dtype=np.intp), np.arange(rows), np.arange(cols)
+
+    candidates = np.argwhere(ious >= threshold)
+    order = np.argsort(-ious[candidates[:, 0], candidates[:, 1]], kind='stable')
+    used_rows = np.zeros(rows, dtype=bool)
+    used_cols = np.zeros(cols, dtype=bool)
+    matches = []
+    for r, c in candidates[order]:
+        if used_rows[r] or used_cols[c]:
+            continue
+        used_rows[r] = used_cols[c] = True
+        matches.append((r, c))
+
+    matched = np.asarray(matches, dtype=np.intp).reshape(-1, 2)
+    return matched, np.flatnonzero(~used_rows), np.flatnonzero(~used_cols)
+
+
+def _xyxy_to_cxcywh(boxes: np.ndarray) -> np.ndarray:
+    w = boxes[:, 2] - boxes[:, 0]
+    h = boxes[:, 3] - boxes[:, 1]
+    return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w, h], axis=1)
+
+
+def _cxcywh_to_xyxy(state: np.ndarray) -> np.ndarray:
+    cx, cy, w, h = state[:, 0], state[:, 1], state[:, 2], state[:, 3]
+    return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+
+class PersonTracker:
+    """IoU + Kalman multi-person tracker with ByteTrack's two-stage matching.
+
+    High-confidence detections are matched to tracks first; leftover tracks
+    then get a second chance against low-confidence detections, which keeps
+    partially occluded people tracked without letting weak boxes start new
+    tracks.
+    """
+
+    # Kalman noise, relative to box height (as in SORT/ByteTrack)
+    STD_POSITION = 1.0 / 20
+    STD_VELOCITY = 1.0 / 160
+
+    def __init__(
+        self,
+        match_iou: float = 0.3,
+        high_confidence: float = 0.5,
+        max_lost: int = 5,
+        min_hits: int = 1
+    ):
+        """Initialize tracker.
+
+        Args:
+            match_iou: Minimum IoU between a track's prediction and a detection
+            high_confidence: Detections at or above this start/continue tracks
+                in the first stage; weaker ones only continue tracks
+            max_lost: Detection updates a track may go unmatched before removal
+            min_hits: Matched updates before a new track is reported
+        """
+        self.match_iou = match_iou
+        self.high_confidence = high_confidence
+        self.max_lost = max_lost
+        self.min_hits = min_hits
+
+        self._next_id = 1
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros((0, 8))       # cx, cy, w, h and their velocities
+        self.cov = np.zeros((0, 8, 8))
+        self.confidence = np.zeros(0)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.lost = np.zeros(0, dtype=np.int64)
+
+        self._F = np.eye(8)
+        self._F[:4, 4:] = np.eye(4)
+        self._H = np.eye(4, 8)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def reset(self):
+        """Drop all tracks."""
+        self.__init__(self.match_iou, self.high_confidence, self.max_lost, self.min_hits)
+
+    # Kalman filter (vectorized over tracks)
+
+    def _process_noise(self, heights: np.ndarray) -> np.ndarray:
+        std = np.concatenate([
+            np.repeat((self.STD_POSITION * heights)[:, None], 4, axis=1),
+            np.repeat((self.STD_VELOCITY * heights)[:, None], 4, axis=1),
+        ], axis=1)
+        return np.einsum('ni,ij->nij', std ** 2, np.eye(8))
+
+    def _measurement_noise(self, heights: np.ndarray) -> np.ndarray:
+        std = np.repeat((self.STD_POSITION * heights)[:, None], 4, axis=1)
+        return np.einsum('ni,ij->nij', std ** 2, np.eye(4))
+
+    def _kalman_predict(self):
+        if not len(self.ids):
+            return
+        self.mean = self.mean @ self._F.T
+        # Keep boxes from collapsing when a shrinking velocity overshoots
+        self.mean[:, 2:4] = np.maximum(self.mean[:, 2:4], 1.0)
+        self.cov = self._F @ self.cov @ self._F.T + self._process_noise(self.mean[:, 3])
+
+    def _kalman_update(self, rows: np.ndarray, measurements: np.ndarray):
+        if not len(rows):
+            return
+        mean, cov = self.mean[rows], self.cov[rows]
+        H = self._H
+        S = H @ cov @ H.T + self._measurement_noise(mean[:, 3])
+        gain = cov @ H.T @ np.linalg.inv(S)
+        innovation = measurements - mean @ H.T
+        self.mean[rows] = mean + np.einsum('nij,nj->ni', gain, innovation)
+        self.cov[rows] = (np.eye(8) - gain @ H) @ cov
+
+    def _start_tracks(self, detections: np.ndarray):
+        n = len(detections)
+        if not n:
+            return
+        measurements = _xyxy_to_cxcywh(detections[:, :4].astype(np.float64))
+        mean = np.concatenate([measurements, np.zeros((n, 4))], axis=1)
+        heights = measurements[:, 3]
+        std = np.concatenate([
+            np.repeat((2 * self.STD_POSITION * heights)[:, None], 4, axis=1),
+            np.repeat((10 * self.STD_VELOCITY * heights)[:, None], 4, axis=1),
+        ], axis=1)
+
+        self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + n)])
+        self._next_id += n
+        self.mean = np.concatenate([self.mean, mean])
+        self.cov = np.concatenate([self.cov, np.einsum('ni,ij->nij', std ** 2, np.eye(8))])
+        self.confidence = np.concatenate([self.confidence, detections[:, 4].astype(np.float64)])
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int64)])
+        self.lost = np.concatenate([self.lost, np.zeros(n, dtype=np.int64)])
+
+    def _keep(self, mask: np.ndarray):
+        self.ids = self.ids[mask]
+        self.mean = self.mean[mask]
+        self.cov = self.cov[mask]
+        self.confidence = self.confidence[mask]
+        self.hits = self.hits[mask]
+        self.lost = self.lost[mask]
+
+    # Public API
+
+    def update(self, detections: np.ndarray) -> np.ndarray:
+        """Advance tracks one step and associate a new set of detections.
+
+        Args:
+            detections: (N, 5) array of x1, y1, x2, y2, confidence
+
+        Returns:
+            (K, 6) float32 array of x1, y1, x2, y2, confidence, track_id for
+            confirmed tracks, including ones coasting through missed
+            detections (up to max_lost updates)
+        """
+        detections = np.asarray(detections, dtype=np.float64).reshape(-1, 5)
+        self._kalman_predict()
+
+        high = detections[:, 4] >= self.high_confidence
+        high_idx, low_idx = np.flatnonzero(high), np.flatnonzero(~high)
+        track_boxes = _cxcywh_to_xyxy(self.mean)
+        matched_tracks = np.zeros(len(self.ids), dtype=bool)
+
+        # Stage 1: all tracks vs confident detections
+        matches, free_tracks, free_high = greedy_match(
+            iou_matrix(track_boxes, detections[high_idx, :4]), self.match_iou
+        )
+        rows, dets = matches[:, 0], high_idx[matches[:, 1]]
+
+        # Stage 2: leftover tracks vs weak detections
+        matches2, _, _ = greedy_match(
+            iou_matrix(track_boxes[free_tracks], detections[low_idx, :4]), self.match_iou
+        )
+        rows = np.concatenate([rows, free_tracks[matches2[:, 0]]])
+        dets = np.concatenate([dets, low_idx[matches2[:, 1]]])
+
+        self._kalman_update(rows, _xyxy_to_cxcywh(detections[dets, :4]))
+        self.confidence[rows] = detections[dets, 4]
+        self.hits[rows] += 1
+        self.lost[rows] = 0
+        matched_tracks[rows] = True
+
+        self.lost[~matched_tracks] += 1
+        self._keep(self.lost <= self.max_lost)
+
+        # Only confident leftovers start tracks
+        self._start_tracks(detections[high_idx[free_high]])
+
+        return self.tracks()
+
+    def predict(self) -> np.ndarray:
+        """Advance tracks without detections (frames where YOLO is skipped).
+
+        Lost counters are not touched, so skipped frames never expire tracks.
+
+        Returns:
+            Same format as update()
+        """
+        self._kalman_predict()
+        return self.tracks()
+
+    def tracks(self, include_tentative: bool = False) -> np.ndarray:
+        """Current track boxes as a (K, 6) float32 array."""
+        mask = np.ones(len(self.ids), dtype=bool) if include_tentative else self.hits >= self.min_hits
+        boxes = _cxcywh_to_xyxy(self.mean[mask])
+        out = np.empty((int(mask.sum()), 6), dtype=np.float32)
+        out[:, :4] = boxes
+        out[:, 4] = self.confidence[mask]
+        out[:, 5] = self.ids[mask]
+        return out
+
+    def get_stats(self) -> dict:
+        """Track counts for the performance report."""
+        return {
+            'tracks': len(self.ids),
+            'coasting': int(np.count_nonzero(self.lost > 0)),
+            'next_id': self._next_id,
+        }
@@ -0,0 +1,252 @@
+"""Lease-based channel sharding across detection nodes.
+
+Every node heartbeats a worker_nodes row and holds time-limited leases on
+(store_id, channel_id) pairs in channel_leases (migration 004). A node keeps
+renewing what it holds, releases channels above its fair share (channels /
+live nodes) so newcomers get work, and takes over unleased or expired
+channels up to that share. Taking a lease is a single conditional upsert, so
+two nodes can never hold the same channel at once; a dead node's channels
+move within lease_seconds + one heartbeat interval. A node cut off from the
+database drops its channels one heartbeat interval before its leases expire.
+
+Timestamps come from the nodes' clocks (keep them NTP-synced; lease_seconds
+should be far above any skew). Plain SQL through SQLAlchemy, so the same code
+runs against Postgres and a local stand-in (e.g. SQLite via create_tables()).
+"""
+import hashlib
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+ChannelKey = Tuple[str, int]  # (store_id, channel_id)
+
+# Portable DDL for local stand-ins; production uses migration 004
+LEASE_TABLES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS worker_nodes (
+        node_id VARCHAR(100) PRIMARY KEY,
+        hostname VARCHAR(255),
+        pid INT,
+        started_at TIMESTAMP NOT NULL,
+        heartbeat_at TIMESTAMP NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS channel_leases (
+        store_id VARCHAR(50) NOT NULL,
+        channel_id INT NOT NULL,
+        node_id VARCHAR(100) NOT NULL,
+        acquired_at TIMESTAMP NOT NULL,
+        renewed_at TIMESTAMP NOT NULL,
+        lease_expires_at TIMESTAMP NOT NULL,
+        PRIMARY KEY (store_id, channel_id)
+    )
+    """,
+)
+
+
+def create_tables(engine: Engine):
+    """Create the lease tables if missing (local testing only)."""
+    with engine.begin() as conn:
+        for statement in LEASE_TABLES_DDL:
+            conn.execute(text(statement))
+
+
+class LeaseManager:
+    """Hold a fair share of channel leases for one node."""
+
+    def __init__(
+        self,
+        node_id: str,
+        database_url: Optional[str] = None,
+        engine: Optional[Engine] = None,
+        lease_seconds: float = 30.0,
+        heartbeat_interval: float = 10.0
+    ):
+        """Initialize lease manager.
+
+        Args:
+            node_id: Unique node name
+            database_url: SQLAlchemy URL (ignored if engine is given)
+            engine: Existing engine
+            lease_seconds: Lease lifetime; heartbeat() must run well within it
+            heartbeat_interval: How often heartbeat() is called; a node cut
+                off from the database drops its leases this long before
+                they expire
+        """
+        self.node_id = node_id
+        self.engine = engine or create_engine(database_url, pool_pre_ping=True)
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+
+        self.held: Set[ChannelKey] = set()
+        self.started_at = self._now()
+        self._last_renewed = 0.0
+        self.last_error: Optional[str] = None
+        self.metrics = {'acquired': 0, 'released': 0, 'lost': 0, 'failures': 0, 'live_nodes': 0}
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def _preference(self, key: ChannelKey) -> str:
+        """Rendezvous-hash order, so nodes reach for different channels first."""
+        return hashlib.sha1(f"{self.node_id}:{key[0]}:{key[1]}".encode()).hexdigest()
+
+    def heartbeat(self, channels: Iterable[ChannelKey]) -> Set[ChannelKey]:
+        """Renew, rebalance and acquire leases for the wanted channels.
+
+        Args:
+            channels: All channels that should run somewhere
+
+        Returns:
+            Channels this node holds now. On a database error the previous
+            set is kept while the leases are safely alive. It is emptied one
+            heartbeat_interval before they would expire, so a cut-off node
+            stops before others can take over (last_error holds the error)
+        """
+        wanted = set(channels)
+        # Leases written by _sync() expire lease_seconds after this moment
+        started = time.time()
+        try:
+            self._sync(wanted)
+            self._last_renewed = started
+            self.last_error = None
+        except Exception as e:
+            self.metrics['failures'] += 1
+            self.last_error = str(e)
+            # The next heartbeat may come too late, so give up one early
+            if time.time() - self._last_renewed >= self.lease_seconds - self.heartbeat_interval:
+                self.held = set()
+        return set(self.held)
+
+    def _sync(self, wanted: Set[ChannelKey]):
+        now = self._now()
+        expires = now + timedelta(seconds=self.lease_seconds)
+        node_cutoff = now - timedelta(seconds=self.lease_seconds)
+
+        with self.engine.begin() as conn:
+            # 1. Node heartbeat
+            updated = conn.execute(
+                text("UPDATE worker_nodes SET heartbeat_at = :now WHERE node_id = :node"),
+                {'now': now, 'node': self.node_id}
+            ).rowcount
+            if not updated:
+                conn.execute(
+                    text(
+                        "INSERT INTO worker_nodes (node_id, hostname, pid, started_at, heartbeat_at) "
+                        "VALUES (:node, :host, :pid, :started, :now)"
+                    ),
+                    {'node': self.node_id, 'host': socket.gethostname(), 'pid': os.getpid(),
+                     'started': self.started_at, 'now': now}
+                )
+
+            # 2. Renew what is still ours (an expired lease may have moved)
+            conn.execute(
+                text(
+                    "UPDATE channel_leases SET renewed_at = :now, lease_expires_at = :expires "
+                    "WHERE node_id = :node"
+                ),
+                {'now': now, 'expires': expires, 'node': self.node_id}
+            )
+            held = {
+                (row[0], int(row[1])) for row in conn.execute(
+                    text("SELECT store_id, channel_id FROM channel_leases WHERE node_id = :node"),
+                    {'node': self.node_id}
+                )
+            }
+            self.metrics['lost'] += len(self.held - held)
+
+            # 3. Drop channels that are no longer wanted
+            for key in held - wanted:
+                self._release(conn, key)
+            held &= wanted
+
+            # 4. Fair share over live nodes; the remainder goes to the
+            # first node ids so every node computes the same split
+            live_nodes = sorted(
+                row[0] for row in conn.execute(
+                    text("SELECT node_id FROM worker_nodes WHERE heartbeat_at > :cutoff"),
+                    {'cutoff': node_cutoff}
+                )
+            ) or [self.node_id]
+            if self.node_id not in live_nodes:
+                live_nodes = sorted(live_nodes + [self.node_id])
+            self.metrics['live_nodes'] = len(live_nodes)
+            base, remainder = divmod(len(wanted), len(live_nodes))
+            share = base + (live_nodes.index(self.node_id) < remainder)
+
+            # Over share (a node joined): hand back the least preferred
+            for key in sorted(held, key=self._preference, reverse=True)[:max(len(held) - share, 0)]:
+                self._release(conn, key)
+                held.discard(key)
+
+            # 5. Take free or expired channels up to the share
+            if len(held) < share:
+                taken = {
+                    (row[0], int(row[1])) for row in conn.execute(
+                        text(
+                            "SELECT store_id, channel_id FROM channel_leases "
+                            "WHERE lease_expires_at > :now"
+                        ),
+                        {'now': now}
+                    )
+                }
+                for key in sorted(wanted - held - taken, key=self._preference):
+                    if len(held) >= share:
+                        break
+                    if self._acquire(conn, key, now, expires):
+                        held.add(key)
+
+        self.held = held
+
+    def _acquire(self, conn, key: ChannelKey, now: datetime, expires: datetime) -> bool:
+        """Take a lease if it is free or expired (atomic compare-and-set)."""
+        acquired = conn.execute(
+            text(
+                "INSERT INTO channel_leases "
+                "(store_id, channel_id, node_id, acquired_at, renewed_at, lease_expires_at) "
+                "VALUES (:store, :channel, :node, :now, :now, :expires) "
+                "ON CONFLICT (store_id, channel_id) DO UPDATE SET "
+                "node_id = excluded.node_id, acquired_at = excluded.acquired_at, "
+                "renewed_at = excluded.renewed_at, lease_expires_at = excluded.lease_expires_at "
+                "WHERE channel_leases.lease_expires_at <= :now"
+            ),
+            {'store': key[0], 'channel': key[1], 'node': self.node_id, 'now': now, 'expires': expires}
+        ).rowcount
+        if acquired:
+            self.metrics['acquired'] += 1
+        return bool(acquired)
+
+    def _release(self, conn, key: ChannelKey):
+        conn.execute(
+            text(
+                "DELETE FROM channel_leases "
+                "WHERE store_id = :store AND channel_id = :channel AND node_id = :node"
+            ),
+            {'store': key[0], 'channel': key[1], 'node': self.node_id}
+        )
+        self.metrics['released'] += 1
+
+    def release_all(self):
+        """Give up all leases and leave (on clean shutdown)."""
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM channel_leases WHERE node_id = :node"),
+                {'node': self.node_id}
+            )
+            conn.execute(
+                text("DELETE FROM worker_nodes WHERE node_id = :node"),
+                {'node': self.node_id}
+            )
+        self.metrics['released'] += len(self.held)
+        self.held = set()
+
+    def get_stats(self) -> Dict:
+        """Lease counts for logging."""
+        return {'node_id': self.node_id, 'held': len(self.held), **self.metrics}
@@ -118,6 +118,7 @@ class DetectionEvent(Base):
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(String(36), unique=True)  # Client-generated UUID (outbox replay idempotency)
     store_id = Column(String(50), ForeignKey('stores.store_id', ondelete='CASCADE'), nullable=False)
     seat_id = Column(String(20), nullable=False)
     channel_id = Column(Integer)
@@ -0,0 +1,285 @@
+"""Durable local outbox for detection events.
+
+Events are appended to a SQLite database (WAL mode) before they are sent
+anywhere, and a background replayer drains them to Supabase in batches.
+Each event carries a client-generated event_id, so a batch that is replayed
+twice (e.g. the insert succeeded but the response was lost) is ignored by the
+database instead of duplicating history.
+
+A failed batch is retried with backoff at half the size until the failing
+event is alone. An event that still fails max_attempts times on its own is
+moved to the outbox_dead table (same file) so it cannot block the rest;
+dead events are retried once on every start(), e.g. after migration 003
+has been applied.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+def _json_default(value: Any):
+    """Serialize datetimes (and anything else) for the outbox payload."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class EventOutbox:
+    """Append-only SQLite outbox with a background replayer."""
+
+    RETRY_MAX_DELAY = 60.0
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        db=None,
+        batch_size: int = 100,
+        replay_interval: float = 2.0,
+        max_attempts: int = 10,
+        logger=None
+    ):
+        """Initialize event outbox.
+
+        Args:
+            path: SQLite file (created if missing)
+            db: SupabaseClient used by the replayer (None = append only)
+            batch_size: Maximum events per replay request
+            replay_interval: Seconds between replay attempts
+            max_attempts: Failed single-event replays before dead-lettering
+            logger: Optional StructuredLogger for replay failures
+        """
+        self.path = Path(path)
+        self.db = db
+        self.batch_size = batch_size
+        self.replay_interval = replay_interval
+        self.max_attempts = max_attempts
+        self.logger = logger
+        self._batch_limit = batch_size
+        self._consecutive_failures = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox_dead (
+                seq INTEGER PRIMARY KEY,
+                event_id TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL,
+                error TEXT,
+                dead_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.metrics = {
+            'appended': 0,
+            'replayed': 0,
+            'replay_failures': 0,
+            'dead_lettered': 0,
+            'last_replay_ms': 0.0,
+        }
+
+    def append(self, event: Dict[str, Any]) -> str:
+        """Store an event locally.
+
+        Args:
+            event: detection_events row; an event_id is added if missing
+
+        Returns:
+            The event_id
+        """
+        event_id = event.get('event_id') or str(uuid.uuid4())
+        payload = json.dumps({**event, 'event_id': event_id}, default=_json_default, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (event_id, payload, created_at) VALUES (?, ?, ?)",
+                (event_id, payload, time.time())
+            )
+            self._conn.commit()
+        self.metrics['appended'] += 1
+        return event_id
+
+    def pending_count(self) -> int:
+        """Number of events not yet confirmed by the database."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def dead_count(self) -> int:
+        """Number of events moved to outbox_dead."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox_dead").fetchone()[0]
+
+    def retry_dead(self) -> int:
+        """Move dead-lettered events back to the outbox with a fresh attempt count.
+
+        Returns:
+            Number of events requeued
+        """
+        with self._lock:
+            moved = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (seq, event_id, payload, created_at, attempts) "
+                "SELECT seq, event_id, payload, created_at, 0 FROM outbox_dead"
+            ).rowcount
+            self._conn.execute("DELETE FROM outbox_dead")
+            self._conn.commit()
+        return moved
+
+    def _dead_letter(self, seq: int, error: str):
+        """Move one event that keeps failing out of the replay queue."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outbox_dead "
+                "(seq, event_id, payload, created_at, attempts, error, dead_at) "
+                "SELECT seq, event_id, payload, created_at, attempts, ?, ? FROM outbox WHERE seq = ?",
+                (error, time.time(), seq)
+            )
+            self._conn.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+            self._conn.commit()
+        self.metrics['dead_lettered'] += 1
+
+    def retry_delay(self) -> float:
+        """Seconds to wait before the next replay after consecutive failures."""
+        if not self._consecutive_failures:
+            return self.replay_interval
+        delay = self.replay_interval * (2 ** (self._consecutive_failures - 1))
+        return min(delay, max(self.RETRY_MAX_DELAY, self.replay_interval))
+
+    def replay_once(self) -> int:
+        """Send the oldest batch to the database.
+
+        Returns:
+            Number of events delivered (0 if empty or on failure)
+        """
+        if self.db is None:
+            return 0
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, payload, attempts FROM outbox ORDER BY seq LIMIT ?",
+                (self._batch_limit,)
+            ).fetchall()
+        if not rows:
+            return 0
+
+        seqs = [seq for seq, _, _ in rows]
+
+        start_time = time.time()
+        try:
+            events = [json.loads(payload) for _, payload, _ in rows]
+            self.db.log_detection_events(events)
+        except Exception as e:
+            self.metrics['replay_failures'] += 1
+            self._consecutive_failures += 1
+            # Halve the batch until the failing event is alone; only then
+            # does it count as an attempt against that event
+            self._batch_limit = max(1, len(rows) // 2)
+            if len(rows) == 1:
+                seq, payload, attempts = rows[0]
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    with self._lock:
+                        self._conn.execute("UPDATE outbox SET attempts = ? WHERE seq = ?", (attempts, seq))
+                    self._dead_letter(seq, str(e))
+                    if self.logger:
+                        self.logger.error(
+                            "Outbox event dead-lettered after repeated failures",
+                            seq=seq,
+                            attempts=attempts,
+                            payload=payload,
+                            error=str(e)
+                        )
+                    return 0
+                with self._lock:
+                    self._conn.execute("UPDATE outbox SET attempts = ? WHERE seq = ?", (attempts, seq))
+                    self._conn.commit()
+            if self.logger:
+                self.logger.warning(
+                    "Outbox replay failed, will retry",
+                    batch_size=len(rows),
+                    pending=self.pending_count(),
+                    retry_in_seconds=round(self.retry_delay(), 1),
+                    error=str(e)
+                )
+            return 0
+        finally:
+            self.metrics['last_replay_ms'] = (time.time() - start_time) * 1000
+
+        self._consecutive_failures = 0
+        self._batch_limit = min(self.batch_size, self._batch_limit * 2)
+
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM outbox WHERE seq = ?",
+                [(seq,) for seq in seqs]
+            )
+            self._conn.commit()
+        self.metrics['replayed'] += len(events)
+        return len(events)
+
+    def _run(self):
+        """Replay loop (runs in the background thread)."""
+        while not self._stop_event.is_set():
+            limit = self._batch_limit
+            delivered = self.replay_once()
+            # Keep draining while full batches go through; otherwise wait
+            if delivered < limit:
+                self._stop_event.wait(self.retry_delay())
+
+    def start(self):
+        """Start the background replayer (dead-lettered events get another try)."""
+        requeued = self.retry_dead()
+        if requeued and self.logger:
+            self.logger.info("Requeued dead-lettered outbox events", count=requeued)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="OutboxReplayer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Stop the replayer after one last drain attempt and close the file."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        # Last attempt; anything left stays on disk for the next start
+        while True:
+            limit = self._batch_limit
+            if self.replay_once() < limit:
+                break
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Outbox backlog and replay metrics."""
+        return {
+            'pending': self.pending_count(),
+            'appended': self.metrics['appended'],
+            'replayed': self.metrics['replayed'],
+            'replay_failures': self.metrics['replay_failures'],
+            'dead': self.dead_count(),
+            'last_replay_ms': round(self.metrics['last_replay_ms'], 2),
+        }
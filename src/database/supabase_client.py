@@ -1,4 +1,6 @@
 """Supabase client wrapper for CCTV seat detection system."""
+import hashlib
+import json
 import os
 from typing import Optional, Dict, List, Any
 from datetime import datetime
@@ -59,6 +61,26 @@ class SupabaseClient:
         response = query.execute()
         return response.data
 
+    def get_roi_version(self, store_id: str, channel_id: int) -> str:
+        """Hash of a channel's active seat ROIs.
+
+        Changes whenever a seat of the channel is added, removed,
+        deactivated, relabeled or has its polygon edited, so workers can
+        poll it cheaply instead of refetching and rebuilding their matcher.
+        """
+        response = (
+            self.client.table('seats')
+            .select('seat_id,seat_label,roi_polygon')
+            .eq('store_id', store_id)
+            .eq('channel_id', channel_id)
+            .eq('is_active', True)
+            .execute()
+        )
+        rows = sorted(response.data, key=lambda row: row['seat_id'])
+        return hashlib.sha1(
+            json.dumps(rows, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
     def get_seat(self, store_id: str, seat_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific seat."""
         response = (
@@ -144,6 +166,28 @@ class SupabaseClient:
             raise ValueError(f"Failed to update status for seat: {store_id}/{seat_id}")
         return response.data[0]
 
+    def bulk_update_seat_statuses(
+        self,
+        store_id: str,
+        rows: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Upsert status rows for many seats in a single request.
+
+        Args:
+            store_id: Store ID
+            rows: Status rows, each containing 'seat_id' and the same columns
+        """
+        if not rows:
+            return []
+        response = (
+            self.client.table('seat_status')
+            .upsert([{'store_id': store_id, **row} for row in rows])
+            .execute()
+        )
+        if not response.data:
+            raise ValueError(f"Failed to update status for {len(rows)} seats in store: {store_id}")
+        return response.data
+
     def get_vacant_seats(
         self,
         store_id: str,
@@ -183,6 +227,26 @@ class SupabaseClient:
             raise ValueError("Failed to log detection event")
         return response.data[0]
 
+    def log_detection_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Log many detection events in a single request.
+
+        Events that carry a client-generated event_id are written
+        idempotently: rows whose event_id already exists are skipped, so
+        replaying a batch never duplicates history.
+        """
+        if not events:
+            return []
+        table = self.client.table('detection_events')
+        if all(event.get('event_id') for event in events):
+            # Duplicates return no rows, so an empty response is not an error
+            response = table.upsert(events, on_conflict='event_id', ignore_duplicates=True).execute()
+            return response.data or []
+
+        response = table.insert(events).execute()
+        if not response.data:
+            raise ValueError(f"Failed to log {len(events)} detection events")
+        return response.data
+
     def get_recent_events(
         self,
         store_id: str,
@@ -131,7 +131,10 @@ def main():
     print("\nLoading YOLO model...")
     detector = PersonDetector(
         model_path=settings.YOLO_MODEL,
-        confidence=settings.CONFIDENCE_THRESHOLD
+        confidence=settings.CONFIDENCE_THRESHOLD,
+        backend=settings.DETECTOR_BACKEND,
+        nms_iou=settings.DETECTOR_NMS_IOU,
+        num_threads=settings.DETECTOR_THREADS
     )
     print("✅ YOLO model loaded")
 
@@ -0,0 +1,172 @@
+"""Compare two detector backends on recorded frames.
+
+Runs a reference model (normally the ultralytics .pt) and a candidate
+(exported .onnx / OpenVINO) on the same frames, matches their person boxes
+by IoU and reports missed/extra boxes, box agreement, confidence drift and
+per-frame latency. Exits non-zero if the candidate is out of tolerance.
+
+Usage:
+    python src/scripts/check_backend_parity.py \\
+        --reference yolo11n.pt --candidate yolo11n.onnx --frames data/frames/
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.config import settings
+from src.core import PersonDetector
+from src.core.boxes import iou_matrix
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_frames(source: str, limit: int = 200, stride: int = 1) -> Iterator[Tuple[str, np.ndarray]]:
+    """Yield (name, BGR frame) from an image directory, video file or RTSP URL.
+
+    Args:
+        source: Directory of images, video file or stream URL
+        limit: Maximum frames to yield
+        stride: Take every Nth frame from videos/streams
+
+    Yields:
+        (frame name, frame)
+    """
+    path = Path(source)
+    if path.is_dir():
+        files = sorted(p for p in path.rglob('*') if p.suffix.lower() in IMAGE_EXTENSIONS)
+        for file in files[:limit]:
+            frame = cv2.imread(str(file))
+            if frame is not None:
+                yield str(file.relative_to(path)), frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    index = 0
+    yielded = 0
+    try:
+        while yielded < limit:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if index % stride == 0:
+                yield f"{path.name}#{index}", frame
+                yielded += 1
+            index += 1
+    finally:
+        cap.release()
+
+
+def match_detections(
+    reference: List[Tuple], candidate: List[Tuple], min_iou: float
+) -> List[Tuple[int, int, float]]:
+    """Greedily pair boxes by highest IoU.
+
+    Returns:
+        List of (reference index, candidate index, iou)
+    """
+    ref = np.asarray([d[:4] for d in reference], dtype=np.float64).reshape(-1, 4)
+    cand = np.asarray([d[:4] for d in candidate], dtype=np.float64).reshape(-1, 4)
+    ious = iou_matrix(ref, cand)
+
+    pairs = []
+    while ious.size and ious.max() >= min_iou:
+        i, j = np.unravel_index(ious.argmax(), ious.shape)
+        pairs.append((int(i), int(j), float(ious[i, j])))
+        ious[i, :] = -1
+        ious[:, j] = -1
+    return pairs
+
+
+def timed_detect(detector: PersonDetector, frame: np.ndarray) -> Tuple[List[Tuple], float]:
+    """Run detection and return (detections, elapsed ms)."""
+    start = time.perf_counter()
+    detections = detector.detect_persons(frame)
+    return detections, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detector backend parity check')
+    parser.add_argument('--reference', default=settings.YOLO_MODEL, help='Reference model (.pt)')
+    parser.add_argument('--reference-backend', default='auto')
+    parser.add_argument('--candidate', required=True, help='Candidate model (.onnx / .xml)')
+    parser.add_argument('--candidate-backend', default='auto')
+    parser.add_argument('--frames', required=True, help='Image directory, video file or RTSP URL')
+    parser.add_argument('--limit', type=int, default=200, help='Maximum frames')
+    parser.add_argument('--stride', type=int, default=30, help='Frame stride for videos')
+    parser.add_argument('--confidence', type=float, default=settings.CONFIDENCE_THRESHOLD)
+    parser.add_argument('--match-iou', type=float, default=0.5, help='IoU to count as the same person')
+    parser.add_argument('--min-mean-iou', type=float, default=0.9, help='Required mean IoU of matched boxes')
+    parser.add_argument('--max-unmatched', type=float, default=0.02,
+                        help='Allowed fraction of unmatched boxes')
+    args = parser.parse_args()
+
+    reference = PersonDetector(args.reference, args.confidence, backend=args.reference_backend)
+    candidate = PersonDetector(args.candidate, args.confidence, backend=args.candidate_backend)
+
+    ref_times, cand_times = [], []
+    ref_total = cand_total = 0
+    missed = extra = 0
+    matched_ious, conf_diffs = [], []
+    frames = 0
+
+    for name, frame in load_frames(args.frames, args.limit, args.stride):
+        # First frame warms both runtimes up; keep it out of the latency stats
+        if frames == 0:
+            reference.detect_persons(frame)
+            candidate.detect_persons(frame)
+
+        ref_dets, ref_ms = timed_detect(reference, frame)
+        cand_dets, cand_ms = timed_detect(candidate, frame)
+        ref_times.append(ref_ms)
+        cand_times.append(cand_ms)
+
+        pairs = match_detections(ref_dets, cand_dets, args.match_iou)
+        ref_total += len(ref_dets)
+        cand_total += len(cand_dets)
+        missed += len(ref_dets) - len(pairs)
+        extra += len(cand_dets) - len(pairs)
+        for i, j, iou in pairs:
+            matched_ious.append(iou)
+            conf_diffs.append(abs(ref_dets[i][4] - cand_dets[j][4]))
+
+        if len(pairs) != len(ref_dets) or len(pairs) != len(cand_dets):
+            print(f"   ⚠️  {name}: reference={len(ref_dets)} candidate={len(cand_dets)} matched={len(pairs)}")
+        frames += 1
+
+    if frames == 0:
+        print("❌ No frames loaded")
+        sys.exit(1)
+
+    unmatched_ratio = (missed + extra) / max(ref_total + cand_total, 1)
+    mean_iou = float(np.mean(matched_ious)) if matched_ious else 1.0
+
+    print("\n" + "=" * 60)
+    print("Backend Parity Report")
+    print("=" * 60)
+    print(f"Frames:              {frames}")
+    print(f"Reference:           {args.reference} ({reference.model.name})")
+    print(f"Candidate:           {args.candidate} ({candidate.model.name})")
+    print(f"Persons (ref/cand):  {ref_total} / {cand_total}")
+    print(f"Missed / extra:      {missed} / {extra} ({unmatched_ratio:.2%} unmatched)")
+    print(f"Mean matched IoU:    {mean_iou:.4f}")
+    if conf_diffs:
+        print(f"Confidence drift:    mean {np.mean(conf_diffs):.4f}, max {np.max(conf_diffs):.4f}")
+    print(f"Latency p50 (ms):    {np.median(ref_times):.1f} → {np.median(cand_times):.1f}")
+    print(f"Latency p95 (ms):    {np.percentile(ref_times, 95):.1f} → {np.percentile(cand_times, 95):.1f}")
+
+    if unmatched_ratio > args.max_unmatched or mean_iou < args.min_mean_iou:
+        print("\n❌ Candidate backend is out of tolerance")
+        sys.exit(1)
+    print("\n✅ Candidate backend matches reference")
+
+
+if __name__ == "__main__":
+    main()
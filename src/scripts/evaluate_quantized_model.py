@@ -0,0 +1,160 @@
+"""Compare an INT8 person model against FP32 on recorded channel frames.
+
+For every frame both models run on the same input (cropped to the seat
+region like production when ROI_CROP_ENABLED), and each seat's occupancy is
+computed with the channel's ROI config. The report lists per-seat occupancy
+agreement, box-count drift and latency, and exits non-zero if agreement is
+below --min-agreement.
+
+Frames are read from ``<frames>/channel_<N>/`` (images or one video) and
+matched with ``data/roi_configs/channel_<N>.json``; use --channel to
+evaluate a single source instead.
+
+Usage:
+    python src/scripts/evaluate_quantized_model.py \\
+        --fp32 yolo11n.onnx --int8 yolo11n_int8.onnx --frames data/frames/
+"""
+import argparse
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.config import settings
+from src.core import PersonDetector, ROIMatcher
+from src.scripts.check_backend_parity import load_frames
+
+
+def channel_sources(frames: str, channel: int = None) -> List[Tuple[int, str]]:
+    """Resolve (channel_id, frame source) pairs."""
+    if channel is not None:
+        return [(channel, frames)]
+
+    sources = []
+    for path in sorted(Path(frames).iterdir()):
+        match = re.match(r'^channel_(\d+)', path.name)
+        if not match:
+            continue
+        if path.is_dir():
+            videos = [p for p in path.iterdir() if p.suffix.lower() in ('.mp4', '.avi', '.mkv')]
+            source = str(videos[0]) if videos else str(path)
+        else:
+            source = str(path)
+        sources.append((int(match.group(1)), source))
+    return sources
+
+
+def timed_detect(detector: PersonDetector, frame: np.ndarray, crop) -> Tuple[List[Tuple], float]:
+    """Run detection and return (detections, elapsed ms)."""
+    start = time.perf_counter()
+    detections = detector.detect_persons(frame, crop=crop)
+    return detections, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='INT8 vs FP32 occupancy agreement report')
+    parser.add_argument('--fp32', required=True, help='Reference FP32 model')
+    parser.add_argument('--int8', required=True, help='Quantized model')
+    parser.add_argument('--frames', required=True,
+                        help='Root with channel_<N>/ frame dirs (or a single source with --channel)')
+    parser.add_argument('--channel', type=int, help='Evaluate one channel from --frames')
+    parser.add_argument('--roi-dir', default=str(settings.ROI_CONFIG_DIR))
+    parser.add_argument('--limit', type=int, default=200, help='Maximum frames per channel')
+    parser.add_argument('--stride', type=int, default=30, help='Frame stride for videos')
+    parser.add_argument('--confidence', type=float, default=settings.CONFIDENCE_THRESHOLD)
+    parser.add_argument('--min-agreement', type=float, default=0.98,
+                        help='Required overall seat occupancy agreement')
+    args = parser.parse_args()
+
+    fp32 = PersonDetector(args.fp32, args.confidence, backend=settings.DETECTOR_BACKEND,
+                          nms_iou=settings.DETECTOR_NMS_IOU, num_threads=settings.DETECTOR_THREADS)
+    int8 = PersonDetector(args.int8, args.confidence, backend=settings.DETECTOR_BACKEND,
+                          nms_iou=settings.DETECTOR_NMS_IOU, num_threads=settings.DETECTOR_THREADS)
+
+    # (channel, seat) -> [agreements, observations, fp32 occupied, int8 occupied]
+    seat_stats: Dict[Tuple[int, str], List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+    fp32_times, int8_times = [], []
+    count_diffs = []
+    warmed_up = False
+
+    for channel_id, source in channel_sources(args.frames, args.channel):
+        config_path = Path(args.roi_dir) / f"channel_{channel_id}.json"
+        if not config_path.exists():
+            print(f"⚠️  Channel {channel_id}: no ROI config at {config_path}, skipped")
+            continue
+
+        matcher = ROIMatcher(config_path)
+        crop = None
+        if settings.ROI_CROP_ENABLED:
+            crop = matcher.get_crop_region(settings.ROI_CROP_MARGIN, settings.ROI_CROP_TOP_MARGIN)
+
+        frames = 0
+        for _, frame in load_frames(source, args.limit, args.stride):
+            if not warmed_up:
+                fp32.detect_persons(frame, crop=crop)
+                int8.detect_persons(frame, crop=crop)
+                warmed_up = True
+
+            fp32_dets, fp32_ms = timed_detect(fp32, frame, crop)
+            int8_dets, int8_ms = timed_detect(int8, frame, crop)
+            fp32_times.append(fp32_ms)
+            int8_times.append(int8_ms)
+            count_diffs.append(len(int8_dets) - len(fp32_dets))
+
+            fp32_occ = matcher.check_occupancy(fp32_dets, settings.IOU_THRESHOLD)
+            int8_occ = matcher.check_occupancy(int8_dets, settings.IOU_THRESHOLD)
+            for seat_id, result in fp32_occ.items():
+                stats = seat_stats[(channel_id, seat_id)]
+                fp32_busy = result['status'] == 'occupied'
+                int8_busy = int8_occ[seat_id]['status'] == 'occupied'
+                stats[0] += fp32_busy == int8_busy
+                stats[1] += 1
+                stats[2] += fp32_busy
+                stats[3] += int8_busy
+            frames += 1
+
+        print(f"📹 Channel {channel_id}: {frames} frames from {source}")
+
+    if not seat_stats:
+        print("❌ No frames evaluated")
+        sys.exit(1)
+
+    print("\n" + "=" * 60)
+    print("Per-seat occupancy agreement (INT8 vs FP32)")
+    print("=" * 60)
+    print(f"{'channel':>7}  {'seat':>6}  {'agree':>7}  {'fp32 occ':>8}  {'int8 occ':>8}")
+    for (channel_id, seat_id), (agree, total, busy32, busy8) in sorted(seat_stats.items()):
+        flag = "" if agree == total else "  ⚠️"
+        print(f"{channel_id:>7}  {seat_id:>6}  {agree / total:>7.2%}  {busy32:>8}  {busy8:>8}{flag}")
+
+    agree_total = sum(s[0] for s in seat_stats.values())
+    obs_total = sum(s[1] for s in seat_stats.values())
+    agreement = agree_total / obs_total
+
+    print("\n" + "=" * 60)
+    print("Summary")
+    print("=" * 60)
+    print(f"Frames:              {len(fp32_times)}")
+    print(f"Seat observations:   {obs_total}")
+    print(f"Overall agreement:   {agreement:.2%}")
+    print(f"Worst seat:          {min(s[0] / s[1] for s in seat_stats.values()):.2%}")
+    print(f"Person count drift:  mean {np.mean(count_diffs):+.3f}, max |{np.max(np.abs(count_diffs))}|")
+    print(f"Latency p50 (ms):    {np.median(fp32_times):.1f} → {np.median(int8_times):.1f}")
+    print(f"Latency p95 (ms):    {np.percentile(fp32_times, 95):.1f} → {np.percentile(int8_times, 95):.1f}")
+    print(f"Speedup (p50):       {np.median(fp32_times) / max(np.median(int8_times), 1e-6):.2f}x")
+
+    if agreement < args.min_agreement:
+        print(f"\n❌ Agreement below {args.min_agreement:.0%}; keep the FP32 model")
+        sys.exit(1)
+    print("\n✅ INT8 model is within tolerance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Export the YOLO person model for the ONNX Runtime / OpenVINO backends.
+
+Usage:
+    python src/scripts/export_onnx.py --model yolo11n.pt
+    python src/scripts/export_onnx.py --model yolo11n.pt --format openvino
+    python src/scripts/export_onnx.py --model yolo11n.pt --dynamic
+
+Then point YOLO_MODEL at the exported file (DETECTOR_BACKEND=auto picks the
+backend from the extension) and run check_backend_parity.py before deploying.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.config import settings
+
+
+def export_model(model_path: str, fmt: str, imgsz: int, dynamic: bool, opset: int) -> str:
+    """Export a .pt model with ultralytics.
+
+    Args:
+        model_path: Source .pt model
+        fmt: 'onnx' or 'openvino'
+        imgsz: Square input size baked into the graph
+        dynamic: Dynamic batch/shape axes (needed for batched inference)
+        opset: ONNX opset version
+
+    Returns:
+        Path of the exported model
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(model_path)
+    if fmt == 'onnx':
+        return model.export(format='onnx', imgsz=imgsz, dynamic=dynamic, simplify=True, opset=opset)
+    return model.export(format='openvino', imgsz=imgsz, dynamic=dynamic, half=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export YOLO model for CPU backends')
+    parser.add_argument('--model', default=settings.YOLO_MODEL, help='Source .pt model')
+    parser.add_argument('--format', choices=['onnx', 'openvino'], default='onnx')
+    parser.add_argument('--imgsz', type=int, default=640, help='Input size')
+    parser.add_argument('--dynamic', action='store_true',
+                        help='Dynamic batch axis (lets the inference server batch frames)')
+    parser.add_argument('--opset', type=int, default=17, help='ONNX opset')
+    args = parser.parse_args()
+
+    print(f"📦 Exporting {args.model} → {args.format} (imgsz={args.imgsz}, dynamic={args.dynamic})")
+    exported = export_model(args.model, args.format, args.imgsz, args.dynamic, args.opset)
+    print(f"✅ Exported: {exported}")
+    print(f"\n💡 Set YOLO_MODEL={exported} and run:")
+    print(f"   python src/scripts/check_backend_parity.py --reference {args.model} --candidate {exported} --frames <dir|video>")
+
+
+if __name__ == "__main__":
+    main()
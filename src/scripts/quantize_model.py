@@ -0,0 +1,153 @@
+"""Produce an INT8 variant of the ONNX person model.
+
+Dynamic quantization only needs the FP32 model. Static quantization also
+calibrates activation ranges on recorded frames from our channels, which is
+usually faster at runtime on CPU (QDQ graph, no per-call range computation).
+
+The detection head (last ``/model.N/`` block: box decoding, concat, sigmoid)
+is kept in FP32 by default; quantizing it mostly costs box accuracy.
+
+Usage:
+    python src/scripts/quantize_model.py --model yolo11n.onnx --mode dynamic
+    python src/scripts/quantize_model.py --model yolo11n.onnx --mode static \\
+        --calibration data/frames/ --calibration-limit 300
+
+Then compare with evaluate_quantized_model.py before switching YOLO_MODEL.
+"""
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.backends import preprocess_image
+from src.scripts.check_backend_parity import load_frames
+
+try:
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        CalibrationMethod,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+except ImportError:
+    print("❌ onnx / onnxruntime not installed. Run: pip install onnx onnxruntime")
+    sys.exit(1)
+
+
+class FrameCalibrationReader(CalibrationDataReader):
+    """Feed recorded frames, preprocessed exactly like OnnxBackend, to the calibrator."""
+
+    def __init__(self, input_name: str, input_size: int, source: str, limit: int, stride: int):
+        self.input_name = input_name
+        self.input_size = (input_size, input_size)
+        self._frames = load_frames(source, limit, stride)
+        self.count = 0
+
+    def get_next(self) -> Optional[dict]:
+        frame = next(self._frames, None)
+        if frame is None:
+            return None
+        tensor, _ = preprocess_image(frame[1], self.input_size)
+        self.count += 1
+        return {self.input_name: tensor[None]}
+
+
+def head_nodes(model: "onnx.ModelProto") -> List[str]:
+    """Names of the nodes in the last ``/model.N/`` block (the Detect head)."""
+    indices = set()
+    for node in model.graph.node:
+        match = re.match(r'^/model\.(\d+)/', node.name)
+        if match:
+            indices.add(int(match.group(1)))
+    if not indices:
+        return []
+    prefix = f"/model.{max(indices)}/"
+    return [node.name for node in model.graph.node if node.name.startswith(prefix)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='INT8-quantize the ONNX person model')
+    parser.add_argument('--model', required=True, help='FP32 .onnx model')
+    parser.add_argument('--output', help='Output path (default: <model>_int8.onnx)')
+    parser.add_argument('--mode', choices=['dynamic', 'static'], default='static')
+    parser.add_argument('--calibration', help='Frames for static calibration (dir, video or RTSP URL)')
+    parser.add_argument('--calibration-limit', type=int, default=300, help='Calibration frames')
+    parser.add_argument('--stride', type=int, default=30, help='Frame stride for videos')
+    parser.add_argument('--calibration-method', choices=['minmax', 'entropy', 'percentile'],
+                        default='minmax')
+    parser.add_argument('--quantize-head', action='store_true',
+                        help='Also quantize the Detect head (smaller, less accurate)')
+    args = parser.parse_args()
+
+    model_path = Path(args.model)
+    output = Path(args.output) if args.output else model_path.with_name(
+        f"{model_path.stem}_int8{model_path.suffix}"
+    )
+
+    # Shape inference + graph cleanup recommended before quantization
+    prepared = output.with_name(f"{model_path.stem}_prep.onnx")
+    print(f"🔧 Pre-processing {model_path}")
+    quant_pre_process(str(model_path), str(prepared))
+
+    model = onnx.load(str(prepared))
+    excluded = [] if args.quantize_head else head_nodes(model)
+    if excluded:
+        print(f"   Keeping {len(excluded)} Detect head nodes in FP32")
+
+    if args.mode == 'dynamic':
+        print("⚙️  Dynamic quantization (INT8 weights)")
+        quantize_dynamic(
+            str(prepared),
+            str(output),
+            weight_type=QuantType.QInt8,
+            nodes_to_exclude=excluded,
+        )
+    else:
+        if not args.calibration:
+            print("❌ --calibration frames are required for static quantization")
+            sys.exit(1)
+
+        model_input = model.graph.input[0]
+        input_size = model_input.type.tensor_type.shape.dim[2].dim_value or 640
+        reader = FrameCalibrationReader(
+            model_input.name, input_size, args.calibration, args.calibration_limit, args.stride
+        )
+        method = {
+            'minmax': CalibrationMethod.MinMax,
+            'entropy': CalibrationMethod.Entropy,
+            'percentile': CalibrationMethod.Percentile,
+        }[args.calibration_method]
+
+        print(f"⚙️  Static quantization (QDQ, {args.calibration_method} calibration)")
+        quantize_static(
+            str(prepared),
+            str(output),
+            reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            calibrate_method=method,
+            nodes_to_exclude=excluded,
+        )
+        print(f"   Calibrated on {reader.count} frames")
+
+    prepared.unlink(missing_ok=True)
+
+    size_fp32 = model_path.stat().st_size / 1e6
+    size_int8 = output.stat().st_size / 1e6
+    print(f"✅ Saved {output} ({size_fp32:.1f} MB → {size_int8:.1f} MB)")
+    print("\n💡 Compare before deploying:")
+    print(f"   python src/scripts/evaluate_quantized_model.py --fp32 {model_path} --int8 {output} --frames <dir>")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
-from .rtsp_client import RTSPClient
+from .rtsp_client import RTSPClient, KeyframeRTSPClient, create_rtsp_client
 from .logger import StructuredLogger, PerformanceMonitor
 
-__all__ = ['RTSPClient', 'StructuredLogger', 'PerformanceMonitor']
+__all__ = [
+    'RTSPClient',
+    'KeyframeRTSPClient',
+    'create_rtsp_client',
+    'StructuredLogger',
+    'PerformanceMonitor',
+]
@@ -7,8 +7,9 @@ This module provides structured logging that writes to both:
 import logging
 import json
 import sys
+from collections import deque
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 from pathlib import Path
 
 
@@ -151,6 +152,9 @@ class StructuredLogger:
 class PerformanceMonitor:
     """Monitor and report performance metrics."""
 
+    # Frame ages kept for the rolling average (~1 min of frames at 15 FPS)
+    FRAME_AGE_WINDOW = 1000
+
     def __init__(self, logger: StructuredLogger, report_interval: int = 60):
         """Initialize performance monitor.
 
@@ -163,16 +167,49 @@ class PerformanceMonitor:
         self.metrics = {
             'frame_count': 0,
             'detection_times_ms': [],
+            'frame_ages_ms': deque(maxlen=self.FRAME_AGE_WINDOW),
             'error_count': 0,
             'warning_count': 0,
+            'db_writes': 0,
+            'db_writes_saved': 0,
+            'inference_runs': 0,
+            'inference_skips': 0,
             'start_time': datetime.now()
         }
         self.last_report = datetime.now()
+        self.stats_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def add_stats_provider(self, prefix: str, provider: Callable[[], Dict[str, Any]]):
+        """Include another component's stats in every report.
+
+        Args:
+            prefix: Key prefix for the provider's fields (e.g., 'write_queue')
+            provider: Callable returning a flat dict of metrics
+        """
+        self.stats_providers[prefix] = provider
+
+    def _provider_stats(self) -> Dict[str, Any]:
+        """Collect stats from registered providers."""
+        stats = {}
+        for prefix, provider in self.stats_providers.items():
+            try:
+                for key, value in provider().items():
+                    stats[f"{prefix}_{key}"] = value
+            except Exception as e:
+                stats[f"{prefix}_error"] = str(e)
+        return stats
 
-    def record_frame(self, detection_time_ms: float):
-        """Record successful frame processing."""
+    def record_frame(self, detection_time_ms: float, frame_age_ms: Optional[float] = None):
+        """Record successful frame processing.
+
+        Args:
+            detection_time_ms: Processing time for the frame
+            frame_age_ms: Time from frame decode to result (end-to-end latency)
+        """
         self.metrics['frame_count'] += 1
         self.metrics['detection_times_ms'].append(detection_time_ms)
+        if frame_age_ms is not None:
+            self.metrics['frame_ages_ms'].append(frame_age_ms)
 
         # Auto-report if interval passed
         self._check_report()
@@ -185,6 +222,25 @@ class PerformanceMonitor:
         """Record a warning occurrence."""
         self.metrics['warning_count'] += 1
 
+    def record_inference(self, ran: bool):
+        """Record whether a frame ran inference or reused the previous result."""
+        if ran:
+            self.metrics['inference_runs'] += 1
+        else:
+            self.metrics['inference_skips'] += 1
+
+    def _skip_ratio(self) -> float:
+        """Fraction of frames that skipped inference."""
+        total = self.metrics['inference_runs'] + self.metrics['inference_skips']
+        return self.metrics['inference_skips'] / total if total > 0 else 0
+
+    def record_db_write(self, written: bool):
+        """Record a seat status write, or one skipped by the write policy."""
+        if written:
+            self.metrics['db_writes'] += 1
+        else:
+            self.metrics['db_writes_saved'] += 1
+
     def _check_report(self):
         """Check if it's time to report."""
         now = datetime.now()
@@ -206,6 +262,11 @@ class PerformanceMonitor:
             if self.metrics['detection_times_ms'] else 0
         )
 
+        avg_frame_age = (
+            sum(self.metrics['frame_ages_ms']) / len(self.metrics['frame_ages_ms'])
+            if self.metrics['frame_ages_ms'] else 0
+        )
+
         error_rate = (
             self.metrics['error_count'] / self.metrics['frame_count']
             if self.metrics['frame_count'] > 0 else 0
@@ -217,9 +278,16 @@ class PerformanceMonitor:
             total_frames=self.metrics['frame_count'],
             fps=round(fps, 2),
             avg_detection_ms=round(avg_latency, 2),
+            avg_frame_age_ms=round(avg_frame_age, 2),
             error_count=self.metrics['error_count'],
             warning_count=self.metrics['warning_count'],
-            error_rate=round(error_rate, 4)
+            error_rate=round(error_rate, 4),
+            db_writes=self.metrics['db_writes'],
+            db_writes_saved=self.metrics['db_writes_saved'],
+            inference_runs=self.metrics['inference_runs'],
+            inference_skips=self.metrics['inference_skips'],
+            inference_skip_ratio=round(self._skip_ratio(), 3),
+            **self._provider_stats()
         )
 
     def get_stats(self) -> Dict[str, Any]:
@@ -230,14 +298,25 @@ class PerformanceMonitor:
             sum(self.metrics['detection_times_ms']) / len(self.metrics['detection_times_ms'])
             if self.metrics['detection_times_ms'] else 0
         )
+        avg_frame_age = (
+            sum(self.metrics['frame_ages_ms']) / len(self.metrics['frame_ages_ms'])
+            if self.metrics['frame_ages_ms'] else 0
+        )
 
         return {
             'uptime_seconds': uptime_seconds,
             'frame_count': self.metrics['frame_count'],
             'fps': fps,
             'avg_detection_ms': avg_latency,
+            'avg_frame_age_ms': avg_frame_age,
             'error_count': self.metrics['error_count'],
-            'warning_count': self.metrics['warning_count']
+            'warning_count': self.metrics['warning_count'],
+            'db_writes': self.metrics['db_writes'],
+            'db_writes_saved': self.metrics['db_writes_saved'],
+            'inference_runs': self.metrics['inference_runs'],
+            'inference_skips': self.metrics['inference_skips'],
+            'inference_skip_ratio': self._skip_ratio(),
+            **self._provider_stats()
         }
 
 
@@ -0,0 +1,70 @@
+"""Store opening hours ('06:00-24:00') as kept in stores.metadata."""
+from datetime import datetime
+from typing import Optional, Tuple
+
+ALWAYS_OPEN = ('24h', '24/7', '24시간', '00:00-24:00')
+
+
+def _parse_clock(value: str) -> int:
+    """'HH:MM' -> minutes since midnight (24:00 -> 1440)."""
+    hours, _, minutes = value.strip().partition(':')
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def parse_opening_hours(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse an opening-hours string.
+
+    Args:
+        value: 'HH:MM-HH:MM' (may wrap past midnight, e.g. '10:00-02:00'),
+            '24h' / '24시간' for always open, or None
+
+    Returns:
+        (open_minute, close_minute), (0, 1440) for always open, or None if
+        missing/unparseable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.lower() in ALWAYS_OPEN:
+        return (0, 1440)
+    try:
+        start, end = value.split('-', 1)
+        return (_parse_clock(start), _parse_clock(end))
+    except ValueError:
+        return None
+
+
+def is_open(value: Optional[str], now: Optional[datetime] = None, default: bool = True) -> bool:
+    """Check whether a store is open at a given time.
+
+    Args:
+        value: Opening hours string (see parse_opening_hours)
+        now: Time to check (defaults to now); aware datetimes are
+            converted to the host's local time first
+        default: Result when the hours are unknown
+
+    Returns:
+        True if open
+    """
+    hours = parse_opening_hours(value)
+    if hours is None:
+        return default
+
+    now = now or datetime.now()
+    if now.tzinfo is not None:
+        now = now.astimezone()
+    minute = now.hour * 60 + now.minute
+    start, end = hours
+    if end - start >= 1440 or start == end:
+        return True
+    if start < end:
+        return start <= minute < end
+    # Wraps past midnight
+    return minute >= start or minute < end
+
+
+def in_window(window: Optional[str], now: Optional[datetime] = None) -> bool:
+    """Check whether now falls in an 'HH:MM-HH:MM' window (False if unset)."""
+    if not window:
+        return False
+    return is_open(window, now, default=False)
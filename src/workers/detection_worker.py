@@ -3,20 +3,33 @@ import os
 import sys
 import time
 import signal
+import threading
+from collections import Counter
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
-from multiprocessing import Process, Queue, Event
-from collections import defaultdict
-from dateutil import parser as date_parser
+from multiprocessing import Process, Queue, Event, Value
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.config import settings
-from src.utils import RTSPClient, StructuredLogger, PerformanceMonitor
-from src.core import PersonDetector, ROIMatcher
+from src.utils import create_rtsp_client, StructuredLogger, PerformanceMonitor
+from src.utils.opening_hours import is_open, in_window
+from src.core import (
+    PersonDetector,
+    ROIMatcher,
+    InferenceServer,
+    MotionGate,
+    SeatBackgroundModel,
+    PersonTracker,
+)
+from src.core.backends import COCO_CLASS_NAMES
 from src.database.supabase_client import get_supabase_client
+from src.database.outbox import EventOutbox
+from src.workers.scheduler import SnapshotScheduler, frame_brightness
+from src.workers.seat_state import SeatState, SeatStatusMachine
+from src.workers.persistence import StatusWritePolicy, WriteBehindQueue
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -31,7 +44,10 @@ class ChannelWorker:
         channel_id: int,
         rtsp_url: str,
         stop_event: Event,
-        snapshot_interval: int = 3
+        snapshot_interval: int = 3,
+        detector=None,
+        state_reload_counter: Optional[Value] = None,
+        heartbeat: Optional[Value] = None
     ):
         """Initialize channel worker.
 
@@ -41,6 +57,12 @@ class ChannelWorker:
             rtsp_url: RTSP stream URL
             stop_event: Multiprocessing event for graceful shutdown
             snapshot_interval: Seconds between snapshots
+            detector: Shared detector (e.g. InferenceClient). If None, a
+                local PersonDetector is loaded in the worker process
+            state_reload_counter: Shared counter; incrementing it makes the
+                worker reload seat states from the database
+            heartbeat: Shared double set to time.time() on every loop
+                iteration (read by the MultiChannelWorker supervisor)
         """
         self.store_id = store_id
         self.channel_id = channel_id
@@ -50,15 +72,50 @@ class ChannelWorker:
 
         # Initialize clients (will be created in worker process)
         self.rtsp_client = None
-        self.detector = None
+        self.detector = detector
         self.roi_matcher = None
+        self.motion_gate = None
+        self.crop_region = None
+        self.background = None
+        self.tracker = None
+        self.scheduler = None
+        self._frames_since_detection = 0
+        self.background_path: Optional[Path] = None
+        self.opening_hours: Optional[str] = None
+        self.roi_version: Optional[str] = None
+        self._pending_roi: Optional[Dict] = None
+        self._roi_lock = threading.Lock()  # Guards _pending_roi and roi_version
+        self._roi_thread = None
+        self._background_saved_at = 0.0
         self.db = None
+        self.write_queue = None
+        self.outbox = None
         self.logger = None
         self.perf_monitor = None
+        self.write_policy = StatusWritePolicy(
+            heartbeat_interval=settings.STATUS_HEARTBEAT_INTERVAL,
+            confidence_bucket=settings.CONFIDENCE_BUCKET_SIZE
+        )
 
-        # State tracking
-        self.previous_occupancy = {}
-        self.abandoned_timers = defaultdict(float)  # seat_id -> elapsed time with object only
+        # Last inference result, reused while the motion gate sees no change
+        self.last_detections = []
+        self.last_objects = []
+        self.last_occupancy = None
+
+        # State tracking (loaded once from DB, then kept in memory)
+        self.seat_states: Dict[str, SeatState] = {}
+        self.state_reload_counter = state_reload_counter
+        self.heartbeat = heartbeat
+        self._state_generation = state_reload_counter.value if state_reload_counter else 0
+        self.status_machine = SeatStatusMachine(
+            enter_count=settings.STATUS_ENTER_COUNT,
+            leave_count=settings.STATUS_LEAVE_COUNT,
+            enter_seconds=settings.STATUS_ENTER_SECONDS,
+            leave_seconds=settings.STATUS_LEAVE_SECONDS,
+            abandoned_after=settings.ABANDONED_AFTER_SECONDS,
+            object_clear_count=settings.OBJECT_CLEAR_COUNT,
+            object_clear_seconds=settings.OBJECT_CLEAR_SECONDS
+        )
 
     def initialize(self):
         """Initialize resources (must be called in worker process)."""
@@ -73,18 +130,119 @@ class ChannelWorker:
         self.perf_monitor = PerformanceMonitor(self.logger, report_interval=60)
 
         # RTSP client
-        self.rtsp_client = RTSPClient(self.rtsp_url)
-
-        # YOLO detector
-        self.detector = PersonDetector(
-            model_path=settings.YOLO_MODEL,
-            confidence=settings.CONFIDENCE_THRESHOLD
+        self.rtsp_client = create_rtsp_client(
+            self.rtsp_url,
+            mode=settings.RTSP_CAPTURE_MODE,
+            max_frame_age=settings.RTSP_MAX_FRAME_AGE
         )
 
+        # YOLO detector (skipped when a shared inference client was injected)
+        if self.detector is None:
+            self.detector = PersonDetector(
+                model_path=settings.YOLO_MODEL,
+                confidence=settings.CONFIDENCE_THRESHOLD,
+                backend=settings.DETECTOR_BACKEND,
+                nms_iou=settings.DETECTOR_NMS_IOU,
+                num_threads=settings.DETECTOR_THREADS,
+                object_classes=(
+                    settings.BELONGING_CLASSES if settings.OBJECT_DETECTION_ENABLED else None
+                )
+            )
+
         # Database client
         self.db = get_supabase_client()
 
+        # Write-behind stage so slow DB calls never block the frame loop
+        self.write_queue = WriteBehindQueue(
+            self.db,
+            self.store_id,
+            max_size=settings.WRITE_QUEUE_MAX_SIZE,
+            batch_size=settings.WRITE_BATCH_SIZE,
+            flush_interval=settings.WRITE_FLUSH_INTERVAL,
+            put_timeout=settings.WRITE_PUT_TIMEOUT,
+            max_attempts=settings.WRITE_MAX_ATTEMPTS,
+            logger=self.logger
+        )
+        self.write_queue.start()
+        self.perf_monitor.add_stats_provider('write_queue', self.write_queue.get_stats)
+
+        # Events go to a local outbox first so DB outages never lose history
+        if settings.EVENT_OUTBOX_ENABLED:
+            self.outbox = EventOutbox(
+                settings.OUTBOX_DIR / f"{self.store_id}_channel_{self.channel_id}.db",
+                db=self.db,
+                batch_size=settings.OUTBOX_BATCH_SIZE,
+                replay_interval=settings.OUTBOX_REPLAY_INTERVAL,
+                max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+                logger=self.logger
+            )
+            self.outbox.start()
+            self.perf_monitor.add_stats_provider('outbox', self.outbox.get_stats)
+
         # Load ROI configuration from database
+        roi = self._load_roi()
+        if roi is None:
+            return False
+        self._apply_roi(roi)
+
+        if settings.TRACKER_ENABLED:
+            self.tracker = PersonTracker(
+                match_iou=settings.TRACKER_MATCH_IOU,
+                high_confidence=settings.TRACKER_HIGH_CONFIDENCE,
+                max_lost=settings.TRACKER_MAX_LOST,
+                min_hits=settings.TRACKER_MIN_HITS
+            )
+            self.perf_monitor.add_stats_provider('tracker', self.tracker.get_stats)
+
+        # Opening hours drive background refresh and the snapshot interval
+        store = self.db.get_store(self.store_id) or {}
+        self.opening_hours = (store.get('metadata') or {}).get('opening_hours')
+
+        if settings.SNAPSHOT_ADAPTIVE_ENABLED:
+            self.scheduler = SnapshotScheduler(
+                base_interval=self.snapshot_interval,
+                min_interval=settings.SNAPSHOT_MIN_INTERVAL,
+                idle_interval=settings.SNAPSHOT_IDLE_INTERVAL,
+                max_interval=settings.SNAPSHOT_MAX_INTERVAL,
+                backoff=settings.SNAPSHOT_BACKOFF,
+                dark_brightness=settings.SNAPSHOT_DARK_BRIGHTNESS,
+                opening_hours=self.opening_hours
+            )
+            self.perf_monitor.add_stats_provider('scheduler', self.scheduler.get_stats)
+
+        # Load current seat states once (reconciled again only on reload)
+        self.reload_seat_states()
+
+        # Watch for ROI edits; rebuilt config is swapped in between frames
+        if settings.ROI_RELOAD_INTERVAL > 0:
+            self._roi_thread = threading.Thread(
+                target=self._watch_roi,
+                name=f"RoiWatcher-{self.channel_id}",
+                daemon=True
+            )
+            self._roi_thread.start()
+
+        self.logger.info(
+            "Worker initialized successfully",
+            channel=self.channel_id,
+            seats_count=len(self.roi_matcher.seats),
+            seat_ids=[s['id'] for s in self.roi_matcher.seats],
+            crop_region=self.crop_region,
+            opening_hours=self.opening_hours
+        )
+        return True
+
+    def _load_roi(self) -> Optional[Dict]:
+        """Fetch this channel's seats and build everything derived from them.
+
+        Only creates new objects, so it can run off the frame loop.
+
+        Returns:
+            Dict with version, matcher, crop_region, motion_gate, background
+            and background_path, or None if the channel has no usable ROIs
+        """
+        # Version first: an edit landing in between is caught next check
+        version = self.db.get_roi_version(self.store_id, self.channel_id)
         seats = self.db.get_seats(self.store_id, active_only=True)
         channel_seats = [s for s in seats if s.get('channel_id') == self.channel_id]
 
@@ -94,7 +252,7 @@ class ChannelWorker:
                 channel=self.channel_id,
                 total_seats=len(seats)
             )
-            return False
+            return None
 
         # Build ROI config for matcher
         roi_config = {
@@ -117,26 +275,171 @@ class ChannelWorker:
                 "No ROI polygons configured",
                 channel=self.channel_id
             )
-            return False
+            return None
+
+        roi = {
+            'version': version,
+            'matcher': ROIMatcher(roi_config),
+            'crop_region': None,
+            'motion_gate': None,
+            'background': None,
+            'background_path': None,
+        }
+        matcher = roi['matcher']
+        if settings.ROI_LABEL_MAP:
+            matcher.build_label_map(
+                downsample=settings.ROI_LABEL_MAP_DOWNSAMPLE,
+                cache_dir=settings.ROI_CACHE_DIR
+            )
 
-        self.roi_matcher = ROIMatcher(roi_config)
+        if settings.ROI_CROP_ENABLED:
+            roi['crop_region'] = matcher.get_crop_region(
+                margin=settings.ROI_CROP_MARGIN,
+                top_margin=settings.ROI_CROP_TOP_MARGIN
+            )
 
-        # Initialize previous state
-        for seat in roi_config['seats']:
-            seat_id = seat['id']
-            status = self.db.get_seat_status(self.store_id, seat_id)
-            if status:
-                self.previous_occupancy[seat_id] = status.get('status', 'empty')
-            else:
-                self.previous_occupancy[seat_id] = 'empty'
+        if settings.MOTION_GATE_ENABLED:
+            roi['motion_gate'] = MotionGate(
+                matcher.seats,
+                matcher.resolution,
+                scale=settings.MOTION_GATE_SCALE,
+                pixel_threshold=settings.MOTION_PIXEL_THRESHOLD,
+                change_ratio=settings.MOTION_CHANGE_RATIO,
+                force_interval=settings.MOTION_FORCE_INTERVAL
+            )
+
+        if settings.BACKGROUND_MODEL_ENABLED:
+            background = SeatBackgroundModel(
+                matcher.seats,
+                max_pixels=settings.BACKGROUND_MAX_PIXELS,
+                pixel_threshold=settings.BACKGROUND_PIXEL_THRESHOLD,
+                change_ratio=settings.BACKGROUND_CHANGE_RATIO,
+                learning_rate=settings.BACKGROUND_LEARNING_RATE
+            )
+            # Keyed by ROI hash so edited seats never reuse stale crops
+            roi['background_path'] = settings.BACKGROUND_DIR / (
+                f"{self.store_id}_channel_{self.channel_id}_"
+                f"{matcher.config_hash()[:16]}.npz"
+            )
+            restored = background.load(roi['background_path'])
+            roi['background'] = background
+            self.logger.info(
+                "Seat background model ready",
+                channel=self.channel_id,
+                restored_seats=restored
+            )
+
+        return roi
 
+    def _apply_roi(self, roi: Dict):
+        """Switch the frame loop to a config built by _load_roi().
+
+        Detector, RTSP client and tracker are kept; the motion gate starts
+        without a reference frame, so the next frame runs full inference.
+        """
+        self._save_background()
+        self.roi_matcher = roi['matcher']
+        self.crop_region = roi['crop_region']
+        self.motion_gate = roi['motion_gate']
+        self.background = roi['background']
+        self.background_path = roi['background_path']
+        self.last_occupancy = None
+        if self.background is not None:
+            self.perf_monitor.add_stats_provider('background', self.background.get_stats)
+        with self._roi_lock:
+            self.roi_version = roi['version']
+
+    def _watch_roi(self):
+        """Poll the ROI version and stage a rebuilt config when it changes.
+
+        The watcher only stages configs; roi_version is set by the frame
+        thread once _apply_roi() has swapped the config in.
+        """
+        unusable = None  # Version without usable seats, not rebuilt again
+        while not self.stop_event.is_set():
+            self._sleep(settings.ROI_RELOAD_INTERVAL)
+            if self.stop_event.is_set():
+                break
+            try:
+                version = self.db.get_roi_version(self.store_id, self.channel_id)
+                with self._roi_lock:
+                    staged = self._pending_roi
+                    current = staged['version'] if staged else self.roi_version
+                if version in (current, unusable):
+                    continue
+                roi = self._load_roi()
+                if roi is None:
+                    # Keep monitoring the old seats rather than going blind
+                    unusable = version
+                    continue
+                roi['seat_rows'] = {
+                    row['seat_id']: row
+                    for row in self.db.get_all_seat_statuses(self.store_id)
+                }
+                with self._roi_lock:
+                    self._pending_roi = roi
+                self.logger.info(
+                    "ROI change detected, staged new config",
+                    channel=self.channel_id,
+                    version=roi['version'][:12],
+                    seats_count=len(roi['matcher'].seats)
+                )
+            except Exception as e:
+                self.logger.warning("ROI version check failed", channel=self.channel_id, error=str(e))
+
+    def _check_roi_reload(self):
+        """Swap in a staged ROI config (called between frames)."""
+        with self._roi_lock:
+            roi, self._pending_roi = self._pending_roi, None
+        if roi is None:
+            return
+        seat_rows = roi.pop('seat_rows')
+        self._apply_roi(roi)
+
+        # Unchanged seats keep their debounce/abandon state; new seats
+        # start from their stored status
+        previous = self.seat_states
+        self.seat_states = {
+            seat['id']: previous.get(seat['id']) or SeatState.from_db(seat['id'], seat_rows.get(seat['id']))
+            for seat in self.roi_matcher.seats
+        }
         self.logger.info(
-            "Worker initialized successfully",
+            "ROI config reloaded",
             channel=self.channel_id,
-            seats_count=len(roi_config['seats']),
-            seat_ids=[s['id'] for s in roi_config['seats']]
+            seats_count=len(self.seat_states),
+            added=sorted(set(self.seat_states) - set(previous)),
+            removed=sorted(set(previous) - set(self.seat_states)),
+            crop_region=self.crop_region
         )
-        return True
+
+    def reload_seat_states(self):
+        """Load seat states for this channel from the database.
+
+        Called on startup and when a reload is requested; process_frame()
+        otherwise works purely from the in-memory table.
+        """
+        rows = {
+            row['seat_id']: row
+            for row in self.db.get_all_seat_statuses(self.store_id)
+        }
+        self.seat_states = {
+            seat['id']: SeatState.from_db(seat['id'], rows.get(seat['id']))
+            for seat in self.roi_matcher.seats
+        }
+        self.logger.info(
+            "Seat states loaded",
+            channel=self.channel_id,
+            seats_count=len(self.seat_states)
+        )
+
+    def _check_state_reload(self):
+        """Reload seat states if a reload was requested since the last check."""
+        if self.state_reload_counter is None:
+            return
+        generation = self.state_reload_counter.value
+        if generation != self._state_generation:
+            self._state_generation = generation
+            self.reload_seat_states()
 
     def connect_rtsp(self) -> bool:
         """Connect to RTSP stream."""
@@ -153,67 +456,125 @@ class ChannelWorker:
         import time
         start_time = time.time()
 
-        # Detect persons
-        detections = self.detector.detect_persons(frame)
+        self._check_state_reload()
+        self._check_roi_reload()
 
-        # Match with ROIs
-        occupancy = self.roi_matcher.check_occupancy(
-            detections,
-            iou_threshold=settings.IOU_THRESHOLD
+        # Skip YOLO when no seat ROI changed since the last inference
+        gate_triggered = self.motion_gate is not None and self.motion_gate.should_run(frame)
+        scene_changed = (
+            self.motion_gate is None
+            or gate_triggered
+            or self.last_occupancy is None
         )
+        # With a tracker, full detection runs every TRACKER_DETECT_EVERY
+        # frames and tracks are predicted in between. A motion gate trigger
+        # (motion or forced refresh) always detects right away, so the
+        # gate's MOTION_FORCE_INTERVAL staleness bound still holds.
+        run_inference = scene_changed and (
+            self.tracker is None
+            or gate_triggered
+            or self.last_occupancy is None
+            or self._frames_since_detection + 1 >= settings.TRACKER_DETECT_EVERY
+        )
+
+        if run_inference:
+            # Detect persons and belongings in one pass (only inside the
+            # seat region when cropping)
+            detections, objects = self.detector.detect_persons_and_objects(
+                frame, crop=self.crop_region
+            )
+
+            # Tracks bridge single-frame misses before ROI matching
+            if self.tracker is not None:
+                detections = self.tracker.update(detections)
+
+            # Match with ROIs
+            occupancy = self.roi_matcher.check_occupancy(
+                detections,
+                iou_threshold=settings.IOU_THRESHOLD,
+                object_detections=objects
+            )
+
+            self.last_detections = detections
+            self.last_objects = objects
+            self.last_occupancy = occupancy
+            self._frames_since_detection = 0
+            if self.motion_gate is not None:
+                self.motion_gate.mark_inferred()
+        elif scene_changed:
+            # Between detections: match the tracks' predicted boxes
+            detections = self.tracker.predict()
+            objects = self.last_objects
+            occupancy = self.roi_matcher.check_occupancy(
+                detections,
+                iou_threshold=settings.IOU_THRESHOLD,
+                object_detections=objects
+            )
+
+            self.last_detections = detections
+            self.last_occupancy = occupancy
+            self._frames_since_detection += 1
+        else:
+            detections = self.last_detections
+            objects = self.last_objects
+            occupancy = self.last_occupancy
+        self.perf_monitor.record_inference(run_inference)
 
         # Record performance
         detection_time_ms = (time.time() - start_time) * 1000
-        self.perf_monitor.record_frame(detection_time_ms)
+        frame_age = self.rtsp_client.get_frame_age()
+        self.perf_monitor.record_frame(
+            detection_time_ms,
+            frame_age_ms=frame_age * 1000 if frame_age is not None else None
+        )
+
+        # Process each seat, collecting this frame's writes
+        # Aware UTC: written to TIMESTAMPTZ columns and compared with them
+        current_time = datetime.now(timezone.utc)
+        background_scores = self._update_background(frame, occupancy, current_time)
 
-        # Process each seat
-        current_time = datetime.now()
+        pending_statuses = []  # (state, status_update)
+        pending_events = []
 
         for seat_id, info in occupancy.items():
-            current_status = info['status']  # 'occupied' or 'empty'
-            person_detected = current_status == 'occupied'
-            object_detected = False  # TODO: Implement object detection
-            confidence = info['max_iou'] if person_detected else 0.0
+            observed_person = info['status'] == 'occupied'
+            object_detected = info.get('object_detected', False) or (
+                seat_id in background_scores
+                and self.background.object_present(background_scores[seat_id])
+            )
 
             # Get previous status
-            prev_status = self.previous_occupancy.get(seat_id, 'empty')
+            state = self.seat_states.setdefault(seat_id, SeatState(seat_id))
+            prev_status = state.status
 
-            # Determine new status (considering abandoned items)
-            new_status = current_status
+            # Debounced transition (tentative until confirmed); abandoned
+            # follows wall-clock time with belongings but no person
+            new_status = self.status_machine.observe(
+                state, observed_person, object_detected, current_time
+            )
+            person_detected = new_status == 'occupied'
 
-            # Abandoned item detection logic
-            if not person_detected and object_detected:
-                # Object without person - increment timer
-                self.abandoned_timers[seat_id] += self.snapshot_interval
-                if self.abandoned_timers[seat_id] >= 600:  # 10 minutes
-                    new_status = 'abandoned'
-            else:
-                # Reset timer
-                self.abandoned_timers[seat_id] = 0
+            # Hold the last confidence through tentative misses so the
+            # written row does not flap with the raw observation
+            if observed_person:
+                state.confidence = info['max_iou']
+            elif not person_detected:
+                state.confidence = 0.0
+            confidence = state.confidence
 
-            # Calculate vacant duration
+            # Calculate vacant duration from the in-memory state
             vacant_duration = 0
-            last_person_seen = None
-            last_empty_time = None
 
             if new_status == 'empty':
-                # Get previous status from DB to calculate duration
-                db_status = self.db.get_seat_status(self.store_id, seat_id)
-                if db_status:
-                    last_empty_time_raw = db_status.get('last_empty_time')
-                    if last_empty_time_raw:
-                        # Parse datetime string from Supabase
-                        if isinstance(last_empty_time_raw, str):
-                            last_empty_time = date_parser.parse(last_empty_time_raw)
-                        else:
-                            last_empty_time = last_empty_time_raw
-                        vacant_duration = int((current_time - last_empty_time).total_seconds())
-                    else:
-                        last_empty_time = current_time
-                else:
-                    last_empty_time = current_time
-            elif new_status == 'occupied':
-                last_person_seen = current_time
+                if state.last_empty_time is None:
+                    state.last_empty_time = current_time
+                vacant_duration = int((current_time - state.last_empty_time).total_seconds())
+            else:
+                state.last_empty_time = None
+                if new_status == 'occupied':
+                    state.last_person_seen = current_time
+
+            state.vacant_duration_seconds = vacant_duration
 
             # Update database
             status_update = {
@@ -221,21 +582,17 @@ class ChannelWorker:
                 'person_detected': person_detected,
                 'object_detected': object_detected,
                 'detection_confidence': confidence,
-                'last_person_seen': last_person_seen,
-                'last_empty_time': last_empty_time,
-                'vacant_duration_seconds': vacant_duration
+                'last_person_seen': state.last_person_seen,
+                'last_empty_time': state.last_empty_time,
+                'vacant_duration_seconds': vacant_duration,
+                'updated_at': current_time
             }
 
-            try:
-                self.db.update_seat_status(self.store_id, seat_id, status_update)
-            except Exception as e:
-                self.logger.warning(
-                    "Failed to update seat status",
-                    channel=self.channel_id,
-                    seat_id=seat_id,
-                    error=str(e)
-                )
-                self.perf_monitor.record_warning()
+            # Skip the write unless something changed or the heartbeat is due
+            if self.write_policy.should_write(state, status_update, current_time):
+                pending_statuses.append((state, status_update))
+            else:
+                self.perf_monitor.record_db_write(False)
 
             # Log event if status changed
             if new_status != prev_status:
@@ -250,10 +607,15 @@ class ChannelWorker:
 
                 event_type = event_type_map.get((prev_status, new_status), 'status_change')
 
-                # Get bounding box if detected
-                bbox = None
-                if person_detected and info.get('matched_detection'):
+                # Get bounding box if detected (keys always present so a
+                # bulk insert sees the same columns on every row)
+                bbox = {'bbox_x1': None, 'bbox_y1': None, 'bbox_x2': None, 'bbox_y2': None}
+                det = None
+                if observed_person and info.get('matched_detection') is not None:
                     det = info['matched_detection']
+                elif object_detected and info.get('matched_object') is not None:
+                    det = info['matched_object']
+                if det is not None:
                     bbox = {
                         'bbox_x1': int(det[0]),
                         'bbox_y1': int(det[1]),
@@ -261,6 +623,20 @@ class ChannelWorker:
                         'bbox_y2': int(det[3])
                     }
 
+                metadata = {
+                    'detections_count': len(detections),
+                    'objects_count': len(objects),
+                    'iou': info['max_iou']
+                }
+                if seat_id in background_scores:
+                    metadata['background_score'] = round(background_scores[seat_id], 3)
+                matched = info.get('matched_detection')
+                if observed_person and matched is not None and len(matched) > 5:
+                    metadata['track_id'] = int(matched[5])
+                if object_detected and info.get('matched_object') is not None:
+                    class_id = int(info['matched_object'][5])
+                    metadata['object_class'] = COCO_CLASS_NAMES.get(class_id, str(class_id))
+
                 event_data = {
                     'store_id': self.store_id,
                     'seat_id': seat_id,
@@ -271,46 +647,188 @@ class ChannelWorker:
                     'person_detected': person_detected,
                     'object_detected': object_detected,
                     'confidence': confidence,
-                    **(bbox or {}),
-                    'metadata': {
-                        'detections_count': len(detections),
-                        'iou': info['max_iou']
-                    }
+                    'created_at': current_time,
+                    **bbox,
+                    'metadata': metadata
                 }
-
-                try:
-                    self.db.log_detection_event(event_data)
-                    self.logger.info(
-                        "Status changed",
-                        channel=self.channel_id,
-                        seat_id=seat_id,
-                        previous_status=prev_status,
-                        new_status=new_status,
-                        event_type=event_type,
-                        confidence=round(confidence, 3)
-                    )
-                except Exception as e:
-                    self.logger.warning(
-                        "Failed to log detection event",
-                        channel=self.channel_id,
-                        seat_id=seat_id,
-                        error=str(e)
-                    )
-                    self.perf_monitor.record_warning()
+                pending_events.append(event_data)
 
             # Update previous state
-            self.previous_occupancy[seat_id] = new_status
+            state.status = new_status
+
+        self._flush_frame_writes(pending_statuses, pending_events, current_time)
+
+        if self.scheduler is not None:
+            # Keep sampling fast while a transition is being confirmed
+            active = scene_changed or bool(pending_events) or any(
+                state.pending_status is not None for state in self.seat_states.values()
+            )
+            self.scheduler.observe(active, frame_brightness(frame), current_time)
+
+    def next_interval(self) -> float:
+        """Seconds to wait before the next snapshot."""
+        if self.scheduler is not None:
+            return self.scheduler.interval
+        return self.snapshot_interval
+
+    def _is_closed(self, current_time: datetime) -> bool:
+        """Whether backgrounds may be refreshed outright (store closed)."""
+        return (
+            not is_open(self.opening_hours, current_time, default=True)
+            or in_window(settings.BACKGROUND_REFRESH_WINDOW, current_time)
+        )
+
+    def _update_background(self, frame, occupancy, current_time: datetime) -> Dict[str, float]:
+        """Score empty seats against their backgrounds and refresh them.
+
+        While the store is closed, empty seats are re-captured every
+        BACKGROUND_REFRESH_INTERVAL. While open:
+
+        - a missing background is captured only once the seat has been
+          confirmed empty and unchanged for BACKGROUND_STABLE_SECONDS
+        - seats that still match their background are blended in slowly, so
+          an item left behind is never learned right away
+        - a change that persists on an empty seat for
+          BACKGROUND_ABSORB_SECONDS (a moved chair) becomes the background
+
+        Returns:
+            Dictionary mapping seat_id to difference score (empty seats only)
+        """
+        if self.background is None:
+            return {}
+
+        empty = [
+            seat_id for seat_id, info in occupancy.items()
+            if info['status'] == 'empty' and not info.get('object_detected')
+        ]
+        scores = self.background.score(frame, empty)
+        now = time.time()
+
+        if self._is_closed(current_time):
+            due = [
+                seat_id for seat_id in empty
+                if now - self.background.updated_at.get(seat_id, 0.0) >= settings.BACKGROUND_REFRESH_INTERVAL
+            ]
+            if due:
+                self.background.update(frame, due, rate=1.0, now=now)
+        else:
+            # Debounced empty, not just this frame's raw observation
+            settled = [
+                seat_id for seat_id in empty
+                if seat_id in self.seat_states
+                and self.seat_states[seat_id].status == 'empty'
+                and self.seat_states[seat_id].pending_status is None
+            ]
+            self.background.capture_when_stable(
+                frame, settled, settings.BACKGROUND_STABLE_SECONDS, now=now
+            )
+            quiet = [
+                seat_id for seat_id in settled
+                if seat_id in scores and not self.background.object_present(scores[seat_id])
+            ]
+            self.background.update(frame, quiet, now=now)
+            absorbed = self.background.absorb(
+                frame, scores, settings.BACKGROUND_ABSORB_SECONDS, now=now
+            )
+            if absorbed:
+                self.logger.info(
+                    "Persistent seat change absorbed into background",
+                    channel=self.channel_id,
+                    seat_ids=absorbed
+                )
+
+        if now - self._background_saved_at >= settings.BACKGROUND_REFRESH_INTERVAL:
+            self._save_background()
+        return scores
+
+    def _save_background(self):
+        """Persist background crops so restarts keep them."""
+        if self.background is None or not self.background.backgrounds:
+            return
+        try:
+            self.background.save(self.background_path)
+            self._background_saved_at = time.time()
+        except Exception as e:
+            self.logger.warning("Failed to save seat backgrounds", error=str(e))
+
+    def _flush_frame_writes(self, pending_statuses, pending_events, current_time):
+        """Hand one frame's seat statuses and events to the persistence stages.
+
+        Status rows go to the write-behind queue, which coalesces them per
+        seat and retries failed flushes itself, so rows are marked written
+        once queued. Events go to the durable outbox (or the write queue if
+        the outbox is disabled).
+        """
+        for state, update in pending_statuses:
+            if self.write_queue.put_status(state.seat_id, update):
+                self.write_policy.mark_written(state, update, current_time)
+                self.perf_monitor.record_db_write(True)
+            else:
+                self.logger.warning(
+                    "Write queue full, status update dropped",
+                    channel=self.channel_id,
+                    seat_id=state.seat_id,
+                    queue_depth=self.write_queue.depth
+                )
+                self.perf_monitor.record_warning()
+
+        for event in pending_events:
+            if self.outbox is not None:
+                self.outbox.append(event)
+                queued = True
+            else:
+                queued = self.write_queue.put_event(event)
+
+            if queued:
+                self.logger.info(
+                    "Status changed",
+                    channel=self.channel_id,
+                    seat_id=event['seat_id'],
+                    previous_status=event['previous_status'],
+                    new_status=event['new_status'],
+                    event_type=event['event_type'],
+                    confidence=round(event['confidence'], 3)
+                )
+            else:
+                self.logger.warning(
+                    "Write queue full, detection event dropped",
+                    channel=self.channel_id,
+                    seat_id=event['seat_id'],
+                    event_type=event['event_type'],
+                    queue_depth=self.write_queue.depth
+                )
+                self.perf_monitor.record_warning()
+
+    def _sleep(self, seconds: float):
+        """Sleep, returning early once stop_event is set.
+
+        Polls instead of stop_event.wait(): a worker killed while waiting on
+        a multiprocessing Event leaves it unable to ever be set() again.
+        """
+        deadline = time.time() + seconds
+        while not self.stop_event.is_set():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.5))
+
+    def beat(self):
+        """Report liveness to the supervisor."""
+        if self.heartbeat is not None:
+            self.heartbeat.value = time.time()
 
     def run(self):
         """Main worker loop."""
         try:
             # Initialize in worker process
+            self.beat()
             if not self.initialize():
                 if self.logger:
                     self.logger.error("Initialization failed", channel=self.channel_id)
                 return
 
             # Connect to RTSP
+            self.beat()
             if not self.connect_rtsp():
                 self.logger.error("RTSP connection failed", channel=self.channel_id)
                 return
@@ -323,6 +841,7 @@ class ChannelWorker:
             max_errors = 10
 
             while not self.stop_event.is_set():
+                self.beat()
                 try:
                     # Capture frame
                     frame = self.rtsp_client.capture_frame()
@@ -364,19 +883,21 @@ class ChannelWorker:
 
                     # Log progress
                     if frame_count % 20 == 0:
-                        occupied = sum(1 for s in self.previous_occupancy.values() if s == 'occupied')
-                        total = len(self.previous_occupancy)
+                        occupied = sum(1 for s in self.seat_states.values() if s.status == 'occupied')
+                        total = len(self.seat_states)
                         self.logger.debug(
                             "Processing progress",
                             channel=self.channel_id,
                             frame_count=frame_count,
                             occupied=occupied,
                             total_seats=total,
-                            occupancy_rate=round(occupied / total, 2) if total > 0 else 0
+                            occupancy_rate=round(occupied / total, 2) if total > 0 else 0,
+                            frames_dropped=self.rtsp_client.frames_dropped,
+                            write_queue_depth=self.write_queue.depth
                         )
 
-                    # Wait for next snapshot
-                    time.sleep(self.snapshot_interval)
+                    # Wait for next snapshot (wakes early on shutdown)
+                    self._sleep(self.next_interval())
 
                 except KeyboardInterrupt:
                     self.logger.info("Received keyboard interrupt", channel=self.channel_id)
@@ -410,6 +931,14 @@ class ChannelWorker:
             if self.rtsp_client:
                 self.rtsp_client.disconnect()
 
+            self._save_background()
+
+            # Flush pending writes before reporting
+            if self.write_queue:
+                self.write_queue.stop()
+            if self.outbox:
+                self.outbox.stop()
+
             # Log final statistics
             if self.db and self.perf_monitor:
                 try:
@@ -423,7 +952,9 @@ class ChannelWorker:
                             'frame_count': frame_count,
                             'uptime_hours': round(stats['uptime_seconds'] / 3600, 2),
                             'avg_fps': round(stats['fps'], 2),
-                            'error_count': stats['error_count']
+                            'error_count': stats['error_count'],
+                            'db_writes': stats['db_writes'],
+                            'db_writes_saved': stats['db_writes_saved']
                         }
                     )
                 except Exception as e:
@@ -431,6 +962,25 @@ class ChannelWorker:
                         self.logger.error("Failed to log final statistics", error=str(e))
 
 
+def build_rtsp_url(store: Dict, channel_id: int) -> str:
+    """Generate the RTSP URL of a store's channel."""
+    username = settings.RTSP_USERNAME
+    password = settings.RTSP_PASSWORD
+    host = store.get('rtsp_host') or settings.RTSP_HOST
+    port = store.get('rtsp_port') or settings.RTSP_PORT
+    path = f"live_{channel_id:02d}"
+
+    return f"rtsp://{username}:{password}@{host}:{port}/{path}"
+
+
+def resolve_channel_ids(store: Dict) -> List[int]:
+    """Channels to monitor for a store: active_channels, else 1..total_channels."""
+    if store.get('active_channels'):
+        return list(store['active_channels'])
+    total = store.get('total_channels', 4)
+    return list(range(1, total + 1))
+
+
 class MultiChannelWorker:
     """Manager for multiple channel workers."""
 
@@ -443,8 +993,22 @@ class MultiChannelWorker:
         """
         self.store_id = store_id
         self.channel_ids = channel_ids
-        self.processes: List[Process] = []
+        self.processes: Dict[int, Process] = {}
         self.stop_event = Event()
+        self.state_reload_counter = Value('i', 0)
+        self.inference_server: Optional[InferenceServer] = None
+        self.detectors: Dict[int, object] = {}
+
+        # Supervisor state per channel
+        self.heartbeats: Dict[int, Value] = {
+            channel_id: Value('d', 0.0) for channel_id in channel_ids
+        }
+        self.started_at: Dict[int, float] = {}
+        self.restart_times: Dict[int, List[float]] = {channel_id: [] for channel_id in channel_ids}
+        self.next_restart_at: Dict[int, float] = {}
+        self.stale_channels = set()
+        self.server_restart_times: List[float] = []
+        self.server_exhausted = False
 
         # Initialize logger for orchestrator
         self.logger = StructuredLogger(
@@ -460,13 +1024,7 @@ class MultiChannelWorker:
 
     def get_rtsp_url(self, channel_id: int) -> str:
         """Generate RTSP URL for channel."""
-        username = settings.RTSP_USERNAME
-        password = settings.RTSP_PASSWORD
-        host = self.store.get('rtsp_host') or settings.RTSP_HOST
-        port = self.store.get('rtsp_port') or settings.RTSP_PORT
-        path = f"live_{channel_id:02d}"
-
-        return f"rtsp://{username}:{password}@{host}:{port}/{path}"
+        return build_rtsp_url(self.store, channel_id)
 
     def start(self):
         """Start all channel workers."""
@@ -484,28 +1042,39 @@ class MultiChannelWorker:
             channel_count=len(self.channel_ids)
         )
 
-        for channel_id in self.channel_ids:
-            rtsp_url = self.get_rtsp_url(channel_id)
-
-            worker = ChannelWorker(
-                store_id=self.store_id,
-                channel_id=channel_id,
-                rtsp_url=rtsp_url,
-                stop_event=self.stop_event,
-                snapshot_interval=settings.SNAPSHOT_INTERVAL
+        # One shared model process instead of a YOLO copy per channel
+        detectors = self.detectors
+        if settings.SHARED_INFERENCE:
+            self.inference_server = InferenceServer(
+                model_path=settings.YOLO_MODEL,
+                confidence=settings.CONFIDENCE_THRESHOLD,
+                backend=settings.DETECTOR_BACKEND,
+                nms_iou=settings.DETECTOR_NMS_IOU,
+                num_threads=settings.DETECTOR_THREADS,
+                object_classes=(
+                    settings.BELONGING_CLASSES if settings.OBJECT_DETECTION_ENABLED else None
+                ),
+                max_batch_size=settings.INFERENCE_MAX_BATCH,
+                batch_timeout_ms=settings.INFERENCE_BATCH_TIMEOUT_MS,
+                request_timeout=settings.INFERENCE_REQUEST_TIMEOUT
             )
+            for channel_id in self.channel_ids:
+                detectors[channel_id] = self.inference_server.register_client(
+                    f"{self.store_id}_channel_{channel_id}"
+                )
+            self.inference_server.start()
 
-            process = Process(target=worker.run, name=f"Channel-{channel_id}")
-            process.start()
-            self.processes.append(process)
-
-            print(f"✅ Started worker for channel {channel_id} (PID: {process.pid})")
+            print(f"✅ Started shared inference server (PID: {self.inference_server.process.pid})")
             self.logger.info(
-                "Started channel worker",
-                channel_id=channel_id,
-                process_pid=process.pid,
-                process_name=process.name
+                "Started shared inference server",
+                process_pid=self.inference_server.process.pid,
+                max_batch_size=settings.INFERENCE_MAX_BATCH,
+                batch_timeout_ms=settings.INFERENCE_BATCH_TIMEOUT_MS
             )
+
+        for channel_id in self.channel_ids:
+            process = self._start_channel(channel_id)
+            print(f"✅ Started worker for channel {channel_id} (PID: {process.pid})")
             time.sleep(1)  # Stagger starts
 
         print(f"\n🚀 All {len(self.processes)} workers started!\n")
@@ -514,13 +1083,252 @@ class MultiChannelWorker:
             worker_count=len(self.processes)
         )
 
+    def _start_channel(self, channel_id: int) -> Process:
+        """Spawn the worker process for one channel."""
+        worker = ChannelWorker(
+            store_id=self.store_id,
+            channel_id=channel_id,
+            rtsp_url=self.get_rtsp_url(channel_id),
+            stop_event=self.stop_event,
+            snapshot_interval=settings.SNAPSHOT_INTERVAL,
+            detector=self.detectors.get(channel_id),
+            state_reload_counter=self.state_reload_counter,
+            heartbeat=self.heartbeats[channel_id]
+        )
+
+        self.heartbeats[channel_id].value = 0.0
+        process = Process(target=worker.run, name=f"Channel-{channel_id}")
+        process.start()
+        self.processes[channel_id] = process
+        self.started_at[channel_id] = time.time()
+
+        self.logger.info(
+            "Started channel worker",
+            channel_id=channel_id,
+            process_pid=process.pid,
+            process_name=process.name
+        )
+        return process
+
+    def _kill_channel(self, process: Process) -> bool:
+        """Terminate a hung worker (SIGKILL if it ignores SIGTERM).
+
+        Returns:
+            False if the process is still alive afterwards
+        """
+        process.terminate()
+        process.join(timeout=5)
+        if process.is_alive():
+            self.logger.warning(
+                "Channel worker ignored SIGTERM, killing",
+                process_name=process.name,
+                process_pid=process.pid
+            )
+            process.kill()
+            process.join(timeout=5)
+        return not process.is_alive()
+
+    def _last_seen(self, channel_id: int) -> float:
+        """Last heartbeat, or the start time before the first one."""
+        return max(self.heartbeats[channel_id].value, self.started_at.get(channel_id, 0.0))
+
+    def _restart_delay(self, restarts: int) -> float:
+        """Exponential backoff for the n-th restart within the budget window."""
+        delay = settings.SUPERVISOR_BACKOFF_BASE * (2 ** max(restarts - 1, 0))
+        return min(delay, settings.SUPERVISOR_BACKOFF_MAX)
+
+    def _recent_restarts(self, times: List[float], now: float) -> List[float]:
+        """Restarts still counted against the budget."""
+        return [t for t in times if now - t < settings.SUPERVISOR_RESTART_WINDOW]
+
+    def _supervise_channel(self, channel_id: int, now: float):
+        """Restart one channel if its process died or stopped beating."""
+        process = self.processes.get(channel_id)
+        if process is not None and process.is_alive():
+            if now - self._last_seen(channel_id) < settings.SUPERVISOR_HEARTBEAT_TIMEOUT:
+                self.stale_channels.discard(channel_id)
+                return
+            if channel_id not in self.stale_channels:
+                self.stale_channels.add(channel_id)
+                self.logger.error(
+                    "Channel worker stopped heartbeating, terminating",
+                    channel_id=channel_id,
+                    process_name=process.name,
+                    seconds_since_heartbeat=round(now - self._last_seen(channel_id), 1)
+                )
+            # Hung (e.g. stuck in a blocking read): kill and treat as dead.
+            # If it survives, the kill is retried on the next pass.
+            if not self._kill_channel(process):
+                return
+
+        if channel_id not in self.next_restart_at:
+            restarts = self._recent_restarts(self.restart_times[channel_id], now)
+            self.restart_times[channel_id] = restarts
+            if len(restarts) >= settings.SUPERVISOR_MAX_RESTARTS:
+                # Budget spent: wait until the oldest restart leaves the window
+                delay = restarts[0] + settings.SUPERVISOR_RESTART_WINDOW - now
+                self.logger.critical(
+                    "Channel restart budget exhausted",
+                    channel_id=channel_id,
+                    restarts=len(restarts),
+                    window_seconds=settings.SUPERVISOR_RESTART_WINDOW,
+                    retry_in_seconds=round(delay, 1)
+                )
+            else:
+                delay = self._restart_delay(len(restarts) + 1)
+                self.logger.warning(
+                    "Channel worker died, scheduling restart",
+                    channel_id=channel_id,
+                    exitcode=getattr(process, 'exitcode', None),
+                    restarts=len(restarts),
+                    restart_in_seconds=delay
+                )
+            self.next_restart_at[channel_id] = now + delay
+            return
+
+        if now < self.next_restart_at[channel_id]:
+            return
+
+        del self.next_restart_at[channel_id]
+        self.stale_channels.discard(channel_id)
+        self.restart_times[channel_id].append(now)
+        self._start_channel(channel_id)
+        print(f"🔄 Restarted worker for channel {channel_id}")
+
+    def _supervise_inference_server(self, now: float) -> bool:
+        """Restart the shared inference server if its process died.
+
+        Returns:
+            True if channel workers can run (server up or not used)
+        """
+        server = self.inference_server
+        if server is None or server.process is None or server.process.is_alive():
+            return True
+
+        self.server_restart_times = self._recent_restarts(self.server_restart_times, now)
+        if len(self.server_restart_times) >= settings.SUPERVISOR_MAX_RESTARTS:
+            if not self.server_exhausted:
+                self.server_exhausted = True
+                self.logger.critical(
+                    "Inference server restart budget exhausted, channel restarts suspended",
+                    restarts=len(self.server_restart_times),
+                    window_seconds=settings.SUPERVISOR_RESTART_WINDOW,
+                    retry_in_seconds=round(
+                        self.server_restart_times[0] + settings.SUPERVISOR_RESTART_WINDOW - now, 1
+                    )
+                )
+            return False
+        delay = self._restart_delay(len(self.server_restart_times) + 1)
+        if self.server_restart_times and now - self.server_restart_times[-1] < delay:
+            return False
+
+        self.logger.error(
+            "Inference server died, restarting with all channels",
+            exitcode=server.process.exitcode,
+            restarts=len(self.server_restart_times)
+        )
+        self.server_exhausted = False
+        self.server_restart_times.append(now)
+
+        # Channel workers hold the old queues; stop them before replacing
+        for process in self.processes.values():
+            if process.is_alive():
+                self._kill_channel(process)
+        clients = server.restart()
+        for channel_id in self.channel_ids:
+            self.detectors[channel_id] = clients[f"{self.store_id}_channel_{channel_id}"]
+        print(f"🔄 Restarted shared inference server (PID: {server.process.pid})")
+
+        # Not counted against the channels' own restart budgets
+        self.next_restart_at.clear()
+        self.stale_channels.clear()
+        for channel_id in self.channel_ids:
+            self._start_channel(channel_id)
+        return True
+
+    def supervise(self):
+        """One supervisor pass over the inference server and all channels."""
+        if self.stop_event.is_set():
+            return
+        now = time.time()
+        if not self._supervise_inference_server(now):
+            # Channels would only time out against the dead server and
+            # burn their restart budgets
+            return
+        for channel_id in self.channel_ids:
+            self._supervise_channel(channel_id, now)
+
+    def get_server_state(self) -> str:
+        """Shared inference server state ('none', 'running', 'restarting' or 'exhausted')."""
+        server = self.inference_server
+        if server is None or server.process is None:
+            return 'none'
+        if server.process.is_alive():
+            return 'running'
+        return 'exhausted' if self.server_exhausted else 'restarting'
+
+    def get_liveness(self) -> Dict[int, Dict]:
+        """Per-channel liveness for health checks.
+
+        Returns:
+            Dictionary mapping channel_id to state ('running', 'stale',
+            'restarting', 'exhausted' or 'server_down'), pid, heartbeat age
+            and restart count
+        """
+        now = time.time()
+        liveness = {}
+        for channel_id in self.channel_ids:
+            process = self.processes.get(channel_id)
+            alive = process is not None and process.is_alive()
+            heartbeat_age = now - self._last_seen(channel_id)
+            restarts = self._recent_restarts(self.restart_times[channel_id], now)
+
+            if alive and heartbeat_age < settings.SUPERVISOR_HEARTBEAT_TIMEOUT:
+                state = 'running'
+            elif alive:
+                state = 'stale'
+            elif len(restarts) >= settings.SUPERVISOR_MAX_RESTARTS:
+                state = 'exhausted'
+            elif self.get_server_state() in ('restarting', 'exhausted'):
+                state = 'server_down'
+            else:
+                state = 'restarting'
+
+            liveness[channel_id] = {
+                'state': state,
+                'pid': getattr(process, 'pid', None) if alive else None,
+                'heartbeat_age_seconds': round(heartbeat_age, 1),
+                'restarts': len(restarts),
+            }
+        return liveness
+
+    def log_liveness(self):
+        """Log channel liveness; a warning if anything is not running."""
+        liveness = self.get_liveness()
+        states = Counter(info['state'] for info in liveness.values())
+        server_state = self.get_server_state()
+        healthy = states['running'] == len(liveness) and server_state in ('none', 'running')
+        log = self.logger.info if healthy else self.logger.warning
+        log(
+            "Worker liveness",
+            states=dict(states),
+            inference_server=server_state,
+            channels=liveness
+        )
+
+    def request_state_reload(self):
+        """Ask all channel workers to reload seat states from the database."""
+        with self.state_reload_counter.get_lock():
+            self.state_reload_counter.value += 1
+        self.logger.info("Requested seat state reload", worker_count=len(self.processes))
+
     def stop(self):
         """Stop all workers."""
         print("\n🛑 Stopping all workers...")
         self.logger.info("Stopping all workers", worker_count=len(self.processes))
         self.stop_event.set()
 
-        for process in self.processes:
+        for process in self.processes.values():
             process.join(timeout=10)
             if process.is_alive():
                 print(f"⚠️  Force terminating {process.name}")
@@ -532,14 +1340,26 @@ class MultiChannelWorker:
                 process.terminate()
                 process.join(timeout=5)
 
+        if self.inference_server is not None:
+            self.inference_server.stop()
+
         print("✅ All workers stopped\n")
         self.logger.info("All workers stopped successfully")
 
     def wait(self):
-        """Wait for all workers to complete."""
+        """Supervise workers until shutdown."""
+        last_liveness = time.time()
         try:
-            for process in self.processes:
-                process.join()
+            while not self.stop_event.is_set():
+                self.supervise()
+                now = time.time()
+                if (
+                    settings.SUPERVISOR_LIVENESS_INTERVAL > 0
+                    and now - last_liveness >= settings.SUPERVISOR_LIVENESS_INTERVAL
+                ):
+                    self.log_liveness()
+                    last_liveness = now
+                self.stop_event.wait(settings.SUPERVISOR_INTERVAL)
         except KeyboardInterrupt:
             print("\n⚠️  Received interrupt signal")
             self.stop()
@@ -583,6 +1403,12 @@ def main():
         default=None,
         help='Comma-separated channel IDs (e.g., 1,2,3). Default: from database'
     )
+    parser.add_argument(
+        '--mode',
+        choices=['process', 'dvr'],
+        default=settings.WORKER_MODE,
+        help='process: one process per channel, dvr: all channels as threads in one process'
+    )
 
     args = parser.parse_args()
 
@@ -601,20 +1427,20 @@ def main():
     if args.channels:
         # CLI에서 명시적으로 지정
         channel_ids = [int(c.strip()) for c in args.channels.split(',')]
-    elif store.get('active_channels'):
-        # DB에서 가져오기
-        channel_ids = store['active_channels']
     else:
-        # 기본값: 1부터 total_channels까지
-        total = store.get('total_channels', 4)
-        channel_ids = list(range(1, total + 1))
+        # DB active_channels, 없으면 1부터 total_channels까지
+        channel_ids = resolve_channel_ids(store)
 
     print(f"\n📍 Store: {store['store_name']} ({args.store})")
     print(f"📺 RTSP: {store.get('rtsp_host')}:{store.get('rtsp_port')}")
     print(f"📡 Channels: {channel_ids}\n")
 
     # Create and start worker
-    worker = MultiChannelWorker(args.store, channel_ids)
+    if args.mode == 'dvr':
+        from src.workers.dvr_worker import DVRWorker
+        worker = DVRWorker(args.store, channel_ids)
+    else:
+        worker = MultiChannelWorker(args.store, channel_ids)
 
     # Handle signals
     def signal_handler(sig, frame):
@@ -625,6 +1451,12 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    # SIGHUP: reconcile in-memory seat states with the database
+    signal.signal(signal.SIGHUP, lambda sig, frame: worker.request_state_reload())
+
+    # SIGUSR1: log channel liveness now
+    signal.signal(signal.SIGUSR1, lambda sig, frame: worker.log_liveness())
+
     # Start
     worker.start()
 
@@ -0,0 +1,129 @@
+"""Single-process DVR worker: all channels of one store in one process.
+
+MultiChannelWorker starts one process per channel, each with its own Python
+interpreter and model imports. DVRWorker runs every channel of a store's DVR
+as a thread in one process instead; RTSP reads block in OpenCV/FFmpeg with
+the GIL released, and detection goes through one BatchingDetector, so memory
+grows with the number of DVRs rather than cameras.
+"""
+import threading
+import time
+from typing import Optional
+
+from src.config import settings
+from src.core import BatchingDetector
+from src.workers.detection_worker import ChannelWorker, MultiChannelWorker
+
+
+class DVRWorker(MultiChannelWorker):
+    """Manager running all channel workers of a store as threads."""
+
+    def __init__(self, store_id: str, channel_ids: list):
+        """Initialize DVR worker.
+
+        Args:
+            store_id: Store identifier
+            channel_ids: List of channel IDs to monitor
+        """
+        super().__init__(store_id, channel_ids)
+        self.detector: Optional[BatchingDetector] = None
+
+    def start(self):
+        """Load the shared detector and start one thread per channel."""
+        print(f"\n{'='*60}")
+        print(f"Starting DVR Detection Worker (single process)")
+        print(f"Store: {self.store['store_name']} ({self.store_id})")
+        print(f"Channels: {self.channel_ids}")
+        print(f"{'='*60}\n")
+
+        self.logger.info(
+            "Starting DVR worker",
+            store_id=self.store_id,
+            store_name=self.store['store_name'],
+            channel_ids=self.channel_ids,
+            channel_count=len(self.channel_ids)
+        )
+
+        self.detector = BatchingDetector(
+            model_path=settings.YOLO_MODEL,
+            confidence=settings.CONFIDENCE_THRESHOLD,
+            backend=settings.DETECTOR_BACKEND,
+            nms_iou=settings.DETECTOR_NMS_IOU,
+            num_threads=settings.DETECTOR_THREADS,
+            object_classes=(
+                settings.BELONGING_CLASSES if settings.OBJECT_DETECTION_ENABLED else None
+            ),
+            max_batch_size=settings.INFERENCE_MAX_BATCH,
+            batch_timeout_ms=settings.INFERENCE_BATCH_TIMEOUT_MS,
+            request_timeout=settings.INFERENCE_REQUEST_TIMEOUT
+        )
+        self.detector.start()
+        print(f"✅ Loaded shared batching detector ({self.detector.detector.model.name})")
+
+        for channel_id in self.channel_ids:
+            self._start_channel(channel_id)
+            print(f"✅ Started thread for channel {channel_id}")
+            time.sleep(1)  # Stagger RTSP connects
+
+        print(f"\n🚀 All {len(self.processes)} channel threads started!\n")
+        self.logger.info(
+            "All channel threads started successfully",
+            worker_count=len(self.processes)
+        )
+
+    def _start_channel(self, channel_id: int) -> threading.Thread:
+        """Start the worker thread for one channel."""
+        worker = ChannelWorker(
+            store_id=self.store_id,
+            channel_id=channel_id,
+            rtsp_url=self.get_rtsp_url(channel_id),
+            stop_event=self.stop_event,
+            snapshot_interval=settings.SNAPSHOT_INTERVAL,
+            detector=self.detector,
+            state_reload_counter=self.state_reload_counter,
+            heartbeat=self.heartbeats[channel_id]
+        )
+
+        self.heartbeats[channel_id].value = 0.0
+        thread = threading.Thread(target=worker.run, name=f"Channel-{channel_id}", daemon=True)
+        thread.start()
+        self.processes[channel_id] = thread
+        self.started_at[channel_id] = time.time()
+
+        self.logger.info("Started channel thread", channel_id=channel_id, thread_name=thread.name)
+        return thread
+
+    def _kill_channel(self, thread: threading.Thread) -> bool:
+        """Threads cannot be killed; a hung channel stays 'stale'."""
+        return False
+
+    def _supervise_inference_server(self, now: float) -> bool:
+        """Restart the batching dispatcher if its thread died."""
+        if self.detector is None or self.detector.is_alive():
+            return True
+        self.logger.error("Batching detector stopped, restarting")
+        self.detector.start()
+        return True
+
+    def get_server_state(self) -> str:
+        """Batching detector state ('none', 'running' or 'restarting')."""
+        if self.detector is None:
+            return 'none'
+        return 'running' if self.detector.is_alive() else 'restarting'
+
+    def stop(self):
+        """Stop all channel threads and the shared detector."""
+        print("\n🛑 Stopping all channel threads...")
+        self.logger.info("Stopping all channel threads", worker_count=len(self.processes))
+        self.stop_event.set()
+
+        for thread in self.processes.values():
+            thread.join(timeout=10)
+            if thread.is_alive():
+                self.logger.warning("Channel thread did not stop in time", thread_name=thread.name)
+
+        if self.detector is not None:
+            self.detector.stop()
+
+        print("✅ All channel threads stopped\n")
+        self.logger.info("All channel threads stopped successfully")
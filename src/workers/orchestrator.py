@@ -0,0 +1,587 @@
+"""Multi-store orchestrator: every active store from one entry point.
+
+Channels of all active stores (SupabaseClient.list_stores()) are spread over
+a fixed pool of worker processes sized by a CPU budget, not by the channel
+count. Each pool process runs its channels as threads with one shared
+BatchingDetector (as in DVR mode). The store list is re-read periodically;
+new or removed stores/channels only move what has to move, and channels are
+shifted between processes only when loads drift more than a small slack.
+"""
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from multiprocessing import Process, Queue, Event, Value
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.config import settings
+from src.utils import StructuredLogger
+from src.database.supabase_client import get_supabase_client
+from src.workers.detection_worker import ChannelWorker, build_rtsp_url, resolve_channel_ids
+
+ChannelKey = Tuple[str, int]  # (store_id, channel_id)
+
+
+def pool_size_for_budget(cpu_budget: float, threads_per_worker: int = 0) -> int:
+    """Number of worker processes that fit in a CPU budget.
+
+    Args:
+        cpu_budget: Fraction of host cores to use (e.g. 0.75)
+        threads_per_worker: Inference threads per process (0 = count as 1)
+
+    Returns:
+        Pool size (at least 1)
+    """
+    cores = (os.cpu_count() or 1) * cpu_budget
+    return max(1, int(cores // max(1, threads_per_worker)))
+
+
+def plan_assignments(
+    current: Dict[ChannelKey, int],
+    desired: Iterable[ChannelKey],
+    pool_size: int,
+    slack: int = 2
+) -> Dict[ChannelKey, int]:
+    """Assign channels to pool workers, keeping existing placements.
+
+    New channels go to the least loaded worker, preferring one that already
+    runs the same store. Channels only move when the most and least loaded
+    workers differ by more than slack.
+
+    Args:
+        current: Existing channel -> worker index
+        desired: Channels that should run
+        pool_size: Number of workers
+        slack: Tolerated load difference before channels are moved
+
+    Returns:
+        New channel -> worker index mapping
+    """
+    desired = sorted(set(desired))
+    desired_set = set(desired)
+    plan = {
+        key: worker for key, worker in current.items()
+        if key in desired_set and worker < pool_size
+    }
+    load = Counter({worker: 0 for worker in range(pool_size)})
+    load.update(plan.values())
+
+    for key in desired:
+        if key in plan:
+            continue
+        min_load = min(load.values())
+        same_store = [
+            worker for other, worker in plan.items()
+            if other[0] == key[0] and load[worker] < min_load + slack
+        ]
+        candidates = same_store or range(pool_size)
+        worker = min(candidates, key=lambda w: (load[w], w))
+        plan[key] = worker
+        load[worker] += 1
+
+    # Sticky rebalance: only when the spread exceeds the slack
+    while True:
+        busiest = max(range(pool_size), key=lambda w: (load[w], -w))
+        idlest = min(range(pool_size), key=lambda w: (load[w], w))
+        if load[busiest] - load[idlest] <= max(slack, 1):
+            break
+        movable = [key for key, worker in plan.items() if worker == busiest]
+        target_stores = {key[0] for key, worker in plan.items() if worker == idlest}
+        store_counts = Counter(key[0] for key in movable)
+        # Prefer a store the target already runs, else the smallest group
+        key = min(movable, key=lambda k: (k[0] not in target_stores, store_counts[k[0]], k))
+        plan[key] = idlest
+        load[busiest] -= 1
+        load[idlest] += 1
+
+    return plan
+
+
+def run_pool_worker(index: int, commands: Queue, stop_event: Event, heartbeat: Value):
+    """Pool process: run assigned channels as threads sharing one detector.
+
+    Commands are ('add', (store_id, channel_id), rtsp_url) and
+    ('remove', (store_id, channel_id)). Channel threads that exit are
+    restarted with exponential backoff. A removed channel whose thread does
+    not exit in time is kept as stopping, and an add for it waits until the
+    old thread is gone, so two workers never run the same channel.
+    """
+    from src.core import BatchingDetector
+
+    logger = StructuredLogger(component=f"pool_worker_{index}")
+    detector = BatchingDetector(
+        model_path=settings.YOLO_MODEL,
+        confidence=settings.CONFIDENCE_THRESHOLD,
+        backend=settings.DETECTOR_BACKEND,
+        nms_iou=settings.DETECTOR_NMS_IOU,
+        num_threads=settings.DETECTOR_THREADS,
+        object_classes=(
+            settings.BELONGING_CLASSES if settings.OBJECT_DETECTION_ENABLED else None
+        ),
+        max_batch_size=settings.INFERENCE_MAX_BATCH,
+        batch_timeout_ms=settings.INFERENCE_BATCH_TIMEOUT_MS,
+        request_timeout=settings.INFERENCE_REQUEST_TIMEOUT
+    )
+    detector.start()
+
+    # key -> {'url', 'thread', 'stop', 'failures', 'restart_at'}
+    channels: Dict[ChannelKey, Dict] = {}
+    # Removed channels whose thread is still running, and adds waiting on them
+    stopping: Dict[ChannelKey, threading.Thread] = {}
+    deferred: Dict[ChannelKey, str] = {}
+
+    def start_channel(key: ChannelKey):
+        entry = channels[key]
+        entry['stop'] = threading.Event()
+        worker = ChannelWorker(
+            store_id=key[0],
+            channel_id=key[1],
+            rtsp_url=entry['url'],
+            stop_event=entry['stop'],
+            snapshot_interval=settings.SNAPSHOT_INTERVAL,
+            detector=detector
+        )
+        entry['thread'] = threading.Thread(
+            target=worker.run, name=f"{key[0]}-Channel-{key[1]}", daemon=True
+        )
+        entry['thread'].start()
+        entry['started_at'] = time.time()
+
+    def add_channel(key: ChannelKey, rtsp_url: str):
+        channels[key] = {'url': rtsp_url, 'failures': 0, 'restart_at': None}
+        start_channel(key)
+        logger.info("Channel added", store_id=key[0], channel_id=key[1])
+
+    def stop_channel(key: ChannelKey):
+        entry = channels.pop(key, None)
+        if entry is None:
+            return
+        entry['stop'].set()
+        entry['thread'].join(timeout=10)
+        if entry['thread'].is_alive():
+            stopping[key] = entry['thread']
+            logger.warning(
+                "Channel thread did not stop in time",
+                store_id=key[0],
+                channel_id=key[1]
+            )
+
+    logger.info("Pool worker ready", worker_index=index)
+    try:
+        while not stop_event.is_set():
+            heartbeat.value = time.time()
+            try:
+                command = commands.get(timeout=1.0)
+            except queue.Empty:
+                command = None
+
+            if command is not None:
+                action, key = command[0], tuple(command[1])
+                if action == 'add' and key in stopping:
+                    deferred[key] = command[2]
+                    logger.info(
+                        "Channel add deferred until its old thread exits",
+                        store_id=key[0],
+                        channel_id=key[1]
+                    )
+                elif action == 'add' and key not in channels:
+                    add_channel(key, command[2])
+                elif action == 'remove':
+                    deferred.pop(key, None)
+                    stop_channel(key)
+                    logger.info("Channel removed", store_id=key[0], channel_id=key[1])
+
+            for key, thread in list(stopping.items()):
+                if thread.is_alive():
+                    continue
+                del stopping[key]
+                if key in deferred:
+                    add_channel(key, deferred.pop(key))
+
+            now = time.time()
+            for key, entry in channels.items():
+                if entry['thread'].is_alive():
+                    # A channel that ran for a while starts its backoff over
+                    if now - entry['started_at'] >= settings.SUPERVISOR_BACKOFF_MAX:
+                        entry['failures'] = 0
+                    continue
+                if entry['restart_at'] is None:
+                    entry['failures'] += 1
+                    delay = min(
+                        settings.SUPERVISOR_BACKOFF_BASE * (2 ** (entry['failures'] - 1)),
+                        settings.SUPERVISOR_BACKOFF_MAX
+                    )
+                    entry['restart_at'] = now + delay
+                    logger.warning(
+                        "Channel thread exited, scheduling restart",
+                        store_id=key[0],
+                        channel_id=key[1],
+                        restart_in_seconds=delay
+                    )
+                elif now >= entry['restart_at']:
+                    entry['restart_at'] = None
+                    start_channel(key)
+    finally:
+        for key in list(channels):
+            channels[key]['stop'].set()
+        for key in list(channels):
+            stop_channel(key)
+        detector.stop()
+        logger.info("Pool worker stopped", worker_index=index)
+
+
+class MultiStoreOrchestrator:
+    """Run the channels of all active stores on a bounded process pool."""
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        store_ids: Optional[List[str]] = None,
+        slack: Optional[int] = None,
+        lease_manager=None
+    ):
+        """Initialize orchestrator.
+
+        Args:
+            pool_size: Worker processes (default: from ORCHESTRATOR_CPU_BUDGET)
+            store_ids: Only run these stores (default: all active stores)
+            slack: Load difference tolerated before rebalancing
+            lease_manager: LeaseManager when several nodes share the stores;
+                only channels leased by this node are run
+        """
+        self.pool_size = pool_size or settings.ORCHESTRATOR_WORKERS or pool_size_for_budget(
+            settings.ORCHESTRATOR_CPU_BUDGET, settings.DETECTOR_THREADS
+        )
+        self.store_ids = set(store_ids) if store_ids else None
+        self.slack = settings.ORCHESTRATOR_REBALANCE_SLACK if slack is None else slack
+
+        self.stop_event = Event()
+        self.processes: List[Optional[Process]] = [None] * self.pool_size
+        self.commands: List[Optional[Queue]] = [None] * self.pool_size
+        self.heartbeats = [Value('d', 0.0) for _ in range(self.pool_size)]
+        self.restart_times: List[List[float]] = [[] for _ in range(self.pool_size)]
+        self.exhausted = set()
+
+        self.assignments: Dict[ChannelKey, int] = {}
+        self.urls: Dict[ChannelKey, str] = {}
+        self.all_channels: Dict[ChannelKey, str] = {}
+        self.leases = lease_manager
+
+        self.logger = StructuredLogger(component="multi_store_orchestrator")
+        self.db = get_supabase_client()
+
+    def desired_channels(self) -> Dict[ChannelKey, str]:
+        """Channels of all active stores with their RTSP URLs."""
+        channels = {}
+        for store in self.db.list_stores(active_only=True):
+            if self.store_ids is not None and store['store_id'] not in self.store_ids:
+                continue
+            try:
+                for channel_id in resolve_channel_ids(store):
+                    channels[(store['store_id'], channel_id)] = build_rtsp_url(store, channel_id)
+            except Exception as e:
+                # One misconfigured store must not stop the others
+                self.logger.warning(
+                    "Skipping store with invalid channel config",
+                    store_id=store['store_id'],
+                    error=str(e)
+                )
+        return channels
+
+    def _start_worker(self, index: int):
+        """Spawn pool process `index` and send it its channels."""
+        self.commands[index] = Queue()
+        self.heartbeats[index].value = time.time()
+        process = Process(
+            target=run_pool_worker,
+            args=(index, self.commands[index], self.stop_event, self.heartbeats[index]),
+            name=f"PoolWorker-{index}"
+        )
+        process.start()
+        self.processes[index] = process
+        for key, worker in self.assignments.items():
+            if worker == index:
+                self.commands[index].put(('add', key, self.urls[key]))
+        self.logger.info("Started pool worker", worker_index=index, process_pid=process.pid)
+
+    def refresh(self):
+        """Re-read active stores and apply the resulting channel moves."""
+        try:
+            self.all_channels = self.desired_channels()
+        except Exception as e:
+            self.logger.warning("Failed to list stores, keeping assignments", error=str(e))
+            return
+        self.sync_leases()
+
+    def sync_leases(self):
+        """Heartbeat leases (if sharded) and run exactly the held channels."""
+        desired = self.all_channels
+        if self.leases is not None:
+            held = self.leases.heartbeat(desired)
+            if self.leases.last_error:
+                self.logger.warning(
+                    "Lease heartbeat failed",
+                    node_id=self.leases.node_id,
+                    held=len(held),
+                    error=self.leases.last_error
+                )
+            desired = {key: url for key, url in desired.items() if key in held}
+        self._apply(desired)
+
+    def _apply(self, desired: Dict[ChannelKey, str]):
+        """Move pool assignments to exactly the desired channels."""
+        plan = plan_assignments(self.assignments, desired, self.pool_size, self.slack)
+        previous, previous_urls = self.assignments, self.urls
+        commands: Dict[int, List[tuple]] = {}
+        removed = moved = added = 0
+
+        # Stop channels that went away, moved, or whose RTSP URL changed
+        for key, worker in previous.items():
+            if plan.get(key) == worker and previous_urls[key] == desired.get(key):
+                continue
+            commands.setdefault(worker, []).append(('remove', key))
+            removed += key not in plan
+            moved += key in plan and plan[key] != worker
+
+        self.assignments = plan
+        self.urls = {key: desired[key] for key in plan}
+        for key, worker in plan.items():
+            if previous.get(key) == worker and previous_urls.get(key) == self.urls[key]:
+                continue
+            added += key not in previous
+            commands.setdefault(worker, []).append(('add', key, self.urls[key]))
+
+        for worker, worker_commands in commands.items():
+            if self.processes[worker] is None:
+                self._start_worker(worker)  # Sends its assignments itself
+                continue
+            for command in worker_commands:
+                self.commands[worker].put(command)
+
+        if added or removed or moved:
+            self.logger.info(
+                "Rebalanced channels",
+                added=added,
+                removed=removed,
+                moved=moved,
+                channels=len(plan),
+                load=self.worker_loads(),
+                **({'leases': self.leases.get_stats()} if self.leases is not None else {})
+            )
+
+    def worker_loads(self) -> List[int]:
+        """Channels per pool worker."""
+        load = Counter(self.assignments.values())
+        return [load[index] for index in range(self.pool_size)]
+
+    def supervise(self):
+        """Restart pool processes that died or stopped beating."""
+        if self.stop_event.is_set():
+            return
+        now = time.time()
+        for index, process in enumerate(self.processes):
+            if process is None:
+                continue
+            if process.is_alive():
+                if now - self.heartbeats[index].value < settings.SUPERVISOR_HEARTBEAT_TIMEOUT:
+                    continue
+                self.logger.error("Pool worker stopped heartbeating, terminating", worker_index=index)
+                process.terminate()
+                process.join(timeout=5)
+
+            restarts = [t for t in self.restart_times[index] if now - t < settings.SUPERVISOR_RESTART_WINDOW]
+            self.restart_times[index] = restarts
+            if len(restarts) >= settings.SUPERVISOR_MAX_RESTARTS:
+                if index not in self.exhausted:
+                    self.exhausted.add(index)
+                    self.logger.critical(
+                        "Pool worker restart budget exhausted",
+                        worker_index=index,
+                        channels=self.worker_loads()[index],
+                        window_seconds=settings.SUPERVISOR_RESTART_WINDOW
+                    )
+                continue
+            self.exhausted.discard(index)
+            delay = min(
+                settings.SUPERVISOR_BACKOFF_BASE * (2 ** max(len(restarts) - 1, 0)),
+                settings.SUPERVISOR_BACKOFF_MAX
+            )
+            if restarts and now - restarts[-1] < delay:
+                continue
+
+            self.logger.warning(
+                "Pool worker died, restarting",
+                worker_index=index,
+                exitcode=process.exitcode,
+                restarts=len(restarts)
+            )
+            self.restart_times[index].append(now)
+            self._start_worker(index)
+
+    def get_liveness(self) -> Dict[int, Dict]:
+        """Per pool worker: alive, pid, heartbeat age, channels, restarts."""
+        now = time.time()
+        liveness = {}
+        for index, process in enumerate(self.processes):
+            alive = process is not None and process.is_alive()
+            liveness[index] = {
+                'alive': alive,
+                'pid': process.pid if alive else None,
+                'heartbeat_age_seconds': round(now - self.heartbeats[index].value, 1) if process else None,
+                'channels': sorted(key for key, worker in self.assignments.items() if worker == index),
+                'restarts': len(self.restart_times[index]),
+            }
+        return liveness
+
+    def log_liveness(self):
+        """Log pool worker liveness; a warning if any worker is down."""
+        liveness = self.get_liveness()
+        down = [
+            index for index, info in liveness.items()
+            if info['channels'] and not info['alive']
+        ]
+        log = self.logger.warning if down else self.logger.info
+        log(
+            "Pool liveness",
+            alive=sum(info['alive'] for info in liveness.values()),
+            down=down,
+            exhausted=sorted(self.exhausted),
+            workers=liveness
+        )
+
+    def start(self):
+        """Assign channels of all active stores and start the pool."""
+        print(f"\n{'='*60}")
+        print(f"Starting Multi-Store Orchestrator")
+        print(f"Pool size: {self.pool_size} worker processes")
+        print(f"{'='*60}\n")
+        self.logger.info("Starting multi-store orchestrator", pool_size=self.pool_size)
+
+        self.refresh()
+        stores = sorted({store_id for store_id, _ in self.assignments})
+        print(f"🚀 {len(self.assignments)} channels of {len(stores)} stores on {self.pool_size} workers")
+        print(f"   Load per worker: {self.worker_loads()}\n")
+
+    def wait(self):
+        """Supervise and periodically rebalance until shutdown."""
+        last_refresh = last_lease = last_liveness = time.time()
+        tick = settings.SUPERVISOR_INTERVAL
+        if self.leases is not None:
+            tick = min(tick, settings.LEASE_HEARTBEAT_INTERVAL)
+        try:
+            while not self.stop_event.is_set():
+                self.supervise()
+                now = time.time()
+                if now - last_refresh >= settings.ORCHESTRATOR_REFRESH_INTERVAL:
+                    self.refresh()
+                    last_refresh = last_lease = now
+                elif self.leases is not None and now - last_lease >= settings.LEASE_HEARTBEAT_INTERVAL:
+                    self.sync_leases()
+                    last_lease = now
+                if (
+                    settings.SUPERVISOR_LIVENESS_INTERVAL > 0
+                    and now - last_liveness >= settings.SUPERVISOR_LIVENESS_INTERVAL
+                ):
+                    self.log_liveness()
+                    last_liveness = now
+                self.stop_event.wait(tick)
+        except KeyboardInterrupt:
+            print("\n⚠️  Received interrupt signal")
+            self.stop()
+
+    def stop(self):
+        """Stop all pool processes."""
+        print("\n🛑 Stopping pool workers...")
+        self.logger.info("Stopping pool workers", pool_size=self.pool_size)
+        self.stop_event.set()
+
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(timeout=30)
+            if process.is_alive():
+                self.logger.warning("Force terminating pool worker", process_name=process.name)
+                process.terminate()
+                process.join(timeout=5)
+
+        # Hand channels to the other nodes right away instead of on expiry
+        if self.leases is not None:
+            try:
+                self.leases.release_all()
+            except Exception as e:
+                self.logger.warning("Failed to release leases", error=str(e))
+
+        print("✅ All pool workers stopped\n")
+        self.logger.info("All pool workers stopped successfully")
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run seat detection for all active stores")
+    parser.add_argument(
+        '--stores',
+        type=str,
+        default=None,
+        help='Comma-separated store IDs to run (default: all active stores)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes (default: from ORCHESTRATOR_CPU_BUDGET)'
+    )
+    parser.add_argument(
+        '--node-id',
+        type=str,
+        default=settings.NODE_ID or None,
+        help='Share stores with other nodes through DB leases under this name'
+    )
+    args = parser.parse_args()
+
+    lease_manager = None
+    if args.node_id:
+        from src.database.leases import LeaseManager
+        lease_manager = LeaseManager(
+            args.node_id,
+            database_url=settings.LEASE_DATABASE_URL,
+            lease_seconds=settings.LEASE_SECONDS,
+            heartbeat_interval=settings.LEASE_HEARTBEAT_INTERVAL
+        )
+        print(f"🔗 Node '{args.node_id}': sharing channels via leases ({settings.LEASE_SECONDS:.0f}s)")
+
+    store_ids = [s.strip() for s in args.stores.split(',')] if args.stores else None
+    orchestrator = MultiStoreOrchestrator(
+        pool_size=args.workers,
+        store_ids=store_ids,
+        lease_manager=lease_manager
+    )
+
+    def signal_handler(sig, frame):
+        print("\n⚠️  Received shutdown signal")
+        orchestrator.stop()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    # SIGHUP: re-read stores now instead of waiting for the next refresh
+    signal.signal(signal.SIGHUP, lambda sig, frame: orchestrator.refresh())
+
+    # SIGUSR1: log pool liveness now
+    signal.signal(signal.SIGUSR1, lambda sig, frame: orchestrator.log_liveness())
+
+    orchestrator.start()
+    orchestrator.wait()
+
+
+if __name__ == "__main__":
+    main()
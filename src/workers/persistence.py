@@ -0,0 +1,355 @@
+"""Persistence policies and write-behind queue for channel worker DB writes."""
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.workers.seat_state import SeatState
+
+
+def json_safe(value: Any) -> Any:
+    """Convert datetimes and NumPy scalars so the row survives json.dumps."""
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class StatusWritePolicy:
+    """Write a seat_status row only when it changed, plus a periodic heartbeat.
+
+    A row counts as changed when status, person/object detection flags or
+    the confidence bucket differ from the last written row. Unchanged seats
+    are rewritten every heartbeat_interval seconds to refresh updated_at
+    and vacant_duration_seconds.
+    """
+
+    def __init__(self, heartbeat_interval: float = 60, confidence_bucket: float = 0.1):
+        """Initialize write policy.
+
+        Args:
+            heartbeat_interval: Seconds between writes of an unchanged seat
+            confidence_bucket: Confidence step that counts as a change
+                (0 = any confidence change)
+        """
+        self.heartbeat_interval = heartbeat_interval
+        self.confidence_bucket = confidence_bucket
+
+    def signature(self, status_update: Dict[str, Any]) -> Tuple:
+        """Fields whose change forces an immediate write."""
+        confidence = status_update.get('detection_confidence') or 0.0
+        if self.confidence_bucket > 0:
+            confidence = int(confidence / self.confidence_bucket)
+
+        return (
+            status_update.get('status'),
+            bool(status_update.get('person_detected')),
+            bool(status_update.get('object_detected')),
+            confidence
+        )
+
+    def should_write(
+        self,
+        state: SeatState,
+        status_update: Dict[str, Any],
+        now: datetime
+    ) -> bool:
+        """Check whether the row must be written on this frame."""
+        if state.written_signature != self.signature(status_update):
+            return True
+        if state.last_written_at is None:
+            return True
+        return (now - state.last_written_at).total_seconds() >= self.heartbeat_interval
+
+    def mark_written(self, state: SeatState, status_update: Dict[str, Any], now: datetime):
+        """Remember what was written so later frames can be compared."""
+        state.written_signature = self.signature(status_update)
+        state.last_written_at = now
+
+
+class WriteBehindQueue:
+    """Background writer for seat statuses and detection events.
+
+    Status rows are coalesced per seat (only the latest pending row is
+    kept) and flushed in batches by a daemon thread, so slow database
+    responses no longer stall the capture/inference loop. The queue is
+    bounded: producers block for up to put_timeout seconds when it is full.
+
+    A failed batch is retried with exponential backoff at half the size, so
+    a row the database rejects ends up alone; a row that fails max_attempts
+    times on its own is logged and dropped instead of blocking the queue.
+    """
+
+    RETRY_MAX_DELAY = 60.0
+
+    def __init__(
+        self,
+        db,
+        store_id: str,
+        max_size: int = 1000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        put_timeout: float = 5.0,
+        max_attempts: int = 5,
+        logger=None
+    ):
+        """Initialize write-behind queue.
+
+        Args:
+            db: SupabaseClient with bulk_update_seat_statuses/log_detection_events
+            store_id: Store the status rows belong to
+            max_size: Maximum pending status rows plus events
+            batch_size: Maximum rows of each kind per flush
+            flush_interval: Seconds between flushes (and retry delay)
+            put_timeout: Seconds a producer waits when the queue is full
+            max_attempts: Failed single-row writes before a row is dropped
+            logger: Optional StructuredLogger for flush failures
+        """
+        self.db = db
+        self.store_id = store_id
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_attempts = max_attempts
+        self.logger = logger
+
+        # Values carry a failed-attempt count: (attempts, row)
+        self._statuses: "OrderedDict[str, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._events: deque = deque()
+        self._batch_limit = batch_size
+        self._consecutive_failures = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.metrics = {
+            'statuses_written': 0,
+            'events_written': 0,
+            'statuses_coalesced': 0,
+            'statuses_dropped': 0,
+            'events_dropped': 0,
+            'backpressure_waits': 0,
+            'flush_count': 0,
+            'flush_failures': 0,
+            'statuses_dead': 0,
+            'events_dead': 0,
+            'flush_latencies_ms': deque(maxlen=500),
+        }
+
+    @property
+    def depth(self) -> int:
+        """Number of pending status rows and events."""
+        return len(self._statuses) + len(self._events)
+
+    def start(self):
+        """Start the background flush thread."""
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="WriteBehind", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Flush what is pending (best effort) and stop the thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _wait_for_space(self) -> bool:
+        """Block (with the lock held) until there is room; False on timeout."""
+        if self.depth < self.max_size:
+            return True
+        self.metrics['backpressure_waits'] += 1
+        deadline = time.time() + self.put_timeout
+        while self.depth >= self.max_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            self._cond.wait(timeout=remaining)
+        return True
+
+    def put_status(self, seat_id: str, row: Dict[str, Any]) -> bool:
+        """Queue a seat status row, replacing any pending row for the seat.
+
+        Returns:
+            False if the queue stayed full for put_timeout seconds
+        """
+        with self._cond:
+            if seat_id in self._statuses:
+                # A newer row starts over, even if the old one kept failing
+                self._statuses[seat_id] = (0, row)
+                self.metrics['statuses_coalesced'] += 1
+                return True
+            if not self._wait_for_space():
+                self.metrics['statuses_dropped'] += 1
+                return False
+            self._statuses[seat_id] = (0, row)
+            if self.depth >= self.batch_size:
+                self._cond.notify_all()
+            return True
+
+    def put_event(self, event: Dict[str, Any]) -> bool:
+        """Queue a detection event (events are never coalesced).
+
+        Returns:
+            False if the queue stayed full for put_timeout seconds
+        """
+        with self._cond:
+            if not self._wait_for_space():
+                self.metrics['events_dropped'] += 1
+                return False
+            self._events.append((0, event))
+            if self.depth >= self.batch_size:
+                self._cond.notify_all()
+            return True
+
+    def _take_batch(self):
+        """Pop up to the current batch limit of statuses and events (lock must be held)."""
+        statuses = []
+        while self._statuses and len(statuses) < self._batch_limit:
+            seat_id, (attempts, row) = self._statuses.popitem(last=False)
+            statuses.append((seat_id, attempts, row))
+        events = []
+        while self._events and len(events) < self._batch_limit:
+            events.append(self._events.popleft())
+        return statuses, events
+
+    def _requeue(self, statuses, events, error: str):
+        """Put a failed batch back without overriding newer status rows.
+
+        Rows are only charged an attempt when their write failed with them
+        alone, so good rows sharing a batch with a bad one are never
+        dropped. Events are not tried when the status write failed.
+        """
+        charge_status = len(statuses) == 1
+        charge_event = not statuses and len(events) == 1
+        dead = []
+        with self._cond:
+            for seat_id, attempts, row in reversed(statuses):
+                attempts += charge_status
+                if attempts >= self.max_attempts:
+                    dead.append(('status', seat_id, row))
+                    self.metrics['statuses_dead'] += 1
+                elif seat_id not in self._statuses:
+                    self._statuses[seat_id] = (attempts, row)
+                    self._statuses.move_to_end(seat_id, last=False)
+            for attempts, event in reversed(events):
+                attempts += charge_event
+                if attempts >= self.max_attempts:
+                    dead.append(('event', event.get('seat_id'), event))
+                    self.metrics['events_dead'] += 1
+                else:
+                    self._events.appendleft((attempts, event))
+
+        if self.logger:
+            for kind, seat_id, row in dead:
+                self.logger.error(
+                    "Dropping write after repeated failures",
+                    kind=kind,
+                    seat_id=seat_id,
+                    attempts=self.max_attempts,
+                    row=json_safe(row),
+                    error=error
+                )
+
+    def retry_delay(self) -> float:
+        """Seconds to wait before retrying after consecutive failed flushes."""
+        if not self._consecutive_failures:
+            return 0.0
+        delay = self.flush_interval * (2 ** (self._consecutive_failures - 1))
+        return min(delay, self.RETRY_MAX_DELAY)
+
+    def flush(self) -> bool:
+        """Write one batch now.
+
+        Returns:
+            True if the batch was written (or there was nothing to write)
+        """
+        with self._cond:
+            statuses, events = self._take_batch()
+            self._cond.notify_all()  # Wake producers waiting for space
+
+        if not statuses and not events:
+            return True
+
+        start_time = time.time()
+        try:
+            if statuses:
+                self.db.bulk_update_seat_statuses(
+                    self.store_id,
+                    [json_safe({'seat_id': seat_id, **row}) for seat_id, _, row in statuses]
+                )
+                self.metrics['statuses_written'] += len(statuses)
+                statuses = []
+            if events:
+                self.db.log_detection_events([json_safe(event) for _, event in events])
+                self.metrics['events_written'] += len(events)
+                events = []
+        except Exception as e:
+            self.metrics['flush_failures'] += 1
+            self._consecutive_failures += 1
+            # Halve the batch so a rejected row is isolated
+            self._batch_limit = max(1, max(len(statuses), len(events)) // 2)
+            self._requeue(statuses, events, str(e))
+            if self.logger:
+                self.logger.warning(
+                    "Write-behind flush failed",
+                    pending_statuses=len(statuses),
+                    pending_events=len(events),
+                    queue_depth=self.depth,
+                    error=str(e)
+                )
+            return False
+        finally:
+            self.metrics['flush_count'] += 1
+            self.metrics['flush_latencies_ms'].append((time.time() - start_time) * 1000)
+
+        self._consecutive_failures = 0
+        self._batch_limit = min(self.batch_size, self._batch_limit * 2)
+        return True
+
+    def _run(self):
+        """Flush loop (runs in the background thread)."""
+        while True:
+            with self._cond:
+                if not self._stopping and self.depth < self.batch_size:
+                    self._cond.wait(timeout=self.flush_interval)
+                stopping = self._stopping
+
+            ok = self.flush()
+            if stopping:
+                # Drain what we can, but do not retry forever on shutdown
+                while ok and self.depth > 0:
+                    ok = self.flush()
+                break
+            if not ok:
+                time.sleep(self.retry_delay())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and flush latency metrics."""
+        latencies = list(self.metrics['flush_latencies_ms'])
+        return {
+            'queue_depth': self.depth,
+            'statuses_written': self.metrics['statuses_written'],
+            'events_written': self.metrics['events_written'],
+            'statuses_coalesced': self.metrics['statuses_coalesced'],
+            'statuses_dropped': self.metrics['statuses_dropped'],
+            'events_dropped': self.metrics['events_dropped'],
+            'backpressure_waits': self.metrics['backpressure_waits'],
+            'flush_count': self.metrics['flush_count'],
+            'flush_failures': self.metrics['flush_failures'],
+            'statuses_dead': self.metrics['statuses_dead'],
+            'events_dead': self.metrics['events_dead'],
+            'avg_flush_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0,
+            'max_flush_ms': round(max(latencies), 2) if latencies else 0,
+        }
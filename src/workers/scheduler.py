@@ -0,0 +1,99 @@
+"""Adaptive snapshot interval per channel.
+
+A fixed SNAPSHOT_INTERVAL spends the same CPU on a busy study room at 3pm
+and on a dark, closed store at 4am. The scheduler picks each channel's next
+interval from what the last frames showed:
+
+- activity (scene change or a seat transition being confirmed): sample at
+  min_interval so entries/exits are confirmed quickly
+- quiet frames while open: back off geometrically up to idle_interval
+- store closed (stores.metadata opening hours) or the scene is dark
+  (lights off): max_interval
+"""
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from src.utils.opening_hours import is_open
+
+
+def frame_brightness(frame: np.ndarray, step: int = 16) -> float:
+    """Mean gray level (0-255) of a sparse pixel grid."""
+    return float(frame[::step, ::step].mean())
+
+
+class SnapshotScheduler:
+    """Choose the sleep between snapshots for one channel."""
+
+    def __init__(
+        self,
+        base_interval: float = 3.0,
+        min_interval: float = 1.0,
+        idle_interval: float = 10.0,
+        max_interval: float = 60.0,
+        backoff: float = 1.5,
+        dark_brightness: float = 20.0,
+        opening_hours: Optional[str] = None
+    ):
+        """Initialize scheduler.
+
+        Args:
+            base_interval: Interval used until the first observation
+            min_interval: Interval while the scene is active
+            idle_interval: Longest interval while open but quiet
+            max_interval: Interval while closed or dark (upper bound for all)
+            backoff: Growth factor per quiet frame
+            dark_brightness: Mean gray level below which the scene counts
+                as dark (0 = never)
+            opening_hours: stores.metadata['opening_hours'] (None = always open)
+        """
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.idle_interval = min(max(idle_interval, min_interval), self.max_interval)
+        self.backoff = max(backoff, 1.0)
+        self.dark_brightness = dark_brightness
+        self.opening_hours = opening_hours
+
+        self.interval = min(max(base_interval, min_interval), self.max_interval)
+        self.reason = 'base'
+        self.last_brightness: Optional[float] = None
+
+    def observe(self, active: bool, brightness: Optional[float] = None,
+                now: Optional[datetime] = None) -> float:
+        """Update the interval after a processed frame.
+
+        Args:
+            active: Scene changed or a seat transition is pending
+            brightness: Frame brightness (see frame_brightness)
+            now: Time for the opening-hours check (naive local or aware)
+
+        Returns:
+            Seconds to wait before the next snapshot
+        """
+        self.last_brightness = brightness
+        dark = (
+            brightness is not None
+            and self.dark_brightness > 0
+            and brightness < self.dark_brightness
+        )
+
+        if not is_open(self.opening_hours, now, default=True):
+            self.interval, self.reason = self.max_interval, 'closed'
+        elif dark and not active:
+            self.interval, self.reason = self.max_interval, 'dark'
+        elif active:
+            self.interval, self.reason = self.min_interval, 'active'
+        else:
+            # Straight after closed/dark this lands on idle_interval
+            self.interval = min(self.interval * self.backoff, self.idle_interval)
+            self.reason = 'idle'
+        return self.interval
+
+    def get_stats(self) -> dict:
+        """Current interval for the performance report."""
+        return {
+            'interval': round(self.interval, 2),
+            'reason': self.reason,
+            'brightness': None if self.last_brightness is None else round(self.last_brightness, 1),
+        }
@@ -0,0 +1,191 @@
+"""In-memory seat state kept by each channel worker."""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from dateutil import parser as date_parser
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a timestamp from Supabase into an aware UTC datetime.
+
+    Args:
+        value: ISO string, datetime or None (naive values are taken as UTC,
+            which is how TIMESTAMPTZ columns read them)
+
+    Returns:
+        Aware UTC datetime comparable with datetime.now(timezone.utc), or None
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = date_parser.parse(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+@dataclass
+class SeatState:
+    """Current state of one seat as tracked by its channel worker."""
+    seat_id: str
+    status: str = 'empty'  # 'empty', 'occupied', 'abandoned'
+    last_person_seen: Optional[datetime] = None
+    last_empty_time: Optional[datetime] = None
+    vacant_duration_seconds: int = 0
+    confidence: float = 0.0
+
+    # Tentative transition being confirmed (see SeatStatusMachine)
+    pending_status: Optional[str] = None
+    pending_since: Optional[datetime] = None
+    pending_count: int = 0
+    # First observation of belongings without a person (abandoned timer)
+    object_since: Optional[datetime] = None
+    # Run of frames contradicting the timer (person seen or no belongings)
+    object_missing_since: Optional[datetime] = None
+    object_missing_count: int = 0
+
+    # Last row persisted to seat_status (see StatusWritePolicy)
+    written_signature: Optional[Tuple] = None
+    last_written_at: Optional[datetime] = None
+
+    @classmethod
+    def from_db(cls, seat_id: str, row: Optional[Dict[str, Any]]) -> 'SeatState':
+        """Build state from a seat_status row (or defaults if missing)."""
+        if not row:
+            return cls(seat_id=seat_id)
+
+        return cls(
+            seat_id=seat_id,
+            status=row.get('status') or 'empty',
+            last_person_seen=parse_timestamp(row.get('last_person_seen')),
+            last_empty_time=parse_timestamp(row.get('last_empty_time')),
+            vacant_duration_seconds=row.get('vacant_duration_seconds') or 0
+        )
+
+
+class SeatStatusMachine:
+    """Debounced seat status transitions.
+
+    Each frame's observation proposes a target status. The seat only moves
+    there once the same target was observed enter/leave_count times in a
+    row, or has been proposed for enter/leave_seconds, whichever comes
+    first. Until then the target is kept as a tentative state
+    (``SeatState.pending_status``) and the confirmed status is unchanged.
+
+    ``abandoned`` is proposed once belongings have been seen without a
+    person for abandoned_after seconds of wall-clock time. The timer is
+    debounced too: it only restarts after object_clear_count frames (or
+    object_clear_seconds) in a row with a person or without belongings, so
+    one missed object detection does not reset it.
+    """
+
+    def __init__(
+        self,
+        enter_count: int = 2,
+        leave_count: int = 3,
+        enter_seconds: float = 6.0,
+        leave_seconds: float = 15.0,
+        abandoned_after: float = 600.0,
+        object_clear_count: int = 3,
+        object_clear_seconds: float = 30.0
+    ):
+        """Initialize state machine.
+
+        Args:
+            enter_count: Consecutive observations to become occupied
+            leave_count: Consecutive observations to leave occupied (or
+                switch between empty and abandoned)
+            enter_seconds: Tentative time after which occupied is confirmed
+                regardless of count (0 = count only)
+            leave_seconds: Same for the other transitions
+            abandoned_after: Seconds of belongings without a person before
+                the seat counts as abandoned
+            object_clear_count: Consecutive contradicting observations that
+                restart the abandoned timer
+            object_clear_seconds: Same, by time (0 = count only)
+        """
+        self.enter_count = enter_count
+        self.leave_count = leave_count
+        self.enter_seconds = enter_seconds
+        self.leave_seconds = leave_seconds
+        self.abandoned_after = abandoned_after
+        self.object_clear_count = object_clear_count
+        self.object_clear_seconds = object_clear_seconds
+
+    def target_status(self, state: SeatState, person_detected: bool,
+                      object_detected: bool, now: datetime) -> str:
+        """Status this observation argues for (updates the abandoned timer)."""
+        if person_detected or not object_detected:
+            self._miss_object(state, now)
+        else:
+            state.object_missing_since = None
+            state.object_missing_count = 0
+            if state.object_since is None:
+                state.object_since = now
+
+        if person_detected:
+            return 'occupied'
+        if (state.object_since is not None
+                and (now - state.object_since).total_seconds() >= self.abandoned_after):
+            return 'abandoned'
+        return 'empty'
+
+    def observe(self, state: SeatState, person_detected: bool,
+                object_detected: bool, now: datetime) -> str:
+        """Feed one observation and return the (possibly unchanged) status.
+
+        Args:
+            state: Seat state (pending fields are updated in place;
+                state.status is left to the caller)
+            person_detected: A person matched the seat in this frame
+            object_detected: Belongings were seen on the seat in this frame
+            now: Observation time
+
+        Returns:
+            Confirmed status after this observation
+        """
+        target = self.target_status(state, person_detected, object_detected, now)
+
+        if target == state.status:
+            self._clear_pending(state)
+            return state.status
+
+        if target != state.pending_status:
+            state.pending_status = target
+            state.pending_since = now
+            state.pending_count = 0
+        state.pending_count += 1
+
+        if target == 'occupied':
+            count, seconds = self.enter_count, self.enter_seconds
+        else:
+            count, seconds = self.leave_count, self.leave_seconds
+
+        held = (now - state.pending_since).total_seconds()
+        if state.pending_count >= count or (seconds > 0 and held >= seconds):
+            self._clear_pending(state)
+            return target
+        return state.status
+
+    def _miss_object(self, state: SeatState, now: datetime):
+        """Restart the abandoned timer once belongings are confirmed gone."""
+        if state.object_since is None:
+            return
+        if state.object_missing_since is None:
+            state.object_missing_since = now
+            state.object_missing_count = 0
+        state.object_missing_count += 1
+
+        missing = (now - state.object_missing_since).total_seconds()
+        if (state.object_missing_count >= self.object_clear_count
+                or (self.object_clear_seconds > 0 and missing >= self.object_clear_seconds)):
+            state.object_since = None
+            state.object_missing_since = None
+            state.object_missing_count = 0
+
+    @staticmethod
+    def _clear_pending(state: SeatState):
+        state.pending_status = None
+        state.pending_since = None
+        state.pending_count = 0
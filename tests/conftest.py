@@ -0,0 +1,6 @@
+"""Shared pytest setup."""
+import sys
+from pathlib import Path
+
+# Make `src` importable when pytest is run from anywhere
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,163 @@
+"""Tests for the NumPy pre/post-processing shared by the ONNX/OpenVINO backends."""
+import cv2
+import numpy as np
+import pytest
+
+from src.core.backends import (
+    ExportedYoloBackend, letterbox, nms, preprocess_image, resolve_class_ids
+)
+
+
+def reference_nms(boxes, scores, iou_threshold):
+    """Plain-Python greedy NMS (torchvision.ops.nms semantics)."""
+    def iou(a, b):
+        w = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+        h = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+        inter = w * h
+        union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+        return inter / union
+
+    order = sorted(range(len(scores)), key=lambda i: -scores[i])
+    keep = []
+    for i in order:
+        if all(iou(boxes[i], boxes[k]) <= iou_threshold for k in keep):
+            keep.append(i)
+    return keep
+
+
+def random_boxes(rng, n, size=200.0):
+    xy = rng.uniform(0, size, (n, 2))
+    wh = rng.uniform(5, 60, (n, 2))
+    return np.concatenate([xy, xy + wh], axis=1)
+
+
+@pytest.mark.parametrize('iou_threshold', [0.3, 0.5, 0.7])
+def test_nms_matches_reference(iou_threshold):
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n = int(rng.integers(1, 60))
+        boxes = random_boxes(rng, n)
+        scores = rng.permutation(n) / n + 0.01  # distinct scores
+
+        keep = nms(boxes, scores, iou_threshold)
+        assert keep.tolist() == reference_nms(boxes.tolist(), scores.tolist(), iou_threshold)
+
+
+def test_nms_keeps_highest_score_first():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], dtype=np.float64)
+    scores = np.array([0.6, 0.9, 0.8])
+    assert nms(boxes, scores, 0.5).tolist() == [1, 2]
+
+
+def test_nms_empty():
+    keep = nms(np.zeros((0, 4)), np.zeros(0), 0.5)
+    assert keep.dtype == np.int64 and keep.size == 0
+
+
+def test_letterbox_landscape_frame():
+    rng = np.random.default_rng(1)
+    image = rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8)
+
+    padded, scale, pad = letterbox(image, (640, 640))
+
+    assert padded.shape == (640, 640, 3)
+    assert scale == pytest.approx(1 / 3)
+    assert pad == (0, 140)
+    resized = cv2.resize(image, (640, 360), interpolation=cv2.INTER_LINEAR)
+    np.testing.assert_array_equal(padded[140:500], resized)
+    assert (padded[:140] == 114).all() and (padded[500:] == 114).all()
+
+
+def test_letterbox_odd_padding_split():
+    # Same top/bottom split as ultralytics LetterBox: round(dh -/+ 0.1)
+    image = np.zeros((601, 1000, 3), dtype=np.uint8)
+
+    padded, scale, pad = letterbox(image, (640, 640))
+
+    assert padded.shape == (640, 640, 3)
+    assert scale == pytest.approx(0.64)
+    assert pad == (0, 127)
+    assert (padded[:127] == 114).all()
+    assert (padded[127 + 385:] == 114).all()
+    assert (padded[127:127 + 385] == 0).all()
+
+
+def test_letterbox_same_size_is_unchanged():
+    image = np.full((640, 640, 3), 7, dtype=np.uint8)
+    padded, scale, pad = letterbox(image, (640, 640))
+    assert scale == 1.0 and pad == (0, 0)
+    np.testing.assert_array_equal(padded, image)
+
+
+def test_preprocess_image_layout():
+    image = np.zeros((320, 640, 3), dtype=np.uint8)
+    image[..., 0] = 255  # blue
+
+    tensor, (scale, pad, shape) = preprocess_image(image, (640, 640))
+
+    assert tensor.shape == (3, 640, 640) and tensor.dtype == np.float32
+    assert tensor.flags['C_CONTIGUOUS']
+    assert (scale, pad, shape) == (1.0, (0, 160), (320, 640))
+    # BGR -> RGB: blue ends up in the last channel
+    assert tensor[2, 160:480].min() == 1.0
+    assert tensor[0, 160:480].max() == 0.0
+    assert tensor[0, 0, 0] == pytest.approx(114 / 255)
+
+
+class FakeExportedBackend(ExportedYoloBackend):
+    """Returns a fixed raw head output instead of running a model."""
+
+    name = 'fake'
+
+    def __init__(self, output: np.ndarray, **kwargs):
+        super().__init__('fake.onnx', **kwargs)
+        self.output = output
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return np.repeat(self.output[None], len(batch), axis=0)
+
+
+def raw_output(rows, num_classes=80):
+    """Build a (4 + C, anchors) head output from (cx, cy, w, h, class, score) rows."""
+    output = np.zeros((4 + num_classes, len(rows)), dtype=np.float32)
+    for anchor, (cx, cy, w, h, class_id, score) in enumerate(rows):
+        output[:4, anchor] = (cx, cy, w, h)
+        output[4 + class_id, anchor] = score
+    return output
+
+
+def test_postprocess_undoes_letterbox():
+    # 1280x640 frame -> scale 0.5, pad_y 160 in the 640x640 input
+    output = raw_output([
+        (150, 320, 100, 200, 0, 0.9),    # person -> frame (200, 120, 400, 520)
+        (152, 322, 100, 200, 0, 0.8),    # duplicate, suppressed by NMS
+        (150, 320, 100, 200, 63, 0.7),   # laptop on the same spot, other class
+        (500, 400, 40, 40, 0, 0.1),      # below confidence
+    ])
+    backend = FakeExportedBackend(output, confidence=0.25, classes=[0, 63])
+
+    [detections] = backend.predict([np.zeros((640, 1280, 3), dtype=np.uint8)])
+
+    assert detections.dtype == np.float32
+    np.testing.assert_allclose(detections, [
+        [200, 120, 400, 520, 0.9, 0],
+        [200, 120, 400, 520, 0.7, 63],
+    ], rtol=1e-6)
+
+
+def test_postprocess_filters_classes_and_clips():
+    output = raw_output([
+        (20, 170, 60, 40, 0, 0.9),       # extends past the left edge
+        (300, 300, 50, 50, 63, 0.9),     # not requested
+    ])
+    backend = FakeExportedBackend(output, confidence=0.25)
+
+    [detections] = backend.predict([np.zeros((640, 1280, 3), dtype=np.uint8)])
+
+    np.testing.assert_allclose(detections, [[0, 0, 100, 60, 0.9, 0]], rtol=1e-6)
+
+
+def test_resolve_class_ids():
+    assert resolve_class_ids(['person', 'laptop', '24', 41, ' ']) == [0, 63, 24, 41]
+    with pytest.raises(ValueError):
+        resolve_class_ids(['sofa'])
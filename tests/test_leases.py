@@ -0,0 +1,125 @@
+"""Lease sharding against a local SQLite stand-in."""
+import importlib.util
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+
+# Load the module on its own: importing the src.database package connects
+# the Postgres engine in database.py
+_spec = importlib.util.spec_from_file_location(
+    'leases', Path(__file__).parent.parent / 'src' / 'database' / 'leases.py'
+)
+leases = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(leases)
+
+CHANNELS = {('store1', channel) for channel in range(1, 6)}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'leases.db'}")
+    leases.create_tables(engine)
+    return engine
+
+
+def lease_owners(engine):
+    with engine.connect() as conn:
+        return {
+            (row[0], int(row[1])): row[2]
+            for row in conn.execute(text("SELECT store_id, channel_id, node_id FROM channel_leases"))
+        }
+
+
+def test_single_node_takes_everything(engine):
+    node = leases.LeaseManager('node-a', engine=engine)
+    assert node.heartbeat(CHANNELS) == CHANNELS
+    assert set(lease_owners(engine).values()) == {'node-a'}
+
+
+def test_nodes_converge_to_fair_disjoint_shares(engine):
+    a = leases.LeaseManager('node-a', engine=engine)
+    b = leases.LeaseManager('node-b', engine=engine)
+
+    a.heartbeat(CHANNELS)
+    assert b.heartbeat(CHANNELS) == set()   # everything is leased to a
+    held_a = a.heartbeat(CHANNELS)          # a sees b and hands back its excess
+    held_b = b.heartbeat(CHANNELS)
+
+    assert (len(held_a), len(held_b)) == (3, 2)  # remainder goes to the first node id
+    assert held_a.isdisjoint(held_b) and held_a | held_b == CHANNELS
+    owners = lease_owners(engine)
+    assert {key for key, node in owners.items() if node == 'node-b'} == held_b
+
+
+def test_acquire_is_compare_and_set(engine):
+    a = leases.LeaseManager('node-a', engine=engine, lease_seconds=30)
+    b = leases.LeaseManager('node-b', engine=engine, lease_seconds=30)
+    key = ('store1', 1)
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    expires = now + timedelta(seconds=30)
+
+    with engine.begin() as conn:
+        assert a._acquire(conn, key, now, expires)
+        # Live lease: the conditional upsert must not steal it
+        assert not b._acquire(conn, key, now + timedelta(seconds=10), expires)
+    assert lease_owners(engine)[key] == 'node-a'
+
+    with engine.begin() as conn:
+        assert b._acquire(conn, key, expires, expires + timedelta(seconds=30))
+    assert lease_owners(engine)[key] == 'node-b'
+
+
+def test_unwanted_channels_are_released(engine):
+    node = leases.LeaseManager('node-a', engine=engine)
+    node.heartbeat(CHANNELS)
+
+    remaining = {('store1', 1), ('store1', 2)}
+    assert node.heartbeat(remaining) == remaining
+    assert set(lease_owners(engine)) == remaining
+
+
+def test_release_all_frees_channels_for_others(engine):
+    a = leases.LeaseManager('node-a', engine=engine)
+    b = leases.LeaseManager('node-b', engine=engine)
+    a.heartbeat(CHANNELS)
+
+    a.release_all()
+
+    assert lease_owners(engine) == {}
+    assert b.heartbeat(CHANNELS) == CHANNELS
+
+
+def test_database_error_keeps_leases_until_expiry(engine, monkeypatch):
+    node = leases.LeaseManager('node-a', engine=engine, lease_seconds=30)
+    held = node.heartbeat(CHANNELS)
+
+    def fail(wanted):
+        raise RuntimeError('connection lost')
+
+    monkeypatch.setattr(node, '_sync', fail)
+    assert node.heartbeat(CHANNELS) == held
+    assert node.last_error == 'connection lost'
+
+    node._last_renewed -= 31
+    assert node.heartbeat(CHANNELS) == set()
+    assert node.metrics['failures'] == 2
+
+
+def test_cut_off_node_drops_leases_one_heartbeat_early(engine, monkeypatch):
+    node = leases.LeaseManager('node-a', engine=engine, lease_seconds=30, heartbeat_interval=10)
+    held = node.heartbeat(CHANNELS)
+    renewed = node._last_renewed
+
+    def fail(wanted):
+        raise RuntimeError('connection lost')
+
+    monkeypatch.setattr(node, '_sync', fail)
+    clock = {'now': renewed + 19}
+    monkeypatch.setattr(leases.time, 'time', lambda: clock['now'])
+    assert node.heartbeat(CHANNELS) == held
+
+    # The next heartbeat (at 30s) would be too late: others may take over then
+    clock['now'] = renewed + 20
+    assert node.heartbeat(CHANNELS) == set()
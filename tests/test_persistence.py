@@ -0,0 +1,52 @@
+"""Tests for the channel worker persistence policies."""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.workers.persistence import StatusWritePolicy, json_safe
+from src.workers.seat_state import SeatState
+
+T0 = datetime(2024, 1, 1, 9, 0, 0, tzinfo=timezone.utc)
+
+
+def status_row(status='empty', person=False, obj=False, confidence=0.0):
+    return {'status': status, 'person_detected': person, 'object_detected': obj,
+            'detection_confidence': confidence}
+
+
+def test_write_policy_writes_changes_and_heartbeats():
+    policy = StatusWritePolicy(heartbeat_interval=60, confidence_bucket=0.1)
+    state = SeatState('1')
+    row = status_row('occupied', person=True, confidence=0.82)
+
+    assert policy.should_write(state, row, T0)
+    policy.mark_written(state, row, T0)
+
+    # Same bucket, within heartbeat: skipped
+    assert not policy.should_write(state, status_row('occupied', True, confidence=0.85),
+                                   T0 + timedelta(seconds=30))
+    # Confidence bucket or flags changed: written
+    assert policy.should_write(state, status_row('occupied', True, confidence=0.91),
+                               T0 + timedelta(seconds=30))
+    assert policy.should_write(state, status_row('occupied', True, obj=True, confidence=0.82),
+                               T0 + timedelta(seconds=30))
+    # Unchanged but heartbeat due
+    assert policy.should_write(state, row, T0 + timedelta(seconds=60))
+
+
+def test_json_safe_converts_nested_values():
+    row = {
+        'updated_at': T0,
+        'confidence': np.float32(0.5),
+        'count': np.int64(3),
+        'bbox': [np.int32(1), 2],
+        'meta': {'seen': datetime(2024, 1, 1).date()},
+    }
+
+    assert json_safe(row) == {
+        'updated_at': '2024-01-01T09:00:00+00:00',
+        'confidence': 0.5,
+        'count': 3,
+        'bbox': [1, 2],
+        'meta': {'seen': '2024-01-01'},
+    }
@@ -0,0 +1,164 @@
+"""Vectorized ROIMatcher.check_occupancy must match the original per-seat loop."""
+import numpy as np
+import pytest
+
+from src.core.roi_matcher import ROIMatcher
+
+
+CONFIG = {
+    'camera_id': 'test_cam',
+    'resolution': [640, 480],
+    'seats': [
+        {'id': 'A1', 'type': 'polygon', 'roi': [[40, 40], [200, 40], [200, 200], [40, 200]]},
+        # Concave (L-shaped)
+        {'id': 'A2', 'type': 'polygon',
+         'roi': [[220, 40], [400, 40], [400, 100], [280, 100], [280, 220], [220, 220]]},
+        # Triangle overlapping A1
+        {'id': 'A3', 'type': 'polygon', 'roi': [[150, 150], [330, 260], [120, 300]]},
+        {'id': 'B1', 'roi': [420, 40, 520, 180]},
+        {'id': 'B2', 'type': 'rectangle', 'roi': [480, 120, 600, 300]},
+        {'id': 'B3', 'roi': [50, 320, 250, 460]},
+    ]
+}
+
+
+def reference_check_occupancy(matcher, person_detections, iou_threshold=0.3):
+    """The per-seat, per-detection loop check_occupancy used before vectorization."""
+    results = {}
+    for seat in matcher.seats:
+        polygon = seat.get('type', 'rectangle') == 'polygon'
+        occupied = False
+        max_iou = 0.0
+        matched_detection = None
+
+        for person_box in person_detections:
+            x1, y1, x2, y2 = person_box[:4]
+            if polygon:
+                if matcher.point_in_polygon(((x1 + x2) / 2, y2), seat['roi']):
+                    occupied, max_iou, matched_detection = True, 1.0, person_box
+                    break
+            else:
+                iou = matcher.calculate_iou((x1, y1, x2, y2), tuple(seat['roi']))
+                max_iou = max(max_iou, iou)
+                if iou > iou_threshold:
+                    occupied, matched_detection = True, person_box
+                    break
+
+        results[seat['id']] = {
+            'status': 'occupied' if occupied else 'empty',
+            'max_iou': max_iou,
+            'matched_detection': matched_detection,
+        }
+    return results
+
+
+def random_detections(rng, n):
+    """Integer person boxes; coarse coordinates so foot points often land on edges and vertices."""
+    detections = []
+    for _ in range(n):
+        x1 = int(rng.integers(0, 60)) * 10
+        y1 = int(rng.integers(0, 44)) * 10
+        w = int(rng.integers(2, 20)) * 10
+        h = int(rng.integers(2, 25)) * 10
+        detections.append((x1, y1, min(x1 + w, 640), min(y1 + h, 480), float(rng.uniform(0.3, 1))))
+    return detections
+
+
+def assert_same_results(actual, expected):
+    assert actual.keys() == expected.keys()
+    for seat_id, ref in expected.items():
+        got = actual[seat_id]
+        assert got['status'] == ref['status'], seat_id
+        assert got['max_iou'] == pytest.approx(ref['max_iou']), seat_id
+        if ref['matched_detection'] is None:
+            assert got['matched_detection'] is None, seat_id
+        else:
+            assert tuple(got['matched_detection']) == tuple(ref['matched_detection']), seat_id
+
+
+@pytest.fixture
+def matcher():
+    return ROIMatcher(CONFIG)
+
+
+@pytest.mark.parametrize('iou_threshold', [0.1, 0.3, 0.5])
+def test_check_occupancy_matches_reference(matcher, iou_threshold):
+    rng = np.random.default_rng(42)
+    for _ in range(300):
+        detections = random_detections(rng, int(rng.integers(0, 10)))
+        assert_same_results(
+            matcher.check_occupancy(detections, iou_threshold),
+            reference_check_occupancy(matcher, detections, iou_threshold)
+        )
+
+
+def test_check_occupancy_array_input_matches_list(matcher):
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        detections = random_detections(rng, int(rng.integers(1, 10)))
+        as_array = np.asarray(detections, dtype=np.float32)
+        assert_same_results(
+            matcher.check_occupancy(as_array),
+            reference_check_occupancy(matcher, detections)
+        )
+
+
+@pytest.mark.parametrize('downsample', [1, 4, 16])
+def test_label_map_matches_polygon_test(matcher, downsample):
+    matcher.build_label_map(downsample=downsample)
+    rng = np.random.default_rng(3)
+    for _ in range(300):
+        detections = random_detections(rng, int(rng.integers(0, 10)))
+        assert_same_results(
+            matcher.check_occupancy(detections),
+            reference_check_occupancy(matcher, detections)
+        )
+
+
+def test_label_map_handles_points_outside_the_frame(matcher):
+    matcher.build_label_map(downsample=4)
+    points = np.array([[-5, 100], [100, -1], [700, 100], [100, 480], [120, 120]], dtype=np.float64)
+    expected = np.array([
+        [matcher.point_in_polygon(p, matcher.seats[i]['roi']) for p in points]
+        for i in range(3)
+    ])
+    np.testing.assert_array_equal(matcher._lookup_label_map(points), expected)
+
+
+def test_label_map_cache_round_trip(matcher, tmp_path):
+    built = matcher.build_label_map(downsample=2, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob('label_map_*.npy'))) == 1
+
+    cached = ROIMatcher(CONFIG).build_label_map(downsample=2, cache_dir=tmp_path)
+    np.testing.assert_array_equal(cached, built)
+
+
+def test_points_in_polygons_matches_point_in_polygon(matcher):
+    rng = np.random.default_rng(5)
+    points = np.concatenate([
+        rng.integers(0, 64, (500, 2)) * 10,     # grid: vertices and edges
+        rng.uniform(0, 640, (500, 2)),
+    ]).astype(np.float64)
+
+    inside = matcher.points_in_polygons(points)
+
+    expected = np.array([
+        [matcher.point_in_polygon(tuple(p), matcher.seats[i]['roi']) for p in points]
+        for i in range(3)
+    ])
+    np.testing.assert_array_equal(inside, expected)
+
+
+def test_objects_attributed_by_box_center(matcher):
+    persons = [(60, 60, 120, 190, 0.9)]
+    objects = np.array([
+        [430, 50, 450, 70, 0.8, 63],     # center in B1
+        [600, 400, 620, 420, 0.6, 24],   # no seat
+    ], dtype=np.float32)
+
+    results = matcher.check_occupancy(persons, object_detections=objects)
+
+    assert results['A1']['status'] == 'occupied'
+    assert results['B1']['object_detected']
+    np.testing.assert_array_equal(results['B1']['matched_object'], objects[0])
+    assert not any(results[s]['object_detected'] for s in ('A1', 'A2', 'A3', 'B2', 'B3'))
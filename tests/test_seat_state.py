@@ -0,0 +1,81 @@
+"""Tests for debounced seat status transitions."""
+from datetime import datetime, timedelta, timezone
+
+from src.workers.seat_state import SeatState, SeatStatusMachine, parse_timestamp
+
+T0 = datetime(2024, 1, 1, 9, 0, 0, tzinfo=timezone.utc)
+
+
+def feed(machine, state, observations, start=T0, step=1.0):
+    """Apply (person, object) observations step seconds apart; return statuses."""
+    statuses = []
+    for i, (person, obj) in enumerate(observations):
+        state.status = machine.observe(state, person, obj, start + timedelta(seconds=i * step))
+        statuses.append(state.status)
+    return statuses
+
+
+def test_occupied_needs_enter_count_in_a_row():
+    machine = SeatStatusMachine(enter_count=2, enter_seconds=0)
+    state = SeatState('1')
+
+    assert feed(machine, state, [(True, False), (False, False), (True, False), (True, False)]) == [
+        'empty', 'empty', 'empty', 'occupied'
+    ]
+
+
+def test_leaving_is_debounced():
+    machine = SeatStatusMachine(leave_count=3, leave_seconds=0)
+    state = SeatState('1', status='occupied')
+
+    # One missed detection does not empty the seat
+    assert feed(machine, state, [(False, False), (True, False)]) == ['occupied', 'occupied']
+    assert state.pending_status is None
+    assert feed(machine, state, [(False, False)] * 3) == ['occupied', 'occupied', 'empty']
+
+
+def test_pending_confirmed_by_time():
+    machine = SeatStatusMachine(leave_count=100, leave_seconds=15)
+    state = SeatState('1', status='occupied')
+
+    statuses = feed(machine, state, [(False, False)] * 4, step=5.0)
+    assert statuses == ['occupied', 'occupied', 'occupied', 'empty']
+
+
+def test_abandoned_after_belongings_without_person():
+    machine = SeatStatusMachine(leave_count=1, abandoned_after=600)
+    state = SeatState('1')
+
+    statuses = feed(machine, state, [(False, True)] * 12, step=60.0)
+    assert statuses[-1] == 'abandoned'
+    assert statuses[:10] == ['empty'] * 10
+
+
+def test_abandoned_timer_survives_missed_object_detections():
+    machine = SeatStatusMachine(leave_count=1, abandoned_after=600,
+                                object_clear_count=3, object_clear_seconds=0)
+    state = SeatState('1')
+    # Belongings missed on every third frame
+    observations = [(False, i % 3 != 2) for i in range(40)]
+
+    statuses = feed(machine, state, observations, step=20.0)
+    assert 'abandoned' in statuses
+    assert state.object_since == T0
+
+
+def test_abandoned_timer_restarts_once_belongings_are_gone():
+    machine = SeatStatusMachine(abandoned_after=600, object_clear_count=3, object_clear_seconds=0)
+    state = SeatState('1')
+
+    feed(machine, state, [(False, True)] * 5 + [(False, False)] * 3)
+    assert state.object_since is None
+
+    feed(machine, state, [(False, True)], start=T0 + timedelta(seconds=100))
+    assert state.object_since == T0 + timedelta(seconds=100)
+
+
+def test_parse_timestamp_is_aware_utc():
+    assert parse_timestamp(None) is None
+    assert parse_timestamp('2024-01-01T18:00:00+09:00') == datetime(2024, 1, 1, 9, tzinfo=timezone.utc)
+    assert parse_timestamp('2024-01-01T09:00:00') == T0
+    assert parse_timestamp(datetime(2024, 1, 1, 9)) == T0
@@ -0,0 +1,89 @@
+"""Tests for the NumPy person tracker."""
+import numpy as np
+
+from src.core.boxes import iou_matrix
+from src.core.tracker import PersonTracker, greedy_match
+
+
+def box(x, y, w=60, h=160, confidence=0.9):
+    return [x, y, x + w, y + h, confidence]
+
+
+def test_iou_matrix():
+    a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float64)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10]], dtype=np.float64)
+
+    ious = iou_matrix(a, b)
+
+    np.testing.assert_allclose(ious, [[1, 1 / 3], [0, 0]], atol=1e-6)
+    assert iou_matrix(a, np.zeros((0, 4))).shape == (2, 0)
+
+
+def test_greedy_match_prefers_highest_iou():
+    ious = np.array([[0.9, 0.8], [0.85, 0.1], [0.0, 0.0]])
+
+    matched, free_rows, free_cols = greedy_match(ious, 0.3)
+
+    assert matched.tolist() == [[0, 0]]
+    assert free_rows.tolist() == [1, 2] and free_cols.tolist() == [1]
+
+
+def test_track_keeps_id_while_moving():
+    tracker = PersonTracker()
+    ids = []
+    for step in range(10):
+        tracks = tracker.update(np.array([box(100 + 5 * step, 200)]))
+        assert len(tracks) == 1
+        ids.append(int(tracks[0, 5]))
+
+    assert ids == [1] * 10
+    np.testing.assert_allclose(tracks[0, :4], [145, 200, 205, 360], atol=3)
+
+
+def test_track_coasts_through_missed_detections():
+    tracker = PersonTracker(max_lost=3)
+    tracker.update(np.array([box(100, 200)]))
+
+    for _ in range(3):
+        tracks = tracker.update(np.zeros((0, 5)))
+        assert len(tracks) == 1 and tracks[0, 5] == 1
+
+    assert len(tracker.update(np.zeros((0, 5)))) == 0
+
+
+def test_low_confidence_continues_but_never_starts_tracks():
+    tracker = PersonTracker(high_confidence=0.5)
+
+    assert len(tracker.update(np.array([box(100, 200, confidence=0.3)]))) == 0
+
+    tracker.update(np.array([box(100, 200)]))
+    tracks = tracker.update(np.array([box(102, 200, confidence=0.3)]))
+    assert tracks[:, 5].tolist() == [1]
+    assert tracks[0, 4] == np.float32(0.3)
+
+
+def test_min_hits_hides_tentative_tracks():
+    tracker = PersonTracker(min_hits=2)
+
+    assert len(tracker.update(np.array([box(100, 200)]))) == 0
+    assert len(tracker.tracks(include_tentative=True)) == 1
+    assert len(tracker.update(np.array([box(100, 200)]))) == 1
+
+
+def test_predict_does_not_expire_tracks():
+    tracker = PersonTracker(max_lost=1)
+    tracker.update(np.array([box(100, 200)]))
+
+    for _ in range(20):
+        tracks = tracker.predict()
+    assert len(tracks) == 1
+    assert tracker.get_stats() == {'tracks': 1, 'coasting': 0, 'next_id': 2}
+
+
+def test_two_people_get_distinct_ids():
+    tracker = PersonTracker()
+    tracker.update(np.array([box(100, 200), box(400, 200)]))
+    tracks = tracker.update(np.array([box(403, 200), box(98, 200)]))
+
+    by_id = {int(t[5]): t[0] for t in tracks}
+    assert by_id[1] < 200 < by_id[2]